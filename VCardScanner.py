@@ -6,20 +6,36 @@ import pytesseract
 import imutils
 import cv2
 import re
+import logging
 from os.path import exists
 from glob import glob
 from skimage.exposure import is_low_contrast
 from pprint import pprint
 from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from app.services.ocr_engine import get_ocr_engine
+from app.services.ocr_service import OCRService
+
+logger = logging.getLogger(__name__)
 
 class VCardScanner:
 	images: list[str] = []
 	debug: bool = False
 	low_contrast_threshold:float = 0.65
 	resize_width:int = 800
+	ocr_budget:int = 6 # max. Tesseract calls per image
+	ocr_workers:int = 4
+	coarse_step:int = 4
+	quad_tolerance:float = 8.0 # px on the resized image
 
-	def __init__(self, img = None, debug = False)-> None:
+	def __init__(self, img = None, debug = False, ocr_budget = None, ocr_workers = None)-> None:
 		self.debug = debug
+		if ocr_budget is not None:
+			self.ocr_budget = ocr_budget
+		if ocr_workers is not None:
+			self.ocr_workers = ocr_workers
+		# one pool per scanner: its threads keep their Tesseract handles warm across images
+		self.pool = ThreadPoolExecutor(max_workers=self.ocr_workers, thread_name_prefix="vcard-ocr")
 		if img is None:
 			return
 		if type(img) is str:
@@ -28,6 +44,15 @@ class VCardScanner:
 			img = [elem for elem in img if exists(elem)]
 			self.images = img
 
+	def close(self)-> None:
+		self.pool.shutdown(wait=True, cancel_futures=True)
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc_info)-> None:
+		self.close()
+
 	def add_image_by_path(self, img)-> bool:
 		if exists(img):
 			self.images.append(img)
@@ -88,53 +113,113 @@ class VCardScanner:
 			cv2.waitKey(0)
 
 
+	def candidate_params(self, iterations):
+		# (contrast, fraction) grid; the coarse pass uses every coarse_step-th value on both axes
+		contrasts = list(range(1, 150, int(150/iterations)))
+		fractions = [fraction/10 for fraction in range(1, 20, int(20/iterations))]
+		coarse = [(c, f) for c in contrasts[::self.coarse_step] for f in fractions[::self.coarse_step]]
+		fine = [(c, f) for c in contrasts for f in fractions if (c, f) not in coarse]
+		return coarse, fine
+
+	def find_card_candidates(self, image, params, candidates):
+		# threshold the image for every parameter pair and collect the distinct card outlines;
+		# outlines whose corners are all within quad_tolerance pixels count as the same card
+		for contrast, fraction in params:
+			gray = self.gray(cv2.convertScaleAbs(image, alpha=fraction, beta=contrast) )
+			thresh = self.blur(gray)
+			cardCnt = self.contours(thresh)
+			if cardCnt is None:
+				continue
+			quad = OCRService.order_points(cardCnt.reshape(4, 2).astype("float32"))
+			for candidate in candidates:
+				if (abs(candidate["quad"] - quad)).max() <= self.quad_tolerance:
+					candidate["votes"] += 1
+					break
+			else:
+				candidates.append({"quad": quad, "alpha": fraction, "contrast": contrast, "votes": 1, "ocr": False})
+				# skips if self.debug is False
+				self.debug_out(image=image, contours = cardCnt, message=f"contrast: {contrast}, fraction: {fraction}")
+		return candidates
+
+	def parse_text(self, text):
+		phoneNums = re.findall(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', text)
+		emails = re.findall(r"[a-z0-9\.\-+_]+@[a-z0-9\.\-+_]+\.[a-z]+", text)
+		nameExp = r"^[\w'\-,.][^0-9_!¡?÷?¿/\\+=@#$%ˆ&*(){}|~<>;:[\]]{2,}"
+		names = re.findall(nameExp, text)
+		addrExp = r"([\S ]*)[\s,|]*([\S ]+?)\s*(\d+\s*[a-zA-Z]*\s*([-\/]\s*\d*\s*\w?\s*)*)[\s,|]*(\d{5})[\s,|]*([\S ]+)"
+		city = re.findall(addrExp, text)
+
+		return {
+			"phone": [ num.strip().strip("(").strip(")").strip("-").strip(" ") for num in phoneNums ],
+			"name": [ name.strip() for name in names],
+			"email": [ email.strip() for email in emails ],
+			"address": [ (", ".join(line)).strip() for line in city ]
+		}
+
+	def ocr_candidate(self, original_image, ratio, candidate):
+		# apply a four-point perspective transform to the *original* image to
+		# obtain a top-down bird's-eye view of the business card
+		card = OCRService.rectify_card(original_image, candidate["quad"] * ratio)
+		# scale the card so that the text has the target height (resize_width only applies to contour detection)
+		card = OCRService.normalize_resolution(card, self.gray(card))
+
+		# OCR it with the warm engine (the engine takes care of the channel order)
+		text = get_ocr_engine().image_to_string(card, lang="deu")
+		json = self.parse_text(text)
+		json["alpha"] = candidate["alpha"]
+		json["contrast"] = candidate["contrast"]
+		return json
+
+	def is_complete(self, dataset):
+		return all(len(dataset[elem]) > 0 for elem in ["name", "email", "phone", "address"])
+
 	def approach_approx(self, image_path, iterations):
 		original_image = cv2.imread(image_path)
 		image, dimensions = self.ocr_init(original_image)
+		# outlines are found on the resized image; map them back by the width ratio
+		# (dimensions[2] is the aspect ratio of the resized image, not the scale)
+		ratio = original_image.shape[1] / float(dimensions[0])
 		results = []
-
-		for contrast in range(1, 150, int(150/iterations)):
-			for fraction in range(1, 20, int(20/iterations)):
-				fraction = fraction/10
-				gray = self.gray(cv2.convertScaleAbs(image, alpha=fraction, beta=contrast) )
-				thresh = self.blur(gray)
-				cardCnt = self.contours(thresh)
-				if cardCnt is None:
-					continue
-
-				# skips if self.debug is False
-				self.debug_out(image=image, contours = cardCnt, message=f"contrast: {contrast}, fraction: {fraction}")
-
-				# apply a four-point perspective transform to the *original* image to
-				# obtain a top-down bird's-eye view of the business card
-				card = four_point_transform(original_image, cardCnt.reshape(4, 2) * dimensions[2]) # dimensions[2] = ration
-				# show transformed image
-
-				# convert the business card from BGR to RGB channel ordering and then
-				# OCR it
-				rgb = cv2.cvtColor(card, cv2.COLOR_BGR2RGB)
-				text = pytesseract.image_to_string(rgb, lang="deu")
-
-				phoneNums = re.findall(r'[\+\(]?[1-9][0-9 .\-\(\)]{8,}[0-9]', text)
-				emails = re.findall(r"[a-z0-9\.\-+_]+@[a-z0-9\.\-+_]+\.[a-z]+", text)
-				nameExp = r"^[\w'\-,.][^0-9_!¡?÷?¿/\\+=@#$%ˆ&*(){}|~<>;:[\]]{2,}"
-				names = re.findall(nameExp, text)
-				addrExp = r"([\S ]*)[\s,|]*([\S ]+?)\s*(\d+\s*[a-zA-Z]*\s*([-\/]\s*\d*\s*\w?\s*)*)[\s,|]*(\d{5})[\s,|]*([\S ]+)"
-				city = re.findall(addrExp, text)
-
-				json = {
-					"phone": [ num.strip().strip("(").strip(")").strip("-").strip(" ") for num in phoneNums ],
-					"name": [ name.strip() for name in names],
-					"email": [ email.strip() for email in emails ],
-					"address": [ (", ".join(line)).strip() for line in city ],
-					"alpha": fraction,
-					"contrast": contrast
-				}
-				results.append(json)
+		candidates = []
+		budget = self.ocr_budget
+		# warm up the engine once before it is used from several threads
+		get_ocr_engine()
+
+		# coarse pass first; the fine grid is only searched if the coarse outlines did not yield a complete result
+		futures = []
+		try:
+			for params in self.candidate_params(iterations):
+				self.find_card_candidates(image, params, candidates)
+				# outlines found by many parameter pairs are the most stable ones, OCR them first
+				pending = sorted([c for c in candidates if not c["ocr"]], key=lambda c: c["votes"], reverse=True)[:budget]
+				for candidate in pending:
+					candidate["ocr"] = True
+				budget -= len(pending)
+				futures = [self.pool.submit(self.ocr_candidate, original_image, ratio, candidate) for candidate in pending]
+				complete = False
+				for future in as_completed(futures):
+					try:
+						results.append(future.result())
+					except Exception as e:
+						logger.warning(f"OCR of a card candidate failed: {str(e)}")
+						continue
+					if self.is_complete(results[-1]):
+						complete = True
+						break
+				if complete or budget <= 0:
+					break
+		finally:
+			# drop OCR calls that have not started yet; running ones finish on the shared pool
+			for future in futures:
+				future.cancel()
+
+		if self.debug:
+			print(f"{len(candidates)} distinct card outlines, {len(results)} OCR calls")
 		return self.max_quality_dataset(results)
 
-	def scan_and_ocr(self):
-		for i in self.images:
+	def scan_and_ocr(self, images = None):
+		# images: overrides self.images, so one long-lived scanner (and its warm pool) can serve many calls
+		for i in (images if images is not None else self.images):
 			pprint(self.approach_approx(i, 12))
 
 	def scan_and_ocr_bak(self):
@@ -300,20 +385,22 @@ class VCardScanner:
 					score += 10
 				elif len(dataset[elem]) > 1:
 					score += 5
-				if elem[0].strip() != "":
+				if len(dataset[elem]) > 0 and dataset[elem][0].strip() != "":
 					score += 5
 			# bonus points!
 			if len(dataset["email"]) > 0 and "@" in dataset["email"][0]:
 				score += 15
-			if len(dataset["phone"][0] > 0) and len(dataset["phone"][0][0] > 3) and dataset["phone"][0][0].isnumeric():
+			if len(dataset["phone"]) > 0 and len(dataset["phone"][0]) > 3 and dataset["phone"][0].replace(" ", "").lstrip("+").isnumeric():
 				score += 15
 			dataset["score"] = score
 			data[idx] = dataset
+		if not data:
+			return None
 		data.sort(key=itemgetter('score'))
 		return (max(data, key=lambda x:x['score']))
 
 if __name__ == "__main__":
 	arr = glob("attachments/*.*")[-1]
 	sorted(arr)
-	card = VCardScanner(arr, False)
-	print(card.scan_and_ocr())
\ No newline at end of file
+	with VCardScanner(arr, False) as card:
+		print(card.scan_and_ocr())
\ No newline at end of file
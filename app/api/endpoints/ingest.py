@@ -1,14 +1,24 @@
-from fastapi import APIRouter, UploadFile, File, Header, HTTPException
-from fastapi.responses import Response, PlainTextResponse
-from typing import Optional, List
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException, BackgroundTasks, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, PlainTextResponse, StreamingResponse, JSONResponse
+from typing import Optional, List, Dict, Any, Union, Awaitable, Tuple
+import asyncio
 import json
+import uuid
 from pathlib import Path
 import logging
 from datetime import datetime
 from app.core.config import settings
+from app.core import metrics
+from app.core.tracing import Trace
 from app.services.ocr_service import OCRService
 from app.services.vcard_service import VCardService
-from app.services.markdown_service import MarkdownService
+from app.services.output_service import OutputService
+from app.services.param_sweep import ParameterSweep
+from app.services.ocr_executor import ocr_executor, OCRQueueFullError, OCRTimeoutError
+from app.services.quality_gate import ImageQualityError
+from app.services.image_converter import ImageConverter
+from app.services.language_prior import LanguagePrior
 from app.models.contact import Contact
 
 router = APIRouter()
@@ -16,93 +26,439 @@ logger = logging.getLogger(__name__)
 
 ocr_service = OCRService()
 vcard_service = VCardService()
+output_service = OutputService()
+language_prior = LanguagePrior() if settings.OCR_LANGUAGE_PRIOR else None
+
+if ocr_service.result_cache is not None:
+    metrics.register_result_cache(ocr_service.result_cache.stats)
+
+
+def _queue_full_exception() -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail="Zu viele OCR-Aufträge, bitte später erneut versuchen",
+        headers={"Retry-After": str(settings.OCR_RETRY_AFTER)}
+    )
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Prüft, ob `etag` in der Liste eines If-None-Match-Headers steht (schwacher Vergleich,
+    "W/" wird ignoriert). "*" passt nicht: der Client kann das Ergebnis dieses Uploads
+    nicht kennen, wenn er den ETag nicht mitschickt.
+    """
+    tags = {tag.strip() for tag in if_none_match.split(",")}
+    return etag in {tag[2:] if tag.startswith("W/") else tag for tag in tags}
+
+
+def _upload_path(filename: Optional[str]) -> Path:
+    """Eindeutiger Ablagepfad für einen Upload (verhindert Kollisionen gleicher Dateinamen)."""
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
+    return Path(settings.IMAGE_STORAGE_PATH) / f"{timestamp}_{uuid.uuid4().hex[:8]}_{Path(filename or 'upload').name}"
+
+
+def _store_upload(content: bytes, file_path: Path) -> None:
+    with open(file_path, "wb") as buffer:
+        buffer.write(content)
+
+
+async def _prepare_ocr_input(content: bytes, filename: Optional[str],
+                             background_tasks: BackgroundTasks) -> Union[bytes, str]:
+    """
+    Gibt die Eingabe für die OCR zurück: im Speichermodus die Upload-Bytes selbst,
+    sonst den Pfad der gespeicherten Datei.
+    """
+    if settings.INGEST_IN_MEMORY:
+        if settings.ARCHIVE_UPLOADS:
+            background_tasks.add_task(_store_upload, content, _upload_path(filename))
+        return content
+    file_path = _upload_path(filename)
+    await run_in_threadpool(_store_upload, content, file_path)
+    return str(file_path)
+
+
+def _tenant(x_tenant_id: Optional[str] = Header(None), x_api_key: Optional[str] = Header(None)) -> Optional[str]:
+    """Mandant für die gemerkte Sprache: `x-tenant-id`, sonst der API-Key."""
+    return x_tenant_id or x_api_key
+
+
+def _language_prior(tenant: Optional[str]) -> Optional[str]:
+    return language_prior.get(tenant) if language_prior is not None else None
+
+
+def _remember_language(tenant: Optional[str], trace: Trace) -> None:
+    """Merkt sich die Sprache, die bei lang="auto" gewonnen hat (nicht bei Cache-Treffern)."""
+    if language_prior is not None and 'language' in trace.info:
+        language_prior.record(tenant, trace.info['language']['selected'])
+
+
+def _trace_headers(trace: Trace) -> Dict[str, str]:
+    """Server-Timing und Debug-Trace für Antworten im Debug-Modus."""
+    return {
+        "Server-Timing": trace.server_timing(),
+        "X-Debug-Trace": json.dumps(trace.to_dict(), separators=(",", ":"))
+    }
+
+
+async def _run_item(ocr: Awaitable[Tuple[Contact, float, Trace]], accept: Optional[str],
+                    debug: bool, tenant: Optional[str], label: str) -> Dict[str, Any]:
+    """
+    Wartet auf die OCR eines Eintrags aus einem NDJSON-Stream (Datei, PDF-Seite, Karte) und
+    rendert das Ergebnis. Fehler werden nicht ausgelöst, sondern als Zeile mit `status_code`
+    zurückgegeben, damit die übrigen Einträge weiterlaufen; `label` benennt den Eintrag im Log.
+    """
+    try:
+        contact, reliability_score, trace = await ocr
+        _remember_language(tenant, trace)
+        with trace.stage("render"):
+            media_type, rendered = output_service.render(contact, accept)
+        metrics.observe_trace(trace)
+        result: Dict[str, Any] = {
+            "status": "ok",
+            "media_type": media_type,
+            "content": rendered,
+            "reliability_score": reliability_score
+        }
+        if debug:
+            result["trace"] = trace.to_dict()
+        return result
+    except OCRQueueFullError as e:
+        return {"status": "error", "status_code": 429, "detail": str(e)}
+    except OCRTimeoutError as e:
+        return {"status": "error", "status_code": 504, "detail": str(e)}
+    except ImageQualityError as e:
+        metrics.observe_quality_rejection(e.reasons)
+        return {"status": "error", "status_code": 422, "detail": e.to_detail()}
+    except Exception as e:
+        logger.error(f"Fehler bei der Verarbeitung von {label}: {str(e)}")
+        return {"status": "error", "status_code": 500, "detail": str(e)}
+
 
 @router.post("/ingest")
 async def ingest(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     accept: Optional[str] = Header(None),
     x_debug_mode: Optional[bool] = Header(None),
-    x_ocr_settings: Optional[str] = Header(None)
+    x_ocr_settings: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    tenant: Optional[str] = Depends(_tenant)
 ):
     """
     Verarbeitet eine hochgeladene Datei und extrahiert Kontaktdaten.
+    Mit `x-debug-mode: true` enthält die Antwort `Server-Timing` und `X-Debug-Trace`,
+    zusätzlich werden Debug-Artefakte in DEBUG_ARTIFACTS_PATH abgelegt.
     """
+    trace = Trace()
     try:
-        # Datei speichern
-        file_path = f"storage/{file.filename}"
-        with open(file_path, "wb") as buffer:
+        with trace.stage("upload_read"):
             content = await file.read()
-            buffer.write(content)
         
-        # OCR durchführen
-        contact, reliability_score = ocr_service.process_image(file_path)
+        # ETag aus Inhalt und OCR-Einstellungen; identische Uploads liefern dasselbe Ergebnis.
+        # Hat der Client das Ergebnis schon, schlägt die Vorbedingung fehl (RFC 9110 13.1.2:
+        # 304 nur für GET und HEAD, für POST 412)
+        cache_key = ocr_service.cache_key(content)
+        etag = f'"{cache_key}-{output_service.media_type(accept).split("/")[1]}"'
+        if if_none_match and _etag_matches(if_none_match, etag):
+            return Response(status_code=412, headers={"ETag": etag})
         
-        # Ausgabeformat bestimmen
-        if accept == "text/markdown":
-            markdown_service = MarkdownService()
-            content = markdown_service.create_markdown(contact)
-            return PlainTextResponse(content=content, media_type="text/markdown")
+        ocr_input = await _prepare_ocr_input(content, file.filename, background_tasks)
+        
+        # Cache-Treffer ohne Umweg über den Prozess-Pool; im Debug-Modus immer neu verarbeiten,
+        # damit Trace und Debug-Artefakte vollständig sind
+        cached = None
+        if ocr_service.result_cache is not None and not x_debug_mode:
+            cached = ocr_service.result_cache.get(cache_key)
+        if cached is not None:
+            contact, reliability_score = cached
+            trace.info['cache_hit'] = True
         else:
-            vcard_service = VCardService()
-            content = vcard_service.create_vcard(contact)
-            return Response(
-                content=content,
-                media_type="text/vcard",
-                headers={"Content-Disposition": f'attachment; filename="{contact.first_name}_{contact.last_name}.vcf"'}
+            # OCR im Prozess-Pool durchführen (blockiert den Event-Loop nicht)
+            contact, reliability_score, worker_trace = await ocr_executor.process_image(
+                ocr_input, debug=bool(x_debug_mode), prior=_language_prior(tenant)
             )
+            trace.merge(worker_trace)
+            _remember_language(tenant, worker_trace)
+        
+        # Ausgabeformat bestimmen
+        with trace.stage("render"):
+            media_type, rendered = output_service.render(contact, accept)
+        metrics.observe_trace(trace)
+        
+        headers = {"ETag": etag}
+        if x_debug_mode:
+            headers.update(_trace_headers(trace))
+        if media_type == "text/markdown":
+            return PlainTextResponse(content=rendered, media_type=media_type, headers=headers)
+        headers["Content-Disposition"] = f'attachment; filename="{contact.first_name}_{contact.last_name}.vcf"'
+        return Response(content=rendered, media_type=media_type, headers=headers)
         
+    except OCRQueueFullError as e:
+        logger.warning(str(e))
+        raise _queue_full_exception()
+    except OCRTimeoutError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except ImageQualityError as e:
+        metrics.observe_quality_rejection(e.reasons)
+        raise HTTPException(status_code=422, detail=e.to_detail())
     except Exception as e:
         logger.error(f"Fehler bei der Verarbeitung: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/ingest/batch")
+async def ingest_batch(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    accept: Optional[str] = Header(None),
+    x_debug_mode: Optional[bool] = Header(None),
+    tenant: Optional[str] = Depends(_tenant)
+):
+    """
+    Verarbeitet mehrere Dateien in einem Request.
+
+    Die Ergebnisse werden als NDJSON gestreamt, eine Zeile pro Datei in der
+    Reihenfolge der Fertigstellung; `index` verweist auf die Position im Upload.
+    """
+    if ocr_executor.is_full:
+        raise _queue_full_exception()
+
+    # Uploads einlesen, solange sie noch geöffnet sind
+    items = []
+    for index, file in enumerate(files):
+        ocr_input = await _prepare_ocr_input(await file.read(), file.filename, background_tasks)
+        items.append((index, file.filename, ocr_input))
+
+    async def process(index: int, filename: str, ocr_input: Union[bytes, str],
+                      semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"index": index, "filename": filename}
+        async with semaphore:
+            ocr = ocr_executor.process_image(ocr_input, debug=bool(x_debug_mode), prior=_language_prior(tenant))
+            result.update(await _run_item(ocr, accept, bool(x_debug_mode), tenant, str(filename)))
+        return result
+
+    async def stream():
+        # Ein Batch belegt höchstens MAX_WORKERS Slots, damit Einzel-Requests nicht verhungern
+        semaphore = asyncio.Semaphore(ocr_executor.max_workers)
+        tasks = [asyncio.create_task(process(*item, semaphore)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@router.post("/ingest/pdf")
+async def ingest_pdf(
+    file: UploadFile = File(...),
+    accept: Optional[str] = Header(None),
+    x_debug_mode: Optional[bool] = Header(None),
+    tenant: Optional[str] = Depends(_tenant)
+):
+    """
+    Verarbeitet ein PDF mit einer Karte pro Seite.
+
+    Die Seiten werden nacheinander gerendert (`PDF_DPI`, `PDF_GRAYSCALE`,
+    `PDF_THREAD_COUNT`) und direkt als Bild an den OCR-Pool übergeben; höchstens
+    MAX_WORKERS Seiten sind gleichzeitig in Bearbeitung. Die Ergebnisse werden als
+    NDJSON gestreamt, eine Zeile pro Seite in der Reihenfolge der Fertigstellung.
+    """
+    content = await file.read()
+    if not content.startswith(b"%PDF"):
+        raise HTTPException(status_code=400, detail="Die Datei ist kein PDF")
+    if ocr_executor.is_full:
+        raise _queue_full_exception()
+    try:
+        page_count = await run_in_threadpool(ImageConverter.pdf_page_count, content)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page_count > settings.PDF_MAX_PAGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Zu viele Seiten ({page_count} > {settings.PDF_MAX_PAGES})"
+        )
+
+    async def process(page_number: int, page, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"page": page_number, "filename": file.filename}
+        try:
+            ocr = ocr_executor.process_array(page, debug=bool(x_debug_mode), prior=_language_prior(tenant))
+            result.update(await _run_item(ocr, accept, bool(x_debug_mode), tenant, f"Seite {page_number}"))
+        finally:
+            semaphore.release()
+        return result
+
+    async def stream():
+        # Seiten erst rendern, wenn ein Slot frei ist: der Speicherbedarf hängt nicht von der Seitenzahl ab
+        semaphore = asyncio.Semaphore(ocr_executor.max_workers)
+        pages = ImageConverter.iter_pdf_pages(content)
+        tasks = set()
+        try:
+            while True:
+                await semaphore.acquire()
+                try:
+                    item = await run_in_threadpool(next, pages, None)
+                except Exception as e:
+                    semaphore.release()
+                    logger.error(f"Fehler beim Rendern des PDFs: {str(e)}")
+                    yield json.dumps({"status": "error", "status_code": 500, "detail": str(e)}, ensure_ascii=False) + "\n"
+                    break
+                if item is None:
+                    semaphore.release()
+                    break
+                tasks.add(asyncio.create_task(process(*item, semaphore)))
+                for task in [task for task in tasks if task.done()]:
+                    tasks.discard(task)
+                    yield json.dumps(task.result(), ensure_ascii=False) + "\n"
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+            try:
+                pages.close()
+            except ValueError:
+                # Rendern läuft noch im Threadpool; der Generator räumt beim Abbau auf
+                pass
+
+    return StreamingResponse(
+        stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Page-Count": str(page_count)}
+    )
+
+@router.post("/ingest/cards")
+async def ingest_cards(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    accept: Optional[str] = Header(None),
+    x_debug_mode: Optional[bool] = Header(None),
+    tenant: Optional[str] = Depends(_tenant)
+):
+    """
+    Verarbeitet ein Foto mit mehreren Visitenkarten (z.B. auf einem Tisch ausgelegt).
+
+    Die Karten werden in einem Auftrag gesucht und entzerrt (höchstens `OCR_MAX_CARDS`)
+    und anschließend parallel im OCR-Pool verarbeitet, höchstens MAX_WORKERS gleichzeitig.
+    Die Ergebnisse werden als NDJSON gestreamt, eine Zeile pro Karte in der Reihenfolge
+    der Fertigstellung; `card` ist die Position in Lesereihenfolge, `quad` enthält die
+    Ecken im Foto.
+    """
+    content = await file.read()
+    ocr_input = await _prepare_ocr_input(content, file.filename, background_tasks)
+    try:
+        cards, segment_trace = await ocr_executor.segment_cards(ocr_input)
+    except OCRQueueFullError as e:
+        logger.warning(str(e))
+        raise _queue_full_exception()
+    except OCRTimeoutError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Fehler bei der Kartensegmentierung: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    metrics.observe_trace(segment_trace)
+
+    async def process(index: int, quad: Optional[List[List[int]]], card,
+                      semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        result: Dict[str, Any] = {"card": index, "quad": quad, "filename": file.filename}
+        async with semaphore:
+            ocr = ocr_executor.process_array(card, debug=bool(x_debug_mode), prior=_language_prior(tenant))
+            result.update(await _run_item(ocr, accept, bool(x_debug_mode), tenant, f"Karte {index}"))
+        return result
+
+    async def stream():
+        semaphore = asyncio.Semaphore(ocr_executor.max_workers)
+        tasks = [
+            asyncio.create_task(process(index, quad, card, semaphore))
+            for index, (quad, card) in enumerate(cards)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    headers = {"X-Card-Count": str(len(cards))}
+    if x_debug_mode:
+        headers.update(_trace_headers(segment_trace))
+    return StreamingResponse(stream(), media_type="application/x-ndjson", headers=headers)
+
 @router.post("/ocr/debug")
 async def debug_ocr(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    x_ocr_settings: Optional[str] = Header(None)
+    x_ocr_settings: Optional[str] = Header(None),
+    x_debug_mode: Optional[bool] = Header(None)
 ):
     """
     Debug-Endpoint für OCR-Optimierung.
+
+    Bewertet Kontrast/Gamma/Rotation-Kombinationen parallel im OCR-Pool. Über
+    `x-ocr-settings` lassen sich das Raster (`contrast`, `gamma`, `rotation`) sowie
+    `time_budget` (Sekunden) und `score_threshold` (vorzeitiger Abbruch) vorgeben.
     """
+    trace = Trace()
     try:
-        # Datei speichern
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H%M%S")
-        file_path = Path(settings.STORAGE_PATH) / f"{timestamp}_{file.filename}"
-        
-        with open(file_path, "wb") as buffer:
+        with trace.stage("upload_read"):
             content = await file.read()
-            buffer.write(content)
         
         # OCR-Parameter verarbeiten
-        ocr_params = {}
-        if x_ocr_settings:
-            try:
-                ocr_params = json.loads(x_ocr_settings)
-            except json.JSONDecodeError:
-                raise HTTPException(
-                    status_code=400,
-                    detail="Ungültige OCR-Parameter"
-                )
+        try:
+            options = ParameterSweep.parse_settings(x_ocr_settings)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Ungültige OCR-Parameter: {str(e)}"
+            )
         
-        # Debug-Verarbeitung durchführen
-        debug_results = ocr_service.image_processor.debug_process(file_path)
+        ocr_input = await _prepare_ocr_input(content, file.filename, background_tasks)
+        
+        # Debug-Verarbeitung im Prozess-Pool durchführen
+        sweep, worker_trace = await ocr_executor.sweep_parameters(ocr_input, options)
+        trace.merge(worker_trace)
         
         # Ergebnisse aufbereiten
         results = {}
-        for key, (_, score) in debug_results.items():
+        for key, result in sweep["results"].items():
             results[key] = {
-                "score": score,
+                "score": result["score"],
                 "parameters": key.split("_")
             }
         
-        return {
+        response = {
             "filename": file.filename,
             "results": results,
-            "best_score": max(results.items(), key=lambda x: x[1]["score"])
+            "best_score": (sweep["best"][0], results[sweep["best"][0]]) if sweep["best"] else None,
+            "sweep": {
+                "candidates": sweep["candidates"],
+                "evaluated": sweep["evaluated"],
+                "stopped": sweep["stopped"],
+                "elapsed_ms": sweep["elapsed_ms"]
+            }
         }
+        if not x_debug_mode:
+            return response
+        response["trace"] = trace.to_dict()
+        return JSONResponse(content=response, headers={"Server-Timing": trace.server_timing()})
         
+    except HTTPException:
+        raise
+    except OCRQueueFullError as e:
+        logger.warning(str(e))
+        raise _queue_full_exception()
+    except OCRTimeoutError as e:
+        logger.error(str(e))
+        raise HTTPException(status_code=504, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Fehler beim OCR-Debug: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Debug-Fehler: {str(e)}"
-        ) 
\ No newline at end of file
+        )
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, UploadFile, File, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from typing import Optional
+import logging
+from app.core.config import settings
+from app.core import metrics
+from app.services.job_broker import get_job_broker
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+job_broker = get_job_broker()
+metrics.JOB_QUEUE_DEPTH.set_function(job_broker.queue_depth)
+
+@router.post("/jobs", status_code=202)
+async def create_job(
+    file: UploadFile = File(...),
+    accept: Optional[str] = Header(None),
+    idempotency_key: Optional[str] = Header(None)
+):
+    """
+    Nimmt eine Datei an und reiht sie zur asynchronen OCR ein.
+    Gibt sofort die Job-ID zurück; das Ergebnis liefert GET /jobs/{job_id}.
+    """
+    try:
+        content = await file.read()
+        job = await run_in_threadpool(
+            job_broker.enqueue,
+            content,
+            file.filename or "",
+            accept,
+            settings.DEFAULT_LANGUAGE,
+            idempotency_key
+        )
+        return JSONResponse(
+            status_code=202,
+            content=job.to_response(),
+            headers={"Location": f"/api/v1/jobs/{job.id}"}
+        )
+    except Exception as e:
+        logger.error(f"Fehler beim Anlegen des Jobs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Gibt Status und, falls fertig, das Ergebnis eines Jobs zurück.
+    """
+    job = await run_in_threadpool(job_broker.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job nicht gefunden")
+    return job.to_response()
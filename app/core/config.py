@@ -14,11 +14,78 @@ class Settings(BaseSettings):
     STORAGE_PATH: Path = Path("storage")
     IMAGE_STORAGE_PATH: Path = STORAGE_PATH / "images"
     TEXT_STORAGE_PATH: Path = STORAGE_PATH / "text_files"
+
+    # Uploads im Speicher dekodieren statt sie vor der OCR auf die Platte zu schreiben
+    INGEST_IN_MEMORY: bool = True
+    # Originale zusätzlich im Hintergrund in IMAGE_STORAGE_PATH archivieren
+    ARCHIVE_UPLOADS: bool = False
+
+    # Job-Warteschlange
+    JOB_BROKER: str = "sqlite"
+    JOB_DB_PATH: Path = STORAGE_PATH / "jobs.sqlite3"
+    JOB_UPLOAD_PATH: Path = STORAGE_PATH / "jobs"
+    JOB_LEASE_TIMEOUT: int = 120  # Sekunden ohne Lebenszeichen des Workers, bis ein reservierter Job erneut vergeben wird
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_POLL_INTERVAL: float = 1.0
     
     # OCR Settings
     TESSERACT_CMD: str = "/usr/local/bin/tesseract"
-    DEFAULT_LANGUAGE: str = "deu"
+    DEFAULT_LANGUAGE: str = "deu"  # Tesseract-Sprache(n), z.B. "deu" oder "deu+eng"; "auto" = OCR_LANGUAGES parallel (mehr CPU)
+    OCR_LANGUAGES: str = "deu,eng"  # Kandidaten für "auto", es gewinnt die höchste mittlere Wortkonfidenz
+    OCR_LANGUAGE_PRIOR: bool = True  # Gewinnersprache je Mandant bzw. API-Key merken und zuerst allein versuchen
+    OCR_LANGUAGE_PRIOR_CONFIDENCE: float = 90.0  # mittlere Wortkonfidenz, ab der die gemerkte Sprache ohne Rennen übernommen wird
+    OCR_LANGUAGE_PRIOR_SIZE: int = 10000  # gemerkte Mandanten (LRU, je API-Prozess)
     OCR_TIMEOUT: int = 30
+    OCR_ENGINE: str = "auto"  # "auto", "tesserocr" oder "pytesseract"
+    OCR_QUEUE_SIZE: int = 16  # Wartende Aufträge zusätzlich zu MAX_WORKERS
+    OCR_RETRY_AFTER: int = 5  # Sekunden für den Retry-After-Header bei voller Warteschlange
+    OCR_TARGET_TEXT_HEIGHT: int = 30  # Zeichenhöhe in px, auf die vor der OCR skaliert wird (0 = aus)
+    OCR_DECODE_TARGET_SIDE: int = 2000  # Uploads beim Dekodieren verkleinern, lange Seite mindestens so lang (0 = volle Auflösung)
+    OCR_CARD_DETECTION: bool = True  # Kartenumriss suchen und perspektivisch entzerren
+    OCR_ORIENTATION_DETECTION: bool = True  # Ausrichtung (0/90/180/270°) vorab auf einem Vorschaubild bestimmen
+    OCR_ORIENTATION_THUMBNAIL_SIDE: int = 600  # lange Seite des Vorschaubilds für die Ausrichtungserkennung
+    OCR_LINE_REFINEMENT: bool = True  # Zeilen mit geringer Konfidenz einzeln nachlesen (psm 7)
+    OCR_LINE_MIN_CONFIDENCE: float = 70.0  # mittlere Wortkonfidenz (0-100), unter der nachgelesen wird
+    OCR_LINE_WORKERS: int = 4  # Threads je OCR-Prozess für das Nachlesen
+    OCR_MAX_CARDS: int = 20  # höchstens so viele Karten pro Foto (/ingest/cards)
+    OCR_CARDS_DECODE_TARGET_SIDE: int = 4000  # wie OCR_DECODE_TARGET_SIDE, für Fotos mit mehreren Karten
+
+    # Qualitätsprüfung vor der OCR (auf einem Vorschaubild)
+    QUALITY_GATE_ENABLED: bool = True
+    QUALITY_GATE_ACTION: str = "enhance"  # "reject": 422 bei jedem Befund, "enhance": grenzwertige Bilder nachbessern
+    QUALITY_THUMBNAIL_SIDE: int = 512  # längste Seite des Vorschaubilds in px
+    QUALITY_MIN_SHARPNESS: float = 50.0  # Varianz des Laplace-Filters
+    QUALITY_REJECT_SHARPNESS: float = 10.0  # darunter auch mit "enhance" ablehnen
+    QUALITY_MIN_CONTRAST: float = 30.0  # Abstand der Grauwerte von Schrift und Papier
+    QUALITY_MIN_BRIGHTNESS: float = 40.0  # Grauwert des Papiers, darunter "too_dark"
+    QUALITY_MAX_BRIGHTNESS: float = 235.0  # Grauwert der Schrift, darüber "too_bright"
+    QUALITY_MIN_TEXT_DENSITY: float = 0.002  # Anteil textartiger Pixel (0 - 1)
+
+    # PDF-Eingaben (seitenweises Rendering mit poppler)
+    PDF_DPI: int = 300
+    PDF_GRAYSCALE: bool = True  # poppler rendert direkt in Graustufen
+    PDF_THREAD_COUNT: int = 2  # parallele poppler-Prozesse, zugleich Seiten je Block
+    PDF_MAX_PAGES: int = 200
+
+    # Ergebnis-Cache (Schlüssel: SHA-256 des Uploads + OCR-Einstellungen)
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_SIZE: int = 1024  # Einträge im Speicher (LRU)
+    RESULT_CACHE_PATH: Path = STORAGE_PATH / "cache"
+    RESULT_CACHE_MAX_FILES: int = 10000  # Einträge in RESULT_CACHE_PATH, die ältesten werden gelöscht
+
+    # Debug-Artefakte (Konturen-Overlay, Zuschnitt, Binärbild) nur auf Anfrage
+    # (x-debug-mode) oder für einen zufälligen Anteil der Requests schreiben
+    DEBUG_ARTIFACTS_PATH: Path = STORAGE_PATH / "debug"
+    DEBUG_ARTIFACTS_SAMPLE_RATE: float = 0.0  # 0.0 - 1.0
+    DEBUG_ARTIFACTS_INCLUDE_TEXT: bool = False  # OCR-Text mit ablegen (personenbezogene Daten!)
+    DEBUG_ARTIFACTS_QUEUE_SIZE: int = 8  # darüber hinaus werden Artefakte verworfen
+    DEBUG_ARTIFACTS_MAX_FILES: int = 500
+
+    # Parameter-Sweep des Debug-Endpoints (/ocr/debug)
+    SWEEP_MAX_WORKERS: int = 4  # Threads je Sweep
+    SWEEP_MAX_CANDIDATES: int = 125
+    SWEEP_TIME_BUDGET: float = 10.0  # Sekunden; danach werden offene Kandidaten verworfen
+    SWEEP_SCORE_THRESHOLD: Optional[float] = None  # Abbruch, sobald ein Kandidat den Score erreicht
     
     # Logging
     LOG_LEVEL: str = "INFO"
@@ -31,7 +98,7 @@ class Settings(BaseSettings):
     # OCR-Einstellungen
     TESSERACT_PATH: str = "/usr/bin/tesseract"
     TESSDATA_PREFIX: str = "/usr/share/tesseract-ocr/4.00/tessdata"
-    TESSERACT_LANG: str = "deu"
+    TESSERACT_LANG: Optional[str] = None  # veraltet, gilt als DEFAULT_LANGUAGE, wenn diese nicht gesetzt ist
 
     # Sicherheit
     API_KEY: str = "your-api-key-here"
@@ -80,6 +147,10 @@ print("DEBUG: Starte Settings-Initialisierung")
 settings = Settings()
 print(f"DEBUG: Settings erfolgreich initialisiert mit ALLOWED_ORIGINS = {settings.ALLOWED_ORIGINS!r}")
 
+# Eine Quelle für die OCR-Sprache: TESSERACT_LANG nur übernehmen, wenn DEFAULT_LANGUAGE fehlt
+if settings.TESSERACT_LANG and "DEFAULT_LANGUAGE" not in settings.model_fields_set:
+    settings.DEFAULT_LANGUAGE = settings.TESSERACT_LANG
+
 # Ensure storage directories exist
 os.makedirs(settings.IMAGE_STORAGE_PATH, exist_ok=True)
 os.makedirs(settings.TEXT_STORAGE_PATH, exist_ok=True) 
\ No newline at end of file
@@ -0,0 +1,73 @@
+from typing import Callable, Dict, Iterable, List
+from prometheus_client import Counter, Histogram, Gauge, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from prometheus_client.registry import Collector
+from app.core.tracing import Trace
+
+# Laufzeit je Verarbeitungsschritt (upload_read, decode, segment, quality, enhance, contours,
+# card, crop, normalize, denoise, orientation, otsu, tesseract, refine, extract, render)
+STAGE_DURATION = Histogram(
+    "ocr_stage_duration_seconds",
+    "Laufzeit der einzelnen Verarbeitungsschritte",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+RELIABILITY_SCORE = Histogram(
+    "ocr_reliability_score",
+    "Zuverlässigkeits-Score der extrahierten Kontakte",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+
+INPUT_MEGAPIXELS = Histogram(
+    "ocr_input_megapixels",
+    "Auflösung der Eingabebilder in Megapixeln",
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 12, 16, 24, 48)
+)
+
+QUALITY_REJECTIONS = Counter(
+    "ocr_quality_rejections",
+    "Vor der OCR abgelehnte Bilder je Befund",
+    ["reason"]
+)
+
+OCR_QUEUE_DEPTH = Gauge("ocr_queue_depth", "Wartende Aufträge im OCR-Pool")
+OCR_IN_FLIGHT = Gauge("ocr_in_flight", "Laufende Aufträge im OCR-Pool")
+JOB_QUEUE_DEPTH = Gauge("ocr_job_queue_depth", "Wartende Aufträge in der Job-Warteschlange")
+
+
+class ResultCacheCollector(Collector):
+    """Exportiert die Zähler eines ResultCache."""
+
+    def __init__(self, stats: Callable[[], Dict[str, int]]):
+        self._stats = stats
+
+    def collect(self) -> Iterable[Metric]:
+        stats = self._stats()
+        for name in ("hits", "misses", "evictions"):
+            counter = CounterMetricFamily(f"ocr_result_cache_{name}", f"Ergebnis-Cache: {name}")
+            counter.add_metric([], stats[name])
+            yield counter
+        size = GaugeMetricFamily("ocr_result_cache_entries", "Einträge im Ergebnis-Cache (Speicher)")
+        size.add_metric([], stats["size"])
+        yield size
+
+
+def register_result_cache(stats: Callable[[], Dict[str, int]]) -> None:
+    REGISTRY.register(ResultCacheCollector(stats))
+
+
+def observe_trace(trace: Trace) -> None:
+    """Überträgt die Messwerte eines Requests in die Histogramme."""
+    for stage, duration in trace.stages.items():
+        STAGE_DURATION.labels(stage=stage).observe(duration)
+    if "reliability_score" in trace.info:
+        RELIABILITY_SCORE.observe(trace.info["reliability_score"])
+    if "input_megapixels" in trace.info:
+        INPUT_MEGAPIXELS.observe(trace.info["input_megapixels"])
+
+
+def observe_quality_rejection(reasons: List[str]) -> None:
+    """Zählt ein von der Qualitätsprüfung abgelehntes Bild."""
+    for reason in reasons:
+        QUALITY_REJECTIONS.labels(reason=reason).inc()
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator
+
+
+class Trace:
+    """
+    Sammelt Laufzeiten der einzelnen Verarbeitungsschritte eines Requests.
+
+    Je Schritt werden Wall-Clock- und CPU-Zeit erfasst, dazu beliebige Zusatzinfos
+    (Bildgrößen, Tesseract-Konfiguration, ...). Ein Trace ist picklebar und wird aus
+    den OCR-Worker-Prozessen an den API-Prozess zurückgegeben, wo er in die Metriken
+    und optional in die Antwort (Server-Timing, Debug-Trace) einfließt.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self.cpu: Dict[str, float] = {}
+        self.info: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Misst die Dauer des Blocks; mehrfach gemessene Schritte werden addiert."""
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            self.cpu[name] = self.cpu.get(name, 0.0) + time.process_time() - cpu_start
+
+    def merge(self, other: "Trace") -> "Trace":
+        for name, duration in other.stages.items():
+            self.stages[name] = self.stages.get(name, 0.0) + duration
+        for name, duration in other.cpu.items():
+            self.cpu[name] = self.cpu.get(name, 0.0) + duration
+        self.info.update(other.info)
+        return self
+
+    def server_timing(self) -> str:
+        """Formatiert die Schritte als Wert für den `Server-Timing`-Header."""
+        return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in self.stages.items())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {
+                name: {
+                    "wall_ms": round(duration * 1000, 2),
+                    "cpu_ms": round(self.cpu.get(name, 0.0) * 1000, 2)
+                }
+                for name, duration in self.stages.items()
+            },
+            "info": self.info
+        }
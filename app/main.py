@@ -1,9 +1,11 @@
-from fastapi import FastAPI, Depends, HTTPException, Security
+from fastapi import FastAPI, Depends, HTTPException, Security, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security.api_key import APIKeyHeader
 import logging
-from app.api.endpoints import ingest
+from prometheus_client import generate_latest, CONTENT_TYPE_LATEST
+from app.api.endpoints import ingest, jobs
 from app.core.config import settings
+from app.services.ocr_executor import ocr_executor
 
 # Logger konfigurieren
 logging.basicConfig(
@@ -38,15 +40,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def shutdown_ocr_pool():
+    ocr_executor.shutdown()
+
 # Health Check (ohne API-Key)
 @app.get("/health", tags=["Health"])
 async def health_check():
     return {"status": "healthy"}
 
+# Prometheus-Metriken (ohne API-Key, wird von Prometheus abgefragt)
+if settings.ENABLE_METRICS:
+    @app.get(settings.METRICS_PATH, include_in_schema=False)
+    async def metrics_endpoint():
+        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
 # Router einbinden (mit API-Key)
 app.include_router(
     ingest.router,
     prefix="/api/v1",
     tags=["Ingest"],
     dependencies=[Depends(verify_api_key)]
-) 
\ No newline at end of file
+)
+
+app.include_router(
+    jobs.router,
+    prefix="/api/v1",
+    tags=["Jobs"],
+    dependencies=[Depends(verify_api_key)]
+)
+ 
\ No newline at end of file
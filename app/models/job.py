@@ -0,0 +1,40 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Any
+from datetime import datetime
+from enum import Enum
+from app.core.config import settings
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    id: str
+    status: JobStatus = JobStatus.QUEUED
+    filename: str = Field(default="")
+    accept: Optional[str] = None
+    lang: str = Field(default=settings.DEFAULT_LANGUAGE)
+    payload_path: str = Field(default="")
+    attempts: int = Field(default=0)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: datetime = Field(default_factory=datetime.now)
+
+    def to_response(self) -> Dict[str, Any]:
+        """Gibt die öffentliche Darstellung für die Job-API zurück."""
+        response: Dict[str, Any] = {
+            "job_id": self.id,
+            "status": self.status.value,
+            "filename": self.filename,
+            "attempts": self.attempts,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat()
+        }
+        if self.status == JobStatus.DONE:
+            response["result"] = self.result
+        elif self.status == JobStatus.FAILED:
+            response["error"] = self.error
+        return response
@@ -0,0 +1,224 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LineFeatures:
+    """Merkmale einer Textzeile; werden einmal berechnet und von allen Feldregeln genutzt."""
+
+    text: str
+    words: List[str]
+    digits: int  # Anzahl der Ziffern (str.isdigit)
+    flags: int  # Treffer der Schlüsselwortlisten (Bitmaske, siehe ContactExtractor.KEYWORDS)
+    postal: bool  # beginnt mit fünf Ziffern (PLZ)
+    numeric: bool  # nur Ziffern, Leerzeichen und - + ( )
+    capitalized: bool  # Namensform: mindestens zwei Wörter, keine Ziffern, alle groß, keines über 20 Zeichen
+
+
+class ContactExtractor:
+    """
+    Ordnet die Zeilen eines OCR-Textes den Kontaktfeldern zu.
+
+    Jede Zeile wird einmal klassifiziert (siehe classify): alle Schlüsselwortlisten
+    werden mit einem einzigen vorkompilierten Muster durchsucht, einem Präfixbaum
+    (keyword_pattern), der an jeder Position das längste passende Schlüsselwort liefert.
+    Jedes Schlüsselwort trägt die Bits aller Listen, deren Einträge in ihm enthalten sind
+    ("automobilverkäufer" auch "auto"), so dass auch überlappende Treffer erfasst werden.
+    Die Feldregeln arbeiten danach nur noch auf den Merkmalen.
+    """
+
+    # Bits der Schlüsselwortlisten
+    SKIP_NAME = 1  # keine Namenszeile
+    SKIP_CONTACT = 2  # Kontaktangaben, weder Position noch Firma
+    SKIP_FALLBACK = 4  # keine Namenszeile (Rückfallsuche, siehe fallback_name)
+    SKIP_STREET = 8  # keine Straße
+    POSITION = 16  # typische Positionstitel
+    COMPANY_CANDIDATE = 32  # Rechtsform in Kleinschreibung, siehe COMPANY
+    COMPANY = 64  # Rechtsform in exakter Schreibweise (COMPANY_INDICATORS)
+
+    # Schlüsselwörter je Bit; gesucht wird im klein geschriebenen Text
+    KEYWORDS = {
+        SKIP_NAME: (
+            '@', '/', '&', 'www', 'http', 'tel', 'fax', 'mobil', 'gmbh', 'ag', 'kg', 'ohg',
+            'ltd', 'corp', 'feser', 'graf', 'auto', 'gruppe', 'group'
+        ),
+        SKIP_CONTACT: ('@', '/', 'www', 'http', 'tel', 'fax', 'mobil'),
+        SKIP_FALLBACK: ('@', '/', 'www', 'http', 'tel', 'fax', 'mobil', 'gmbh', 'ag', 'kg'),
+        SKIP_STREET: ('@', 'tel', 'fax', 'mobil', 'www'),
+        POSITION: (
+            'geschäftsführer', 'leiter', 'manager', 'direktor', 'vorstand',
+            'berater', 'verkauf', 'vertrieb', 'consultant', 'mitarbeiter',
+            'spezialist', 'experte', 'chef', 'inhaber', 'verkaufsberater',
+            'automobilverkäufer', 'verkäufer', 'assistent', 'assistant'
+        ),
+        COMPANY_CANDIDATE: ('gmbh', 'ag', 'kg', 'ohg', 'ltd', 'corp', '& co')
+    }
+    COMPANY_INDICATORS = ('GmbH', 'AG', 'KG', 'OHG', 'Ltd', 'Corp', '& Co')
+
+    POSTAL_PATTERN = re.compile(r'^\d{5}')
+    NUMERIC_PATTERN = re.compile(r'^[\d\s\-+()]+$')
+    EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+    def __init__(self):
+        keywords = sorted({keyword for group in self.KEYWORDS.values() for keyword in group})
+        self.keyword_pattern = re.compile('(?=(' + self.keyword_pattern_source(keywords) + '))')
+        self.keyword_flags = {
+            keyword: sum(
+                flag for flag, group in self.KEYWORDS.items()
+                if any(entry in keyword for entry in group)
+            )
+            for keyword in keywords
+        }
+
+    @staticmethod
+    def keyword_pattern_source(keywords: List[str]) -> str:
+        """
+        Regulärer Ausdruck für einen Präfixbaum der Schlüsselwörter: je Position wird nur
+        der Zweig des nächsten Zeichens verfolgt, gierige optionale Gruppen liefern das
+        längste Schlüsselwort. Kürzere Treffer an derselben Position sind darin enthalten.
+        """
+        trie: Dict[str, Any] = {}
+        for keyword in keywords:
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        def build(node: Dict[str, Any]) -> str:
+            branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return f'(?:{body})?' if '' in node else body
+
+        return build(trie)
+
+    def classify(self, text: str) -> List[LineFeatures]:
+        """Zerlegt den Text in nicht leere Zeilen und berechnet deren Merkmale."""
+        features = []
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            flags = 0
+            for keyword in self.keyword_pattern.findall(line.lower()):
+                flags |= self.keyword_flags[keyword]
+            if flags & self.COMPANY_CANDIDATE and any(indicator in line for indicator in self.COMPANY_INDICATORS):
+                flags |= self.COMPANY
+            words = line.split()
+            digits = sum(map(str.isdigit, line))
+            features.append(LineFeatures(
+                text=line,
+                words=words,
+                digits=digits,
+                flags=flags,
+                postal=self.POSTAL_PATTERN.match(line) is not None,
+                numeric=self.NUMERIC_PATTERN.match(line) is not None,
+                capitalized=len(words) >= 2 and digits == 0 and
+                            all(word[0].isupper() for word in words if len(word) > 1) and
+                            all(len(word) <= 20 for word in words)
+            ))
+        return features
+
+    def extract(self, lines: List[LineFeatures]) -> Dict[str, Any]:
+        """Ordnet die klassifizierten Zeilen den Kontaktfeldern zu."""
+        try:
+            contact_data: Dict[str, Any] = {
+                'first_name': '',
+                'last_name': '',
+                'company': None,
+                'position': None,
+                'email': None,
+                'phone': '',
+                'secondary_phone': None,
+                'street': '',
+                'city': '',
+                'postal_code': '',
+                'country': 'Deutschland'
+            }
+
+            # Name: erste Zeile in Namensform ohne Firmen- und Kontaktangaben
+            name: Optional[str] = None
+            for line in lines:
+                if line.capitalized and not (line.flags & self.SKIP_NAME or line.postal or line.numeric):
+                    contact_data['first_name'] = line.words[0]
+                    contact_data['last_name'] = ' '.join(line.words[1:])
+                    name = ' '.join(line.words)
+                    break
+
+            # Position vor der Firma (Titel oder Zeile direkt über der Firma), dann Firma
+            position: Optional[str] = None
+            company: Optional[str] = None
+            for i, line in enumerate(lines):
+                if line.text == name or line.flags & self.SKIP_CONTACT or line.postal or line.numeric:
+                    continue
+                if position is None and company is None:
+                    if line.flags & self.POSITION or (i + 1 < len(lines) and lines[i + 1].flags & self.COMPANY):
+                        position = line.text
+                        continue
+                if company is None and line.flags & self.COMPANY:
+                    company = line.text
+                    break
+
+            # Position nach der Firma: Titel, sonst die erste kurze Zeile
+            if company is not None and position is None:
+                for line in lines:
+                    if line.text == company or line.text == name or \
+                       line.flags & self.SKIP_CONTACT or line.postal or line.numeric or line.flags & self.COMPANY:
+                        continue
+                    if line.flags & self.POSITION or len(line.words) <= 5:
+                        position = line.text
+                        break
+            contact_data['position'] = position
+            contact_data['company'] = company
+
+            # E-Mail
+            for line in lines:
+                if '@' in line.text and '.' in line.text:
+                    email = line.text.replace(' ', '')
+                    if self.EMAIL_PATTERN.match(email):
+                        contact_data['email'] = email
+                        break
+
+            # Telefonnummern: Zeilen mit mehr als fünf Ziffern
+            for line in lines:
+                if line.digits > 5:
+                    cleaned = ''.join(char for char in line.text if char.isdigit() or char in '+ -').strip()
+                    if not contact_data['phone']:
+                        contact_data['phone'] = cleaned
+                    else:
+                        contact_data['secondary_phone'] = cleaned
+                        break
+
+            # Adresse (von unten nach oben)
+            for line in reversed(lines):
+                if line.postal and len(line.words) >= 2:
+                    contact_data['postal_code'] = line.words[0]
+                    contact_data['city'] = ' '.join(line.words[1:])
+                    continue
+                if not contact_data['street'] and not line.flags & self.SKIP_STREET:
+                    contact_data['street'] = line.text
+
+            logger.debug("Extrahierte Daten:\n%s", contact_data)
+            return contact_data
+
+        except Exception as e:
+            logger.error(f"Fehler bei Extraktion der Kontaktdaten: {str(e)}")
+            raise
+
+    def fallback_name(self, lines: List[LineFeatures]) -> Optional[Tuple[str, str]]:
+        """
+        Vor- und Nachname, wenn extract keinen Namen gefunden hat: erste Zeile mit
+        mindestens zwei Wörtern ohne Ziffern, Firmen- und Kontaktangaben (ohne Prüfung
+        der Großschreibung).
+        """
+        for line in lines:
+            if line.flags & self.SKIP_FALLBACK or line.postal or line.numeric:
+                continue
+            if len(line.words) >= 2 and line.digits == 0:
+                return line.words[0], ' '.join(line.words[1:])
+        return None
@@ -0,0 +1,124 @@
+import os
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+import cv2
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DebugArtifactWriter:
+    """
+    Schreibt Debug-Artefakte (Konturen-Overlay, Zuschnitt bzw. entzerrte Karte, Binärbild, OCR-Text) in einem
+    Hintergrund-Thread.
+
+    Der Request übergibt nur Referenzen auf die ohnehin vorhandenen Arrays; Zeichnen,
+    JPEG-Kodierung und Schreiben passieren im Thread. Die Warteschlange ist begrenzt:
+    ist sie voll, wird das Artefakt verworfen statt den Request zu bremsen. Im Verzeichnis
+    bleiben höchstens `max_files` Dateien, ältere werden gelöscht.
+    """
+
+    def __init__(self, debug_path: Path = settings.DEBUG_ARTIFACTS_PATH,
+                 queue_size: int = settings.DEBUG_ARTIFACTS_QUEUE_SIZE,
+                 max_files: int = settings.DEBUG_ARTIFACTS_MAX_FILES):
+        self.debug_path = Path(debug_path)
+        self.max_files = max(1, max_files)
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+
+    def submit(self, name: str, artifacts: Dict[str, Any]) -> bool:
+        """
+        Reiht die Artefakte eines Requests ein. Gibt False zurück, wenn sie wegen voller
+        Warteschlange verworfen wurden. Die übergebenen Arrays dürfen danach nicht mehr
+        verändert werden.
+        """
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((name, artifacts))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            logger.warning(f"Debug-Artefakte verworfen (Warteschlange voll): {name}")
+            return False
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    os.makedirs(self.debug_path, exist_ok=True)
+                    self._thread = threading.Thread(target=self._run, name="debug-writer", daemon=True)
+                    self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            name, artifacts = self._queue.get()
+            try:
+                self._write(name, artifacts)
+                self.written += 1
+                self._enforce_retention()
+            except Exception as e:
+                logger.error(f"Fehler beim Schreiben der Debug-Artefakte {name}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _write(self, name: str, artifacts: Dict[str, Any]) -> None:
+        image = artifacts.get("image")
+        crop_box = artifacts.get("crop_box")
+        if image is not None:
+            overlay = image.copy() if image.ndim == 3 else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            if artifacts.get("contours"):
+                cv2.drawContours(overlay, artifacts["contours"], -1, (0, 255, 0), 2)
+            if crop_box:
+                x_min, y_min, x_max, y_max = crop_box
+                cv2.rectangle(overlay, (x_min, y_min), (x_max, y_max), (0, 0, 255), 2)
+                cv2.imwrite(str(self.debug_path / f"{name}.crop.jpg"), image[y_min:y_max, x_min:x_max])
+            if artifacts.get("card_quad") is not None:
+                cv2.polylines(overlay, [artifacts["card_quad"]], True, (255, 0, 0), 2)
+            cv2.imwrite(str(self.debug_path / f"{name}.contours.jpg"), overlay)
+        if artifacts.get("card") is not None:
+            cv2.imwrite(str(self.debug_path / f"{name}.crop.jpg"), artifacts["card"])
+        if artifacts.get("binary") is not None:
+            cv2.imwrite(str(self.debug_path / f"{name}.binary.png"), artifacts["binary"])
+        if artifacts.get("text") is not None:
+            (self.debug_path / f"{name}.txt").write_text(artifacts["text"], encoding="utf-8")
+        logger.debug(f"Debug-Artefakte gespeichert: {self.debug_path / name}")
+
+    def _enforce_retention(self) -> None:
+        """Löscht die ältesten Dateien, sobald mehr als `max_files` vorhanden sind."""
+        entries = []
+        for entry in os.scandir(self.debug_path):
+            try:
+                if entry.is_file():
+                    entries.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue  # bereits von einem anderen Prozess entfernt
+        if len(entries) <= self.max_files:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def flush(self) -> None:
+        """Wartet, bis alle eingereihten Artefakte geschrieben sind."""
+        if self._thread is not None:
+            self._queue.join()
+
+
+_writer: Optional[DebugArtifactWriter] = None
+
+
+def get_debug_writer() -> DebugArtifactWriter:
+    """Gibt den Debug-Writer dieses Prozesses zurück (eine Instanz pro Prozess)."""
+    global _writer
+    if _writer is None:
+        _writer = DebugArtifactWriter()
+    return _writer
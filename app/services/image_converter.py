@@ -1,10 +1,17 @@
+import io
 import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
-from PIL import Image
+from typing import Iterator, Optional, Tuple, Union
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
 import logging
-from pdf2image import convert_from_path
+from pdf2image import convert_from_path, pdfinfo_from_path
+import pillow_heif
 from pillow_heif import register_heif_opener
+from app.core.config import settings
 
 # Registriere HEIF-Unterstützung
 register_heif_opener()
@@ -23,12 +30,22 @@ class ImageConverter:
         '.svg': 'SVG',
         '.webp': 'WEBP'
     }
+    # imdecode-Flags je (Verkleinerungsfaktor, Graustufen); JPEGs skaliert libjpeg dabei
+    # schon bei der DCT, ohne das Bild in voller Auflösung anzulegen
+    DECODE_FLAGS = {
+        (1, False): cv2.IMREAD_COLOR, (1, True): cv2.IMREAD_GRAYSCALE,
+        (2, False): cv2.IMREAD_REDUCED_COLOR_2, (2, True): cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        (4, False): cv2.IMREAD_REDUCED_COLOR_4, (4, True): cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        (8, False): cv2.IMREAD_REDUCED_COLOR_8, (8, True): cv2.IMREAD_REDUCED_GRAYSCALE_8
+    }
     
     @classmethod
-    def convert_to_jpeg(cls, input_path: Path, output_path: Optional[Path] = None) -> Path:
+    def convert_to_jpeg(cls, input_path: Path, output_path: Optional[Path] = None, target_side: int = 0) -> Path:
         """
         Konvertiert ein Bild in JPEG-Format.
         Unterstützt: jpg, jpeg, png, bmp, heic, pdf, gif, svg, webp
+        Mit `target_side` werden JPEGs bereits beim Dekodieren verkleinert, die lange
+        Seite bleibt dabei mindestens `target_side` Pixel lang.
         """
         try:
             input_path = Path(input_path)
@@ -46,15 +63,19 @@ class ImageConverter:
             
             # Spezielle Behandlung für PDF
             if suffix == '.pdf':
-                # Konvertiere erste Seite zu JPEG
-                images = convert_from_path(input_path, first_page=1, last_page=1)
-                if not images:
-                    raise ValueError("PDF konnte nicht konvertiert werden")
-                images[0].save(output_path, 'JPEG')
+                # Konvertiere erste Seite zu JPEG (alle Seiten: iter_pdf_pages)
+                page_count = cls.pdf_page_count(input_path)
+                if page_count > 1:
+                    logger.warning(f"PDF hat {page_count} Seiten, konvertiert wird nur die erste")
+                for _, page in cls.iter_pdf_pages(input_path, last_page=1):
+                    cv2.imwrite(str(output_path), page)
                 return output_path
             
             # Öffne und konvertiere Bild
             with Image.open(input_path) as img:
+                scale = target_side / max(img.size) if target_side > 0 else 1.0
+                if scale < 1.0:
+                    img.draft(None, (int(np.ceil(img.width * scale)), int(np.ceil(img.height * scale))))
                 # Konvertiere zu RGB falls nötig
                 if img.mode in ('RGBA', 'LA'):
                     background = Image.new('RGB', img.size, (255, 255, 255))
@@ -70,4 +91,177 @@ class ImageConverter:
             
         except Exception as e:
             logger.error(f"Fehler bei der Bildkonvertierung: {str(e)}")
-            raise 
\ No newline at end of file
+            raise
+    
+    @classmethod
+    def decode(cls, data: bytes, grayscale: bool = False, target_side: int = 0) -> np.ndarray:
+        """
+        Dekodiert Upload-Bytes direkt zu einem BGR- bzw. Graustufen-Array, ohne Umweg
+        über eine Datei oder ein Zwischen-JPEG.
+        
+        JPEG, PNG, BMP, WebP und TIFF dekodiert OpenCV (inkl. EXIF-Ausrichtung, bei
+        `grayscale` direkt einkanalig). HEIC dekodiert libheif (inkl. Ausrichtung) in einen
+        Puffer, der ohne Kopie weiterverarbeitet wird. GIF und Bilder mit Transparenz
+        laufen über Pillow; die Ausrichtung wird übernommen und der Alphakanal auf weißen
+        Hintergrund gelegt. Bei PDFs wird die erste Seite gerendert (alle Seiten:
+        iter_pdf_pages).
+        
+        Mit `target_side` wird um den Faktor aus decode_reduction verkleinert; JPEGs werden
+        dabei gar nicht erst in voller Auflösung dekodiert.
+        """
+        if data.startswith(b"%PDF"):
+            page_count = cls.pdf_page_count(data)
+            if page_count > 1:
+                logger.warning(f"PDF hat {page_count} Seiten, verarbeitet wird nur die erste")
+            for _, page in cls.iter_pdf_pages(data, grayscale=grayscale, last_page=1):
+                return page
+            raise ValueError("PDF enthält keine Seiten")
+        
+        reduction = cls.decode_reduction(data, target_side)
+        if pillow_heif.is_supported(data):
+            try:
+                return _decode_heif(data, grayscale, reduction)
+            except Exception as e:
+                raise ValueError(f"Konnte Bild nicht dekodieren: {str(e)}")
+        
+        if not _has_alpha(data):
+            image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cls.DECODE_FLAGS[(reduction, grayscale)])
+            if image is not None:
+                return image
+        
+        # Formate ohne OpenCV-Decoder und Bilder mit Alphakanal
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                ImageOps.exif_transpose(img, in_place=True)
+                if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+                    rgba = np.asarray(img if img.mode == 'RGBA' else img.convert('RGBA'))
+                    image = _flatten_alpha(rgba, grayscale)
+                elif grayscale:
+                    image = np.asarray(img if img.mode == 'L' else img.convert('L'))
+                else:
+                    image = cv2.cvtColor(np.asarray(img if img.mode == 'RGB' else img.convert('RGB')), cv2.COLOR_RGB2BGR)
+        except Exception as e:
+            raise ValueError(f"Konnte Bild nicht dekodieren: {str(e)}")
+        return _reduce(image, reduction)
+    
+    @staticmethod
+    def decode_reduction(data: bytes, target_side: int) -> int:
+        """
+        Verkleinerungsfaktor (1, 2, 4 oder 8) für decode: der größte, bei dem die lange
+        Seite laut Dateikopf noch mindestens `target_side` Pixel lang bleibt.
+        """
+        if target_side <= 0:
+            return 1
+        try:
+            # Image.open liest nur den Dateikopf
+            with Image.open(io.BytesIO(data)) as img:
+                long_side = max(img.size)
+        except Exception:
+            return 1
+        reduction = 1
+        while reduction < 8 and long_side / (reduction * 2) >= target_side:
+            reduction *= 2
+        return reduction
+    
+    @staticmethod
+    def pdf_page_count(source: Union[str, Path, bytes]) -> int:
+        """Seitenzahl eines PDFs (Pfad oder Inhalt); löst ValueError bei ungültigen PDFs aus."""
+        with _pdf_path(source) as path:
+            try:
+                return int(pdfinfo_from_path(path)["Pages"])
+            except Exception as e:
+                raise ValueError(f"PDF konnte nicht gelesen werden: {str(e)}")
+    
+    @staticmethod
+    def iter_pdf_pages(source: Union[str, Path, bytes], dpi: int = settings.PDF_DPI,
+                       grayscale: bool = settings.PDF_GRAYSCALE,
+                       thread_count: int = settings.PDF_THREAD_COUNT,
+                       first_page: int = 1, last_page: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        Rendert ein PDF seitenweise und liefert (Seitennummer, Bild) als Graustufen- bzw.
+        BGR-Array. poppler rendert jeweils `thread_count` Seiten parallel; es werden nie
+        mehr Seiten als ein Block gleichzeitig im Speicher gehalten, unabhängig von der
+        Seitenzahl.
+        """
+        thread_count = max(1, thread_count)
+        with _pdf_path(source) as path:
+            page_count = int(pdfinfo_from_path(path)["Pages"])
+            last_page = page_count if last_page is None else min(last_page, page_count)
+            for block_start in range(first_page, last_page + 1, thread_count):
+                block_end = min(block_start + thread_count - 1, last_page)
+                pages = convert_from_path(
+                    path, dpi=dpi, grayscale=grayscale, thread_count=thread_count,
+                    first_page=block_start, last_page=block_end
+                )
+                for page_number, page in enumerate(pages, start=block_start):
+                    array = np.asarray(page)
+                    if array.ndim == 3:
+                        array = cv2.cvtColor(array, cv2.COLOR_RGB2BGR)
+                    page.close()
+                    yield page_number, array
+                del pages
+
+
+@contextmanager
+def _pdf_path(source: Union[str, Path, bytes]) -> Iterator[str]:
+    """Pfad eines PDFs; Upload-Bytes werden dafür in eine temporäre Datei geschrieben."""
+    if not isinstance(source, bytes):
+        yield str(source)
+        return
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(source)
+        yield path
+    finally:
+        os.remove(path)
+
+
+def _has_alpha(data: bytes) -> bool:
+    """Prüft anhand des Headers, ob ein PNG oder WebP einen Alphakanal hat."""
+    if data.startswith(b"\x89PNG") and len(data) > 25:
+        # Farbtyp 4 (Grau + Alpha) oder 6 (RGBA); Palettentransparenz steht im tRNS-Chunk
+        return data[25] in (4, 6) or b"tRNS" in data[:4096]
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        chunk = data[12:16]
+        return chunk == b"VP8L" or (chunk == b"VP8X" and len(data) > 20 and bool(data[20] & 0x10))
+    return False
+
+
+def _decode_heif(data: bytes, grayscale: bool, reduction: int) -> np.ndarray:
+    """
+    HEIC/HEIF: libheif kann nicht verkleinert dekodieren, der RGB(A)-Puffer wird aber
+    ohne Kopie (und ohne Umweg über ein Pillow-Bild) gelesen und sofort verkleinert.
+    """
+    heif = pillow_heif.open_heif(data, convert_hdr_to_8bit=True)
+    array = np.asarray(heif)
+    if heif.has_alpha:
+        return _reduce(_flatten_alpha(array, grayscale), reduction)
+    if grayscale:
+        return _reduce(cv2.cvtColor(array, cv2.COLOR_RGB2GRAY), reduction)
+    return cv2.cvtColor(_reduce(array, reduction), cv2.COLOR_RGB2BGR)
+
+
+def _reduce(image: np.ndarray, reduction: int) -> np.ndarray:
+    """Verkleinert um den Faktor `reduction` (für Formate ohne verkleinertes Dekodieren)."""
+    if reduction == 1:
+        return image
+    return cv2.resize(image, None, fx=1 / reduction, fy=1 / reduction, interpolation=cv2.INTER_AREA)
+
+
+def _flatten_alpha(rgba: np.ndarray, grayscale: bool) -> np.ndarray:
+    """
+    Legt ein RGBA-Array auf weißen Hintergrund: weiß - (weiß - Farbe) * Alpha.
+    Gerechnet wird kanalweise im Ergebnis-Array, ohne weitere Kopie in voller Größe.
+    """
+    alpha = np.ascontiguousarray(rgba[:, :, 3])
+    result = cv2.cvtColor(rgba, cv2.COLOR_RGBA2GRAY if grayscale else cv2.COLOR_RGBA2BGR)
+    if grayscale:
+        cv2.bitwise_not(result, dst=result)
+        cv2.multiply(result, alpha, dst=result, scale=1 / 255)
+        return cv2.bitwise_not(result, dst=result)
+    for channel in range(3):
+        values = cv2.bitwise_not(np.ascontiguousarray(result[:, :, channel]))
+        cv2.multiply(values, alpha, dst=values, scale=1 / 255)
+        result[:, :, channel] = cv2.bitwise_not(values, dst=values)
+    return result
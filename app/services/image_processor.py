@@ -1,116 +1,219 @@
 import cv2
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List, Optional, Union
 import logging
 from app.core.config import settings
+from app.services.image_converter import ImageConverter
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=256)
+def _tone_lut(contrast: float, gamma: float) -> np.ndarray:
+    """
+    Lookup-Tabelle für Kontrast (wie cv2.convertScaleAbs) und anschließende
+    Gamma-Korrektur, zusammengefasst in einem einzigen cv2.LUT-Durchlauf.
+    """
+    values = np.arange(256, dtype=np.float32)
+    scaled = np.clip(np.rint(values * np.float32(contrast)), 0, 255).astype(np.float64)
+    table = ((scaled / 255.0) ** (1.0 / gamma)) * 255
+    table = table.astype(np.uint8)
+    table.setflags(write=False)
+    return table
+
+
 class ImageProcessor:
+    # Parameter-Kombinationen für debug_process
+    DEFAULT_GRID: Dict[str, List[Any]] = {
+        'contrast': [1.0, 1.5, 2.0],
+        'gamma': [0.8, 1.0, 1.2],
+        'rotation': [-5, 0, 5]
+    }
+    # Schräglagenschätzung über Projektionsprofile
+    DESKEW_PARAMS: Dict[str, Any] = {
+        'max_side': 800,  # Schätzung auf höchstens 800 px langer Seite
+        'max_points': 200000,  # Obergrenze der ausgewerteten Vordergrundpixel
+        'block_size': 15,  # adaptive Binarisierung
+        'threshold_offset': 15,
+        'max_angle': 15.0,
+        'coarse_step': 1.0,
+        'fine_step': 0.1,
+        'min_angle': 0.2,  # darunter wird nicht gedreht
+        'min_confidence': 0.2
+    }
+
     def __init__(self):
         self.default_params = {
             'contrast': 1.5,
             'gamma': 1.0,
             'rotation': 0
         }
-    
-    def preprocess_image(self, image_path: Path, params: Dict[str, Any] = None) -> np.ndarray:
+
+    @staticmethod
+    def load_gray(image: Union[str, Path, bytes, np.ndarray]) -> np.ndarray:
+        """Liest ein Bild (Pfad, Upload-Bytes oder BGR-Array) einmalig als Graustufenbild ein (siehe ImageConverter.decode)."""
+        if isinstance(image, np.ndarray):
+            return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        data = image if isinstance(image, bytes) else Path(image).read_bytes()
+        return ImageConverter.decode(data, grayscale=True)
+
+    @classmethod
+    def estimate_skew(cls, gray: np.ndarray) -> Tuple[float, float]:
+        """
+        Schätzt den Schräglagenwinkel über Projektionsprofile.
+
+        Gearbeitet wird auf einer verkleinerten, lokal binarisierten Kopie mit höchstens
+        `max_points` Vordergrundpixeln, der Speicherbedarf ist also unabhängig von der
+        Eingabegröße. Für jeden Winkel werden die Pixel auf die y-Achse projiziert; bei
+        korrekter Ausrichtung ergeben Textzeilen das schärfste Profil. Gesucht wird grob
+        in `coarse_step`-Schritten und anschließend um das Maximum herum fein.
+
+        Gibt den Winkel (für cv2.getRotationMatrix2D) und eine Konfidenz (0-1) zurück;
+        die Konfidenz misst, wie deutlich sich das beste Profil von den übrigen abhebt.
+        """
+        params = cls.DESKEW_PARAMS
+        scale = min(1.0, params['max_side'] / max(gray.shape[:2]))
+        if scale < 1.0:
+            small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        else:
+            small = gray
+        # Lokale Schwelle: nur Schrift und Kanten werden Vordergrund, keine großen dunklen Flächen
+        binary = cv2.adaptiveThreshold(small, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV,
+                                       params['block_size'], params['threshold_offset'])
+
+        ys, xs = np.nonzero(binary)
+        if len(xs) < 2:
+            return 0.0, 0.0
+        if len(xs) > params['max_points']:
+            step = int(np.ceil(len(xs) / params['max_points']))
+            xs, ys = xs[::step], ys[::step]
+        # Koordinaten relativ zur Bildmitte
+        cx = xs.astype(np.float32) - binary.shape[1] / 2
+        cy = ys.astype(np.float32) - binary.shape[0] / 2
+        diagonal = int(np.hypot(binary.shape[0], binary.shape[1])) + 2
+
+        def sharpness(angle: float) -> float:
+            # y-Koordinate nach Rotation um `angle` Grad (Konvention wie getRotationMatrix2D)
+            theta = np.deg2rad(angle)
+            rows = np.rint(cy * np.cos(theta) - cx * np.sin(theta)).astype(np.int32) + diagonal // 2
+            profile = np.bincount(rows, minlength=diagonal).astype(np.float64)
+            return float(np.dot(profile, profile))
+
+        max_angle = params['max_angle']
+        coarse = np.arange(-max_angle, max_angle + 1e-6, params['coarse_step'])
+        coarse_scores = np.array([sharpness(angle) for angle in coarse])
+        best = float(coarse[int(np.argmax(coarse_scores))])
+
+        fine = np.arange(best - params['coarse_step'], best + params['coarse_step'] + 1e-6, params['fine_step'])
+        fine_scores = np.array([sharpness(angle) for angle in fine])
+        best_index = int(np.argmax(fine_scores))
+        angle = round(float(fine[best_index]), 2)
+
+        best_score = fine_scores[best_index]
+        confidence = 0.0
+        if best_score > 0:
+            confidence = float(np.clip((best_score - np.median(coarse_scores)) / best_score, 0.0, 1.0))
+        return angle, round(confidence, 3)
+
+    @classmethod
+    def effective_skew(cls, angle: float, confidence: float) -> float:
+        """Winkel, um den tatsächlich gedreht wird: 0, wenn die Karte gerade liegt oder die Schätzung unsicher ist."""
+        params = cls.DESKEW_PARAMS
+        if confidence < params['min_confidence'] or abs(angle) < params['min_angle']:
+            return 0.0
+        return angle
+
+    @staticmethod
+    def prepare_luts(candidates: List[Dict[str, Any]]) -> None:
+        """Berechnet die Tonwert-Tabellen aller Kandidaten vorab."""
+        for params in candidates:
+            _tone_lut(float(params['contrast']), float(params['gamma']))
+
+    def apply_params(self, gray: np.ndarray, skew_angle: float, params: Dict[str, Any]) -> np.ndarray:
+        """Wendet Kontrast, Gamma und Rotation auf ein bereits geladenes Graustufenbild an."""
+        contrast = params.get('contrast', self.default_params['contrast'])
+        gamma = params.get('gamma', self.default_params['gamma'])
+        rotation = params.get('rotation', self.default_params['rotation'])
+
+        adjusted = cv2.LUT(gray, _tone_lut(float(contrast), float(gamma)))
+
+        angle = skew_angle + rotation
+        if angle == 0:
+            return adjusted
+        (h, w) = adjusted.shape[:2]
+        center = (w // 2, h // 2)
+        M = cv2.getRotationMatrix2D(center, angle, 1.0)
+        return cv2.warpAffine(adjusted, M, (w, h),
+                              flags=cv2.INTER_CUBIC,
+                              borderMode=cv2.BORDER_REPLICATE)
+
+    def preprocess_image(self, image_path: Union[Path, bytes, np.ndarray], params: Optional[Dict[str, Any]] = None) -> np.ndarray:
         """
         Verarbeitet ein Bild mit den gegebenen Parametern vor.
         """
         if params is None:
             params = self.default_params
-            
+
         try:
-            # Bild laden
-            image = cv2.imread(str(image_path))
-            if image is None:
-                raise ValueError(f"Konnte Bild nicht laden: {image_path}")
-            
-            # Graustufen konvertieren
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Kontrast anpassen
-            contrast = params.get('contrast', self.default_params['contrast'])
-            gray = cv2.convertScaleAbs(gray, alpha=contrast)
-            
-            # Gamma-Korrektur
-            gamma = params.get('gamma', self.default_params['gamma'])
-            inv_gamma = 1.0 / gamma
-            table = np.array([((i / 255.0) ** inv_gamma) * 255
-                            for i in np.arange(0, 256)]).astype("uint8")
-            gray = cv2.LUT(gray, table)
-            
-            # Deskewing
-            coords = np.column_stack(np.where(gray > 0))
-            angle = cv2.minAreaRect(coords)[-1]
-            if angle < -45:
-                angle = 90 + angle
-            
-            # Rotation
-            rotation = params.get('rotation', self.default_params['rotation'])
-            angle += rotation
-            
-            (h, w) = gray.shape[:2]
-            center = (w // 2, h // 2)
-            M = cv2.getRotationMatrix2D(center, angle, 1.0)
-            rotated = cv2.warpAffine(gray, M, (w, h),
-                                   flags=cv2.INTER_CUBIC,
-                                   borderMode=cv2.BORDER_REPLICATE)
-            
-            return rotated
-            
+            gray = self.load_gray(image_path)
+            skew_angle = self.effective_skew(*self.estimate_skew(gray))
+            return self.apply_params(gray, skew_angle, params)
+
         except Exception as e:
             logger.error(f"Fehler bei der Bildverarbeitung: {str(e)}")
             raise
-    
-    def debug_process(self, image_path: Path) -> Dict[str, Tuple[np.ndarray, float]]:
+
+    @staticmethod
+    def candidate_key(params: Dict[str, Any]) -> str:
+        return f"c{params['contrast']}_g{params['gamma']}_r{params['rotation']}"
+
+    @classmethod
+    def candidates(cls, grid: Optional[Dict[str, List[Any]]] = None) -> List[Dict[str, Any]]:
+        """Alle Parameter-Kombinationen eines Rasters (fehlende Achsen aus DEFAULT_GRID)."""
+        grid = {**cls.DEFAULT_GRID, **(grid or {})}
+        return [
+            {'contrast': contrast, 'gamma': gamma, 'rotation': rotation}
+            for contrast in grid['contrast']
+            for gamma in grid['gamma']
+            for rotation in grid['rotation']
+        ]
+
+    def debug_process(self, image_path: Union[Path, bytes, np.ndarray]) -> Dict[str, Tuple[np.ndarray, float]]:
         """
         Führt verschiedene Parameterkombinationen aus und gibt die Ergebnisse zurück.
+        Das Bild wird nur einmal geladen und der Schräglagenwinkel nur einmal bestimmt;
+        für die parallele Variante mit Zeitbudget siehe ParameterSweep.
         """
         results = {}
-        
-        # Parameter-Kombinationen für Debug
-        contrast_values = [1.0, 1.5, 2.0]
-        gamma_values = [0.8, 1.0, 1.2]
-        rotation_values = [-5, 0, 5]
-        
-        for contrast in contrast_values:
-            for gamma in gamma_values:
-                for rotation in rotation_values:
-                    params = {
-                        'contrast': contrast,
-                        'gamma': gamma,
-                        'rotation': rotation
-                    }
-                    
-                    try:
-                        processed = self.preprocess_image(image_path, params)
-                        # Einfache Qualitätsbewertung basierend auf Bildstatistiken
-                        quality_score = self._calculate_quality_score(processed)
-                        
-                        key = f"c{contrast}_g{gamma}_r{rotation}"
-                        results[key] = (processed, quality_score)
-                        
-                    except Exception as e:
-                        logger.error(f"Fehler bei Parameter-Kombination {params}: {str(e)}")
-                        continue
-        
+        gray = self.load_gray(image_path)
+        skew_angle = self.effective_skew(*self.estimate_skew(gray))
+
+        for params in self.candidates():
+            try:
+                processed = self.apply_params(gray, skew_angle, params)
+                # Einfache Qualitätsbewertung basierend auf Bildstatistiken
+                quality_score = self._calculate_quality_score(processed)
+                results[self.candidate_key(params)] = (processed, quality_score)
+
+            except Exception as e:
+                logger.error(f"Fehler bei Parameter-Kombination {params}: {str(e)}")
+                continue
+
         return results
-    
+
     def _calculate_quality_score(self, image: np.ndarray) -> float:
         """
         Berechnet einen einfachen Qualitätsscore für das verarbeitete Bild.
         """
         # Berechne Bildstatistiken
-        mean = np.mean(image)
-        std = np.std(image)
-        
+        mean, std = cv2.meanStdDev(image)
+
         # Normalisiere die Werte
-        normalized_mean = mean / 255.0
-        normalized_std = std / 128.0
-        
+        normalized_mean = float(mean[0][0]) / 255.0
+        normalized_std = float(std[0][0]) / 128.0
+
         # Kombiniere zu einem Score (0-1)
         score = (normalized_mean * 0.4 + normalized_std * 0.6)
-        return min(max(score, 0.0), 1.0) 
\ No newline at end of file
+        return min(max(score, 0.0), 1.0)
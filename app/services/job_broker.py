@@ -0,0 +1,309 @@
+import json
+import logging
+import os
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+from app.core.config import settings
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+
+class JobBroker(ABC):
+    """
+    Schnittstelle für die Job-Warteschlange zwischen API und OCR-Workern.
+
+    Ein Broker muss Uploads dauerhaft speichern, damit Aufträge einen Neustart
+    von API oder Worker überleben.
+    """
+
+    @abstractmethod
+    def enqueue(self, payload: bytes, filename: str, accept: Optional[str] = None,
+                lang: str = settings.DEFAULT_LANGUAGE, idempotency_key: Optional[str] = None) -> Job:
+        """Legt einen Auftrag an. Bei bekanntem `idempotency_key` wird der bestehende Auftrag zurückgegeben."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Gibt den Auftrag mit der ID zurück oder None."""
+
+    @abstractmethod
+    def claim(self, worker_id: str) -> Optional[Job]:
+        """Reserviert den ältesten wartenden Auftrag für einen Worker."""
+
+    @abstractmethod
+    def renew(self, job_id: str, worker_id: str) -> bool:
+        """Verlängert die Lease eines laufenden Auftrags. False, wenn der Worker ihn nicht mehr hält."""
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        """
+        Markiert einen Auftrag als erledigt und speichert das Ergebnis. Nur der Worker,
+        der den Auftrag hält, kann ihn abschließen; sonst wird False zurückgegeben.
+        """
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        """Markiert einen Auftrag als fehlgeschlagen (nur durch den haltenden Worker, siehe complete)."""
+
+    @abstractmethod
+    def queue_depth(self) -> int:
+        """Anzahl wartender Aufträge."""
+
+
+class SQLiteJobBroker(JobBroker):
+    """
+    Job-Broker auf Basis einer SQLite-Datenbank in `STORAGE_PATH`.
+
+    Reservierte Aufträge erhalten eine Lease; stirbt ein Worker, wird der
+    Auftrag nach Ablauf der Lease erneut vergeben (höchstens `max_attempts` mal).
+    Ergebnisse werden nur vom Worker angenommen, der den Auftrag gerade hält: ein
+    Worker mit abgelaufener Lease kann den Auftrag eines Nachfolgers nicht überschreiben.
+    """
+
+    def __init__(self, db_path: Path = settings.JOB_DB_PATH,
+                 upload_path: Path = settings.JOB_UPLOAD_PATH,
+                 lease_timeout: int = settings.JOB_LEASE_TIMEOUT,
+                 max_attempts: int = settings.JOB_MAX_ATTEMPTS):
+        self.db_path = Path(db_path)
+        self.upload_path = Path(upload_path)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        os.makedirs(self.db_path.parent, exist_ok=True)
+        os.makedirs(self.upload_path, exist_ok=True)
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        # isolation_level=None: Transaktionen werden explizit gesteuert
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _init_db(self) -> None:
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    accept TEXT,
+                    lang TEXT NOT NULL,
+                    payload_path TEXT NOT NULL,
+                    idempotency_key TEXT UNIQUE,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker_id TEXT,
+                    lease_until REAL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"],
+            status=JobStatus(row["status"]),
+            filename=row["filename"],
+            accept=row["accept"],
+            lang=row["lang"],
+            payload_path=row["payload_path"],
+            attempts=row["attempts"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+            created_at=datetime.fromtimestamp(row["created_at"]),
+            updated_at=datetime.fromtimestamp(row["updated_at"])
+        )
+
+    def _write_payload(self, job_id: str, payload: bytes) -> Path:
+        """Schreibt den Upload atomar auf die Platte, bevor der Auftrag sichtbar wird."""
+        path = self.upload_path / job_id
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as buffer:
+            buffer.write(payload)
+            buffer.flush()
+            os.fsync(buffer.fileno())
+        os.replace(tmp_path, path)
+        return path
+
+    def enqueue(self, payload: bytes, filename: str, accept: Optional[str] = None,
+                lang: str = settings.DEFAULT_LANGUAGE, idempotency_key: Optional[str] = None) -> Job:
+        if idempotency_key:
+            existing = self._get_by_idempotency_key(idempotency_key)
+            if existing is not None:
+                return existing
+
+        job_id = uuid.uuid4().hex
+        payload_path = self._write_payload(job_id, payload)
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute(
+                """INSERT INTO jobs (id, status, filename, accept, lang, payload_path,
+                                     idempotency_key, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (job_id, JobStatus.QUEUED.value, filename, accept, lang,
+                 str(payload_path), idempotency_key, now, now)
+            )
+        except sqlite3.IntegrityError:
+            # Gleichzeitiger Request mit demselben Idempotency-Key
+            os.remove(payload_path)
+            existing = self._get_by_idempotency_key(idempotency_key) if idempotency_key else None
+            if existing is None:
+                raise
+            return existing
+        finally:
+            conn.close()
+
+        logger.debug(f"Job {job_id} eingereiht ({filename})")
+        job = self.get(job_id)
+        assert job is not None
+        return job
+
+    def _get_by_idempotency_key(self, idempotency_key: str) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE idempotency_key = ?", (idempotency_key,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row else None
+
+    def get(self, job_id: str) -> Optional[Job]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, worker_id: str) -> Optional[Job]:
+        now = time.time()
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE sperrt für Schreiber, damit zwei Worker nicht denselben Job erhalten
+            conn.execute("BEGIN IMMEDIATE")
+
+            # Abgelaufene Leases zurücksetzen bzw. endgültig scheitern lassen
+            exhausted = conn.execute(
+                """SELECT payload_path FROM jobs
+                   WHERE status = ? AND lease_until < ? AND attempts >= ?""",
+                (JobStatus.RUNNING.value, now, self.max_attempts)
+            ).fetchall()
+            conn.execute(
+                """UPDATE jobs SET status = ?, error = ?, updated_at = ?
+                   WHERE status = ? AND lease_until < ? AND attempts >= ?""",
+                (JobStatus.FAILED.value, "Maximale Anzahl an Versuchen erreicht", now,
+                 JobStatus.RUNNING.value, now, self.max_attempts)
+            )
+            conn.execute(
+                """UPDATE jobs SET status = ?, worker_id = NULL, lease_until = NULL, updated_at = ?
+                   WHERE status = ? AND lease_until < ?""",
+                (JobStatus.QUEUED.value, now, JobStatus.RUNNING.value, now)
+            )
+
+            row = conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1",
+                (JobStatus.QUEUED.value,)
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                self._remove_payloads(exhausted)
+                return None
+
+            conn.execute(
+                """UPDATE jobs SET status = ?, worker_id = ?, lease_until = ?,
+                                   attempts = attempts + 1, updated_at = ?
+                   WHERE id = ?""",
+                (JobStatus.RUNNING.value, worker_id, now + self.lease_timeout, now, row["id"])
+            )
+            job_row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+            conn.execute("COMMIT")
+            self._remove_payloads(exhausted)
+            return self._row_to_job(job_row)
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew(self, job_id: str, worker_id: str) -> bool:
+        now = time.time()
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                """UPDATE jobs SET lease_until = ?, updated_at = ?
+                   WHERE id = ? AND worker_id = ? AND status = ?""",
+                (now + self.lease_timeout, now, job_id, worker_id, JobStatus.RUNNING.value)
+            )
+        finally:
+            conn.close()
+        return cursor.rowcount > 0
+
+    def _finish(self, job_id: str, worker_id: str, status: JobStatus,
+                result: Optional[Dict[str, Any]], error: Optional[str]) -> bool:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT payload_path FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            cursor = conn.execute(
+                """UPDATE jobs SET status = ?, result = ?, error = ?, lease_until = NULL, updated_at = ?
+                   WHERE id = ? AND worker_id = ? AND status = ?""",
+                (status.value, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, time.time(), job_id, worker_id, JobStatus.RUNNING.value)
+            )
+        finally:
+            conn.close()
+
+        if cursor.rowcount == 0:
+            # Lease abgelaufen: der Auftrag wurde neu vergeben oder bereits abgeschlossen
+            logger.warning(f"Job {job_id} wird nicht mehr von Worker {worker_id} gehalten, Ergebnis verworfen")
+            return False
+
+        # Upload wird nach Abschluss nicht mehr benötigt
+        if row is not None:
+            self._remove_payloads([row])
+        return True
+
+    @staticmethod
+    def _remove_payloads(rows) -> None:
+        for row in rows:
+            if os.path.exists(row["payload_path"]):
+                os.remove(row["payload_path"])
+
+    def complete(self, job_id: str, worker_id: str, result: Dict[str, Any]) -> bool:
+        return self._finish(job_id, worker_id, JobStatus.DONE, result, None)
+
+    def fail(self, job_id: str, worker_id: str, error: str) -> bool:
+        return self._finish(job_id, worker_id, JobStatus.FAILED, None, error)
+
+    def queue_depth(self) -> int:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (JobStatus.QUEUED.value,)).fetchone()
+        finally:
+            conn.close()
+        return row[0]
+
+
+BROKERS = {
+    "sqlite": SQLiteJobBroker
+}
+
+
+def get_job_broker() -> JobBroker:
+    """Erzeugt den in `JOB_BROKER` konfigurierten Broker."""
+    try:
+        broker_class = BROKERS[settings.JOB_BROKER]
+    except KeyError:
+        raise ValueError(f"Unbekannter Job-Broker: {settings.JOB_BROKER}")
+    return broker_class()
@@ -0,0 +1,56 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LanguagePrior:
+    """
+    Merkt sich je Mandant (bzw. API-Key), welche Sprache bei lang="auto" gewonnen hat.
+
+    Jeder Gewinn zählt 1, ältere Gewinne werden mit `decay` abgewertet; bevorzugt wird
+    die Sprache mit dem höchsten Stand. OCRService.recognize versucht sie zuerst allein
+    und spart das Rennen, wenn sie sicher genug erkannt wird. Schlüssel ist ein
+    SHA-256 des Mandanten, API-Keys werden also nicht im Klartext gehalten. Der Stand
+    liegt je API-Prozess im Speicher (LRU mit `max_entries` Mandanten).
+    """
+
+    def __init__(self, max_entries: int = settings.OCR_LANGUAGE_PRIOR_SIZE, decay: float = 0.8):
+        self.max_entries = max(1, max_entries)
+        self.decay = decay
+        self._entries: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(tenant: str) -> str:
+        return hashlib.sha256(tenant.encode("utf-8")).hexdigest()
+
+    def get(self, tenant: Optional[str]) -> Optional[str]:
+        """Bevorzugte Sprache des Mandanten oder None, solange nichts bekannt ist."""
+        if not tenant:
+            return None
+        key = self.make_key(tenant)
+        with self._lock:
+            scores = self._entries.get(key)
+            if scores is None:
+                return None
+            self._entries.move_to_end(key)
+            return max(scores, key=lambda language: scores[language])
+
+    def record(self, tenant: Optional[str], language: str) -> None:
+        """Vermerkt die Gewinnersprache eines Requests."""
+        if not tenant:
+            return
+        key = self.make_key(tenant)
+        with self._lock:
+            scores = self._entries.get(key, {})
+            scores = {name: score * self.decay for name, score in scores.items()}
+            scores[language] = scores.get(language, 0.0) + 1.0
+            self._entries[key] = scores
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,225 @@
+import os
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+import pytesseract
+from app.core.config import settings
+
+try:
+    import tesserocr
+except ImportError:  # optionale Abhängigkeit, benötigt libtesseract
+    tesserocr = None
+
+# Konfiguriere Tesseract-Pfad für macOS
+if os.path.exists('/opt/homebrew/bin/tesseract'):
+    pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OCRLine:
+    """Eine erkannte Textzeile mit Begrenzungsrechteck (x, y, w, h) und Wortkonfidenzen (0-100)."""
+
+    text: str
+    box: Tuple[int, int, int, int]
+    confidences: List[float] = field(default_factory=list)
+
+    @property
+    def confidence(self) -> float:
+        """Mittlere Wortkonfidenz der Zeile."""
+        return sum(self.confidences) / len(self.confidences) if self.confidences else 0.0
+
+
+def parse_tsv(tsv: str) -> List[OCRLine]:
+    """
+    Wandelt die TSV-Ausgabe von Tesseract (image_to_data bzw. GetTSVText) in Zeilen um,
+    in Lesereihenfolge. Zeilen ohne erkannte Wörter entfallen.
+    """
+    lines: List[OCRLine] = []
+    current: Optional[OCRLine] = None
+    for row in tsv.splitlines():
+        fields = row.split('\t')
+        # Kopfzeile (pytesseract) und unvollständige Zeilen überspringen
+        if len(fields) < 11 or not fields[0].isdigit():
+            continue
+        level = int(fields[0])
+        if level == 4:
+            left, top, width, height = (int(value) for value in fields[6:10])
+            current = OCRLine(text='', box=(left, top, width, height))
+            lines.append(current)
+        elif level == 5 and current is not None:
+            word = fields[11].strip() if len(fields) > 11 else ''
+            if word:
+                current.text = f"{current.text} {word}" if current.text else word
+                current.confidences.append(float(fields[10]))
+    return [line for line in lines if line.text]
+
+
+def mean_confidence(lines: List[OCRLine]) -> float:
+    """Mittlere Wortkonfidenz über alle Zeilen (0, wenn kein Wort erkannt wurde)."""
+    confidences = [confidence for line in lines for confidence in line.confidences]
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+class OCREngine(ABC):
+    """Schnittstelle für OCR-Backends. Bilder werden als Graustufen- oder BGR-Array übergeben."""
+
+    name: str = ""
+
+    @abstractmethod
+    def image_to_string(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> str:
+        """Erkennt den Text eines Bildes."""
+
+    @abstractmethod
+    def image_to_lines(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> List[OCRLine]:
+        """Erkennt den Text eines Bildes zeilenweise, mit Position und Wortkonfidenzen."""
+
+    @abstractmethod
+    def detect_orientation(self, image: np.ndarray) -> Tuple[int, float]:
+        """
+        Ausrichtungserkennung (OSD, benötigt osd.traineddata): Drehung der Seite im
+        Uhrzeigersinn gegenüber der aufrechten Lage (0, 90, 180, 270) und Konfidenz.
+        """
+
+
+class PytesseractEngine(OCREngine):
+    """Ruft für jedes Bild das tesseract-Binary über pytesseract auf (Fallback)."""
+
+    name = "pytesseract"
+
+    def image_to_string(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> str:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return pytesseract.image_to_string(
+            image,
+            lang=lang,
+            config=f'--psm {psm}',
+            timeout=settings.OCR_TIMEOUT
+        )
+
+    def image_to_lines(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> List[OCRLine]:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return parse_tsv(pytesseract.image_to_data(
+            image,
+            lang=lang,
+            config=f'--psm {psm}',
+            timeout=settings.OCR_TIMEOUT
+        ))
+
+    def detect_orientation(self, image: np.ndarray) -> Tuple[int, float]:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        osd = pytesseract.image_to_osd(
+            image,
+            config='--psm 0',
+            output_type=pytesseract.Output.DICT,
+            timeout=settings.OCR_TIMEOUT
+        )
+        return int(osd['orientation']), float(osd['orientation_conf'])
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Hält initialisierte Tesseract-API-Handles über tesserocr warm.
+
+    Pro Thread und pro Sprache wird einmalig ein Handle angelegt, sodass das
+    Sprachmodell nicht bei jedem Aufruf neu geladen werden muss; die
+    Seitensegmentierung wird je Aufruf gesetzt. Bilder werden als Puffer
+    übergeben, ohne Umweg über eine temporäre Datei.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, tessdata_path: Optional[str] = settings.TESSDATA_PREFIX):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr ist nicht installiert")
+        self.tessdata_path = tessdata_path if tessdata_path and os.path.isdir(tessdata_path) else None
+        self._local = threading.local()
+
+    def _get_api(self, lang: str, psm: int):
+        apis: Optional[Dict[str, "tesserocr.PyTessBaseAPI"]] = getattr(self._local, "apis", None)
+        if apis is None:
+            apis = self._local.apis = {}
+        api = apis.get(lang)
+        if api is None:
+            kwargs = {"lang": lang, "psm": psm}
+            if self.tessdata_path:
+                kwargs["path"] = self.tessdata_path
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            apis[lang] = api
+            logger.debug(f"Tesseract-Handle für lang={lang} initialisiert")
+        else:
+            api.SetPageSegMode(psm)
+        return api
+
+    def _set_image(self, api, image: np.ndarray) -> None:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+
+    def image_to_string(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> str:
+        api = self._get_api(lang, psm)
+        try:
+            self._set_image(api, image)
+            if not api.Recognize(timeout=settings.OCR_TIMEOUT * 1000):
+                raise RuntimeError("Tesseract process timeout")
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+
+    def image_to_lines(self, image: np.ndarray, lang: str = 'deu', psm: int = 3) -> List[OCRLine]:
+        api = self._get_api(lang, psm)
+        try:
+            self._set_image(api, image)
+            if not api.Recognize(timeout=settings.OCR_TIMEOUT * 1000):
+                raise RuntimeError("Tesseract process timeout")
+            return parse_tsv(api.GetTSVText(0))
+        finally:
+            api.Clear()
+
+    def detect_orientation(self, image: np.ndarray) -> Tuple[int, float]:
+        api = self._get_api('osd', tesserocr.PSM.OSD_ONLY)
+        try:
+            self._set_image(api, image)
+            result = api.DetectOrientationScript()
+            if not result:
+                raise RuntimeError("Ausrichtung konnte nicht bestimmt werden")
+            return int(result['orient_deg']), float(result['orient_conf'])
+        finally:
+            api.Clear()
+
+
+ENGINES = {
+    "pytesseract": PytesseractEngine,
+    "tesserocr": TesserocrEngine
+}
+
+_engine: Optional[OCREngine] = None
+
+
+def get_ocr_engine() -> OCREngine:
+    """
+    Gibt das in `OCR_ENGINE` konfigurierte Backend zurück (eine Instanz pro Prozess).
+    Bei "auto" wird tesserocr verwendet, falls installiert, sonst pytesseract.
+    """
+    global _engine
+    if _engine is None:
+        engine_name = settings.OCR_ENGINE
+        if engine_name == "auto":
+            engine_name = "tesserocr" if tesserocr is not None else "pytesseract"
+        try:
+            engine_class = ENGINES[engine_name]
+        except KeyError:
+            raise ValueError(f"Unbekannte OCR-Engine: {settings.OCR_ENGINE}")
+        _engine = engine_class()
+        logger.info(f"OCR-Engine: {_engine.name}")
+    return _engine
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
+import numpy as np
+from app.core.config import settings
+from app.core import metrics
+from app.core.tracing import Trace
+
+if TYPE_CHECKING:
+    from app.services.ocr_service import OCRService
+
+logger = logging.getLogger(__name__)
+
+
+class OCRQueueFullError(Exception):
+    """Wird ausgelöst, wenn die Warteschlange des OCR-Pools voll ist."""
+
+
+class OCRTimeoutError(Exception):
+    """Wird ausgelöst, wenn ein OCR-Auftrag das Zeitlimit überschreitet."""
+
+
+# Pro Worker-Prozess eine OCRService-Instanz (wird im Initializer angelegt)
+_worker_service: Optional["OCRService"] = None
+
+
+def _init_worker() -> None:
+    global _worker_service
+    from app.services.ocr_service import OCRService
+    _worker_service = OCRService()
+
+
+def _service() -> "OCRService":
+    assert _worker_service is not None, "Worker nicht initialisiert"
+    return _worker_service
+
+
+def _process_image(image: Union[str, bytes], lang: str, debug: bool = False, prior: Optional[str] = None):
+    trace = Trace()
+    contact, reliability_score = _service().process_image(image, lang=lang, trace=trace, debug=debug, prior=prior)
+    return contact, reliability_score, trace
+
+
+def _process_array(image: np.ndarray, lang: str, debug: bool = False, prior: Optional[str] = None):
+    trace = Trace()
+    contact, reliability_score = _service().process_array(image, lang=lang, trace=trace, debug=debug, prior=prior)
+    return contact, reliability_score, trace
+
+
+def _segment_cards(image: Union[str, bytes]):
+    trace = Trace()
+    return _service().segment_cards(image, trace=trace), trace
+
+
+def _sweep_parameters(image: Union[str, bytes], options: Dict[str, Any]):
+    from app.services.param_sweep import ParameterSweep
+    trace = Trace()
+    sweep = ParameterSweep(_service().image_processor)
+    return sweep.run(image, trace=trace, **options), trace
+
+
+class OCRExecutor:
+    """
+    Führt OCR-Aufträge in einem Prozess-Pool aus, damit der Event-Loop frei bleibt.
+
+    Es werden höchstens `max_workers` Aufträge gleichzeitig bearbeitet und
+    `queue_size` weitere angenommen; darüber hinaus wird `OCRQueueFullError`
+    ausgelöst. Jeder Auftrag wird nach `timeout` Sekunden abgebrochen.
+    """
+
+    def __init__(self, max_workers: int = settings.MAX_WORKERS,
+                 queue_size: int = settings.OCR_QUEUE_SIZE,
+                 timeout: float = settings.OCR_TIMEOUT):
+        self.max_workers = max(1, max_workers)
+        self.queue_size = max(0, queue_size)
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.queue_size
+
+    @property
+    def pending(self) -> int:
+        """Anzahl angenommener Aufträge (laufend und wartend)."""
+        return self._pending
+
+    @property
+    def in_flight(self) -> int:
+        return min(self._pending, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(0, self._pending - self.max_workers)
+
+    @property
+    def is_full(self) -> bool:
+        return self._pending >= self.capacity
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # "spawn" statt "fork": der API-Prozess hat bereits Threads (Event-Loop, Threadpool)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker
+            )
+            logger.info(f"OCR-Pool gestartet mit {self.max_workers} Prozessen")
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Führt `fn(*args)` im Pool aus und wartet höchstens `timeout` Sekunden."""
+        if self.is_full:
+            raise OCRQueueFullError(
+                f"OCR-Warteschlange voll ({self._pending}/{self.capacity} Aufträge)"
+            )
+
+        loop = asyncio.get_running_loop()
+        future = self._get_pool().submit(fn, *args)
+        self._pending += 1
+
+        # Slot erst freigeben, wenn der Auftrag im Pool wirklich beendet ist –
+        # ein abgelaufener, aber noch laufender Auftrag belegt weiterhin einen Worker.
+        def _release(_):
+            loop.call_soon_threadsafe(self._release)
+        future.add_done_callback(_release)
+
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise OCRTimeoutError(f"OCR-Zeitlimit von {timeout}s überschritten")
+
+    def _release(self) -> None:
+        self._pending -= 1
+
+    async def process_image(self, image: Union[str, bytes], lang: str = settings.DEFAULT_LANGUAGE,
+                            debug: bool = False, prior: Optional[str] = None):
+        """
+        Asynchrone Variante von `OCRService.process_image` (Pfad oder Upload-Bytes).
+        Gibt zusätzlich den Trace des Worker-Prozesses zurück.
+        """
+        return await self.run(_process_image, image, lang, debug, prior)
+
+    async def process_array(self, image: np.ndarray, lang: str = settings.DEFAULT_LANGUAGE,
+                            debug: bool = False, prior: Optional[str] = None):
+        """Asynchrone Variante von `OCRService.process_array` (z.B. für gerenderte PDF-Seiten)."""
+        return await self.run(_process_array, image, lang, debug, prior)
+
+    async def segment_cards(self, image: Union[str, bytes]):
+        """
+        Asynchrone Variante von `OCRService.segment_cards`: liefert die entzerrten Karten
+        eines Fotos, die dann einzeln mit `process_array` verarbeitet werden.
+        """
+        return await self.run(_segment_cards, image)
+
+    async def sweep_parameters(self, image: Union[str, bytes], options: Dict[str, Any]):
+        """
+        Führt einen Parameter-Sweep (siehe ParameterSweep) als einen Auftrag im Pool aus.
+        `options` enthält `grid` und optional `time_budget` und `score_threshold`.
+        """
+        return await self.run(_sweep_parameters, image, options)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+ocr_executor = OCRExecutor()
+
+metrics.OCR_QUEUE_DEPTH.set_function(lambda: ocr_executor.queued)
+metrics.OCR_IN_FLIGHT.set_function(lambda: ocr_executor.in_flight)
@@ -1,145 +1,712 @@
-import os
 import cv2
 import numpy as np
-import pytesseract
 from pathlib import Path
 import logging
-from typing import Dict, Any, Optional, Tuple
-import re
+from typing import Dict, Any, List, Optional, Tuple, Union
+import json
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from app.core.config import settings
+from app.core.tracing import Trace
 from app.services.image_processor import ImageProcessor
 from app.services.image_converter import ImageConverter
+from app.services.result_cache import ResultCache
+from app.services.ocr_engine import OCRLine, get_ocr_engine, mean_confidence
+from app.services.debug_writer import get_debug_writer
+from app.services.quality_gate import QualityGate, ImageQualityError
+from app.services.orientation import OrientationDetector
+from app.services.contact_extractor import ContactExtractor
 from app.models.contact import Contact, Address
 
-# Konfiguriere Tesseract-Pfad für macOS
-if os.path.exists('/opt/homebrew/bin/tesseract'):
-    pytesseract.pytesseract.tesseract_cmd = '/opt/homebrew/bin/tesseract'
-
 logger = logging.getLogger(__name__)
 
 class OCRService:
+    # Tesseract-Konfiguration und Vorverarbeitungsparameter; fließen in den Cache-Schlüssel ein
+    TESSERACT_PSM = 3  # Automatische Seitensegmentierung; die Ausrichtung bestimmt OrientationDetector
+    TESSERACT_OSD_PSM = 1  # dasselbe mit OSD, falls OCR_ORIENTATION_DETECTION abgeschaltet ist
+    PREPROCESSING_PARAMS: Dict[str, Any] = {
+        'canny_thresholds': (50, 150),
+        'dilate_iterations': 2,
+        'min_area_ratio': 0.001,  # 0.1% der Bildfläche
+        'padding_ratio': 0.05,  # 5% der Bildgröße
+        'detect_max_side': 1024,  # Textsuche auf höchstens 1024 px langer Seite
+        'noise_threshold': 3.0,  # ab diesem geschätzten Rauschen (Sigma) wird NLM verwendet
+        'denoise': 'fastNlMeans',
+        'light_denoise': 'gaussian3',
+        'target_text_height': settings.OCR_TARGET_TEXT_HEIGHT,  # Zeichenhöhe in px, 0 = aus
+        'text_scale_range': (0.2, 3.0),  # kleinster und größter Skalierungsfaktor
+        'text_scale_tolerance': 0.15,  # Abweichungen bis 15% werden nicht skaliert
+        'card_detection': settings.OCR_CARD_DETECTION,
+        'card_min_area_ratio': 0.2,  # Kartenumriss muss mindestens 20% des Bildes einnehmen
+        'card_approx_epsilon': 0.02,  # Toleranz der Polygonvereinfachung (Anteil am Umfang)
+        'multi_card_min_area_ratio': 0.005,  # mehrere Karten: jede mindestens 0.5% des Bildes
+        'multi_card_relative_area': 0.5,  # und mindestens halb so groß wie die größte Karte
+        'multi_card_aspect_range': (1.1, 2.5),  # Seitenverhältnis (lange/kurze Seite) einer Karte
+        'multi_card_min_fill': 0.9  # Anteil der Kontur am umschließenden Rechteck (abgerundete Ecken)
+    }
+    # Zweite Phase: unsichere Zeilen einzeln nachlesen
+    LINE_REFINEMENT_PARAMS: Dict[str, Any] = {
+        'enabled': settings.OCR_LINE_REFINEMENT,
+        'min_confidence': settings.OCR_LINE_MIN_CONFIDENCE,  # Zeilen darunter werden nachgelesen
+        'max_lines': 12,  # höchstens so viele Zeilen pro Bild, die unsichersten zuerst
+        'psm': 7,  # eine einzelne Textzeile
+        'min_text_ratio': 0.7,  # neue Lesart muss mindestens 70% der Buchstaben/Ziffern enthalten
+        'padding_ratio': 0.3,  # Rand um die Zeile (Anteil der Zeilenhöhe)
+        'border': 10  # zusätzlicher Rand in Hintergrundfarbe (px)
+    }
+    # Sprachwahl für lang="auto" (siehe recognize)
+    LANGUAGE_PARAMS: Dict[str, Any] = {
+        'candidates': [language.strip() for language in settings.OCR_LANGUAGES.split(',') if language.strip()],
+        'prior_confidence': settings.OCR_LANGUAGE_PRIOR_CONFIDENCE  # gemerkte Sprache ab hier ohne Rennen übernehmen
+    }
+    # Laplace-Differenzkern für die Rauschschätzung
+    NOISE_KERNEL = np.array([[1, -2, 1], [-2, 4, -2], [1, -2, 1]], dtype=np.float32)
+
     def __init__(self):
         self.image_processor = ImageProcessor()
+        self.contact_extractor = ContactExtractor()
+        self.ocr_engine = get_ocr_engine()
+        self.result_cache = ResultCache() if settings.RESULT_CACHE_ENABLED else None
+        self.quality_gate = QualityGate() if settings.QUALITY_GATE_ENABLED else None
+        self.orientation_detector = OrientationDetector(self.ocr_engine) if settings.OCR_ORIENTATION_DETECTION else None
+        self._line_pool: Optional[ThreadPoolExecutor] = None
+        self._language_pools: Optional[Dict[str, ThreadPoolExecutor]] = None
+    
+    @property
+    def psm(self) -> int:
+        """Seitensegmentierung für den ersten OCR-Durchlauf."""
+        return self.TESSERACT_PSM if self.orientation_detector is not None else self.TESSERACT_OSD_PSM
+    
+    @property
+    def line_pool(self) -> ThreadPoolExecutor:
+        """
+        Thread-Pool für das Nachlesen einzelner Zeilen. Er bleibt bestehen, damit die
+        Tesseract-Handles der Threads (siehe TesserocrEngine) warm bleiben.
+        """
+        if self._line_pool is None:
+            self._line_pool = ThreadPoolExecutor(max_workers=max(1, settings.OCR_LINE_WORKERS),
+                                                 thread_name_prefix="ocr-line")
+        return self._line_pool
+    
+    @property
+    def language_pools(self) -> Dict[str, ThreadPoolExecutor]:
+        """
+        Ein eigener Thread je Sprache aus `OCR_LANGUAGES` für recognize mit lang="auto".
+        Jede Sprache liest immer im selben Thread, ihr Tesseract-Handle existiert also
+        nur einmal pro Prozess und nicht in jedem Thread des line_pool.
+        """
+        if self._language_pools is None:
+            self._language_pools = {
+                language: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"ocr-{language}")
+                for language in self.LANGUAGE_PARAMS['candidates']
+            }
+        return self._language_pools
+    
+    def settings_fingerprint(self, lang: str) -> str:
+        """Beschreibt alle Einstellungen, die das OCR-Ergebnis beeinflussen."""
+        return json.dumps({
+            'lang': lang,
+            'engine': self.ocr_engine.name,
+            'psm': self.psm,
+            'orientation': self.orientation_detector.params if self.orientation_detector is not None else None,
+            'decode_target_side': settings.OCR_DECODE_TARGET_SIDE,
+            'preprocessing': self.PREPROCESSING_PARAMS,
+            'line_refinement': self.LINE_REFINEMENT_PARAMS,
+            'languages': self.LANGUAGE_PARAMS if lang == 'auto' else None,
+            'quality_gate': self.quality_gate.params if self.quality_gate is not None else None
+        }, sort_keys=True)
+    
+    def cache_key(self, data: bytes, lang: str = settings.DEFAULT_LANGUAGE) -> str:
+        """Cache-Schlüssel (und ETag) für einen Upload."""
+        return ResultCache.make_key(data, self.settings_fingerprint(lang))
+    
+    @staticmethod
+    def decode_image(data: bytes, target_side: int = settings.OCR_DECODE_TARGET_SIDE) -> np.ndarray:
+        """
+        Dekodiert Upload-Bytes (alle Formate des ImageConverter) direkt im Speicher zu
+        einem Graustufenbild; die Pipeline arbeitet ohnehin einkanalig. Große Aufnahmen
+        werden schon beim Dekodieren auf etwa `target_side` Pixel verkleinert.
+        """
+        return ImageConverter.decode(data, grayscale=True, target_side=target_side)
+    
+    @staticmethod
+    def estimate_noise(gray: np.ndarray) -> float:
+        """
+        Schätzt die Standardabweichung des Bildrauschens aus der Antwort eines
+        Laplace-Differenzkerns. Der Median ist robust gegenüber Textkanten; für ihn genügt
+        jedes zweite Pixel in jeder Richtung.
+        """
+        if gray.shape[0] < 3 or gray.shape[1] < 3:
+            return 0.0
+        response = cv2.filter2D(gray.astype(np.float32), -1, OCRService.NOISE_KERNEL)
+        sample = np.abs(response[1:-1:2, 1:-1:2])
+        # 0.6745: Median der Beträge einer Normalverteilung; 6: Norm des Kerns
+        return float(np.median(sample) / 0.6745 / 6)
     
     @staticmethod
-    def preprocess_image(image_path: str) -> np.ndarray:
-        """Bildvorverarbeitung für optimale OCR-Ergebnisse."""
+    def estimate_text_height(gray: np.ndarray) -> Optional[float]:
+        """
+        Schätzt die typische Zeichenhöhe in Pixeln als Median der Höhen zeichenartiger
+        Zusammenhangskomponenten. Gibt None zurück, wenn zu wenige gefunden werden.
+        """
+        blurred = cv2.GaussianBlur(gray, (3, 3), 0)
+        binary = cv2.adaptiveThreshold(blurred, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = np.asarray(stats, dtype=np.int32)
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        # Rauschen, Linien, Rahmen und große Flächen aussortieren
+        glyphs = (
+            (heights >= 4) & (heights <= gray.shape[0] / 4) &
+            (widths <= heights * 3) & (areas >= 0.1 * widths * heights) & (areas >= 12)
+        )
+        if np.count_nonzero(glyphs) < 10:
+            return None
+        return float(np.median(heights[glyphs]))
+    
+    @staticmethod
+    def normalize_resolution(gray: np.ndarray, detect_image: Optional[np.ndarray] = None,
+                             detect_scale: float = 1.0, trace: Optional[Trace] = None) -> np.ndarray:
+        """
+        Skaliert `gray` so, dass die Schrift etwa `target_text_height` Pixel hoch ist
+        (Tesseract arbeitet dort am genauesten, die Laufzeit wächst mit der Pixelzahl).
+        Die Zeichenhöhe wird auf `detect_image`, einer um `detect_scale` verkleinerten
+        Kopie desselben Ausschnitts, geschätzt. Der angewandte Faktor steht in
+        `trace.info['text_scale']`.
+        """
+        params = OCRService.PREPROCESSING_PARAMS
+        trace = trace if trace is not None else Trace()
+        detect_image = gray if detect_image is None else detect_image
+        detect_scale = 1.0 if detect_image is gray else detect_scale
+        
+        text_height = OCRService.estimate_text_height(detect_image)
+        factor = 1.0
+        if text_height is not None:
+            text_height /= detect_scale
+            trace.info['text_height'] = round(text_height, 1)
+            min_factor, max_factor = params['text_scale_range']
+            factor = float(np.clip(params['target_text_height'] / text_height, min_factor, max_factor))
+            if abs(factor - 1.0) <= params['text_scale_tolerance']:
+                factor = 1.0
+        trace.info['text_scale'] = round(factor, 3)
+        if factor == 1.0:
+            return gray
+        interpolation = cv2.INTER_AREA if factor < 1.0 else cv2.INTER_CUBIC
+        return cv2.resize(gray, None, fx=factor, fy=factor, interpolation=interpolation)
+    
+    @staticmethod
+    def edge_contours(small: np.ndarray) -> List[np.ndarray]:
+        """Äußere Konturen der (zu Flächen dilatierten) Kanten einer verkleinerten Kopie."""
+        params = OCRService.PREPROCESSING_PARAMS
+        blurred = cv2.GaussianBlur(small, (5, 5), 0)
+        
+        # Kantenerkennung für Textbereiche
+        edges = cv2.Canny(blurred, *params['canny_thresholds'])
+        
+        # Dilatation um Textbereiche zu verbinden
+        kernel = np.ones((3,3), np.uint8)
+        dilated = cv2.dilate(edges, kernel, iterations=params['dilate_iterations'])
+        
+        # Finde Konturen
+        contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return list(contours)
+    
+    @staticmethod
+    def find_card_quad(contours: List[np.ndarray], image_shape: Tuple[int, ...]) -> Optional[np.ndarray]:
+        """
+        Sucht unter den größten Konturen einen konvexen Vierecksumriss, der mindestens
+        `card_min_area_ratio` der Bildfläche einnimmt. Gibt die Ecken in der Reihenfolge
+        oben links, oben rechts, unten rechts, unten links zurück oder None.
+        """
+        params = OCRService.PREPROCESSING_PARAMS
+        min_area = image_shape[0] * image_shape[1] * params['card_min_area_ratio']
+        for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+            if cv2.contourArea(contour) < min_area:
+                break
+            peri = cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, params['card_approx_epsilon'] * peri, True)
+            if len(approx) == 4 and cv2.isContourConvex(approx) and cv2.contourArea(approx) >= min_area:
+                return OCRService.order_points(approx.reshape(4, 2).astype(np.float32))
+        return None
+    
+    @staticmethod
+    def find_card_quads(gray: np.ndarray, max_cards: int = settings.OCR_MAX_CARDS) -> List[np.ndarray]:
+        """
+        Sucht alle kartenförmigen Vierecke, z.B. mehrere nebeneinander fotografierte
+        Visitenkarten. Wie bei find_card_quad wird auf einer verkleinerten Kopie nach
+        konvexen Vierecksumrissen gesucht; Umrisse mit abgerundeten Ecken, die nicht zu
+        einem Viereck vereinfacht werden, ersetzt das kleinste umschließende Rechteck.
+        Karten müssen mindestens `multi_card_min_area_ratio` der Bildfläche einnehmen und
+        ein Seitenverhältnis in `multi_card_aspect_range` haben. Da gemeinsam fotografierte
+        Karten etwa gleich groß sind, zählen außerdem nur Umrisse mit mindestens
+        `multi_card_relative_area` der Fläche der größten Karte.
+        
+        Gibt die geordneten Ecken in voller Auflösung zurück, in Lesereihenfolge (Reihen
+        von oben nach unten, innerhalb einer Reihe von links nach rechts).
+        """
+        params = OCRService.PREPROCESSING_PARAMS
+        scale = min(1.0, params['detect_max_side'] / max(gray.shape[:2]))
+        small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+        min_area = small.shape[0] * small.shape[1] * params['multi_card_min_area_ratio']
+        min_aspect, max_aspect = params['multi_card_aspect_range']
+        
+        quads: List[np.ndarray] = []
+        for contour in sorted(OCRService.edge_contours(small), key=cv2.contourArea, reverse=True):
+            area = cv2.contourArea(contour)
+            if area < min_area or len(quads) >= max_cards:
+                break
+            peri = cv2.arcLength(contour, True)
+            approx = cv2.approxPolyDP(contour, params['card_approx_epsilon'] * peri, True)
+            if len(approx) == 4 and cv2.isContourConvex(approx):
+                quad = approx.reshape(4, 2).astype(np.float32)
+            else:
+                rect = cv2.minAreaRect(contour)
+                if area < params['multi_card_min_fill'] * rect[1][0] * rect[1][1]:
+                    continue
+                quad = cv2.boxPoints(rect).astype(np.float32)
+            quad = OCRService.order_points(quad)
+            sides = np.linalg.norm(quad - np.roll(quad, -1, axis=0), axis=1)
+            aspect = max(sides[0] + sides[2], sides[1] + sides[3]) / max(1e-6, min(sides[0] + sides[2], sides[1] + sides[3]))
+            if min_aspect <= aspect <= max_aspect:
+                quads.append(quad / scale)
+                # Konturen sind absteigend sortiert: die erste Karte ist die größte
+                min_area = max(min_area, area * params['multi_card_relative_area'])
+        
+        if not quads:
+            return []
+        # Lesereihenfolge: Karten, deren Mittelpunkte weniger als eine halbe Kartenhöhe
+        # auseinanderliegen, bilden eine Reihe
+        centers = np.array([quad.mean(axis=0) for quad in quads])
+        row_height = np.median([np.ptp(quad[:, 1]) for quad in quads]) / 2
+        order = sorted(range(len(quads)), key=lambda i: centers[i][1])
+        rows: List[List[int]] = []
+        row_top: Optional[float] = None
+        for i in order:
+            if row_top is None or centers[i][1] - row_top > row_height:
+                rows.append([])
+                row_top = centers[i][1]
+            rows[-1].append(i)
+        return [quads[i] for row in rows for i in sorted(row, key=lambda i: centers[i][0])]
+    
+    @staticmethod
+    def order_points(points: np.ndarray) -> np.ndarray:
+        """
+        Sortiert vier Eckpunkte: oben links, oben rechts, unten rechts, unten links.
+        Geordnet wird nach dem Winkel um den Mittelpunkt (im Uhrzeigersinn), damit auch
+        um 45° gedrehte Vierecke eindeutig sind; begonnen wird mit der Ecke oben links.
+        """
+        center = points.mean(axis=0)
+        angles = np.arctan2(points[:, 1] - center[1], points[:, 0] - center[0])
+        ordered = points[np.argsort(angles)]
+        start = int(np.argmin(ordered.sum(axis=1)))
+        return np.roll(ordered, -start, axis=0).astype(np.float32)
+    
+    @staticmethod
+    def rectify_card(gray: np.ndarray, quad: np.ndarray) -> np.ndarray:
+        """Entzerrt den durch `quad` (geordnete Ecken) begrenzten Bereich zu einem Rechteck."""
+        tl, tr, br, bl = quad
+        width = int(round(max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))))
+        height = int(round(max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))))
+        target = np.array([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]], dtype=np.float32)
+        M = cv2.getPerspectiveTransform(quad, target)
+        return cv2.warpPerspective(gray, M, (width, height), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE)
+    
+    @staticmethod
+    def preprocess_image(image: Union[str, np.ndarray], debug_artifacts: Optional[Dict[str, Any]] = None,
+                         trace: Optional[Trace] = None) -> np.ndarray:
+        """
+        Bildvorverarbeitung für optimale OCR-Ergebnisse: preprocess_gray und
+        anschließende Schwellwertbildung (binarize).
+        """
+        trace = trace if trace is not None else Trace()
+        return OCRService.binarize(OCRService.preprocess_gray(image, debug_artifacts, trace), debug_artifacts, trace)
+    
+    @staticmethod
+    def binarize(gray: np.ndarray, debug_artifacts: Optional[Dict[str, Any]] = None,
+                 trace: Optional[Trace] = None) -> np.ndarray:
+        """Globale Schwellwertbildung nach Otsu."""
+        trace = trace if trace is not None else Trace()
+        with trace.stage("otsu"):
+            _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        if debug_artifacts is not None:
+            debug_artifacts['binary'] = binary
+        return binary
+    
+    @staticmethod
+    def preprocess_gray(image: Union[str, np.ndarray], debug_artifacts: Optional[Dict[str, Any]] = None,
+                        trace: Optional[Trace] = None) -> np.ndarray:
+        """
+        Vorverarbeitung bis einschließlich Entrauschen; gibt das Graustufenbild vor der
+        Schwellwertbildung zurück.
+        
+        `image` ist ein Dateipfad oder ein bereits dekodiertes BGR- oder Graustufenbild. Wird
+        `debug_artifacts` übergeben, werden darin Referenzen auf Eingabebild, Konturen sowie
+        Kartenumriss bzw. Zuschnitt abgelegt (siehe DebugArtifactWriter). Die Laufzeiten der
+        einzelnen Schritte werden in `trace` erfasst.
+        
+        Umriss und Textbereiche werden auf einer verkleinerten Kopie gesucht und auf die
+        volle Auflösung zurückgerechnet. Ist ein Kartenumriss (Viereck) erkennbar, wird die
+        Karte perspektivisch entzerrt; sonst wird auf die Textbereiche zugeschnitten. Entrauscht wird nur einmal, auf dem
+        zugeschnittenen Bereich, und nur dann mit Non-Local-Means, wenn das geschätzte
+        Rauschen dies erfordert.
+        """
+        params = OCRService.PREPROCESSING_PARAMS
+        trace = trace if trace is not None else Trace()
         try:
             # Bild einlesen
-            image = cv2.imread(image_path)
-            if image is None:
-                raise ValueError(f"Konnte Bild nicht einlesen: {image_path}")
+            if isinstance(image, (str, Path)):
+                image = OCRService.decode_image(Path(image).read_bytes())
             
-            # Kopie für Texterkennung
-            debug_image = image.copy()
+            height, width = image.shape[:2]
+            trace.info['image_size'] = [width, height]
             
             # In Graustufen umwandeln
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Rauschreduzierung (minimal)
-            denoised = cv2.fastNlMeansDenoising(gray)
-            
-            # Kantenerkennung für Textbereiche
-            edges = cv2.Canny(denoised, 50, 150)
-            
-            # Dilatation um Textbereiche zu verbinden
-            kernel = np.ones((3,3), np.uint8)
-            dilated = cv2.dilate(edges, kernel, iterations=2)
-            
-            # Finde Konturen
-            contours, _ = cv2.findContours(dilated, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            
-            # Filtere kleine Konturen
-            min_area = image.shape[0] * image.shape[1] * 0.001  # 0.1% der Bildfläche
-            text_contours = [cnt for cnt in contours if cv2.contourArea(cnt) > min_area]
-            
-            # Finde Bounding Box für alle Textbereiche
-            if text_contours:
-                # Kombiniere alle Konturen
-                x_coords = []
-                y_coords = []
-                for cnt in text_contours:
-                    x, y, w, h = cv2.boundingRect(cnt)
-                    x_coords.extend([x, x + w])
-                    y_coords.extend([y, y + h])
-                
-                # Berechne Gesamtbereich
-                x_min, x_max = max(0, min(x_coords)), min(image.shape[1], max(x_coords))
-                y_min, y_max = max(0, min(y_coords)), min(image.shape[0], max(y_coords))
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            
+            with trace.stage("contours"):
+                # Textbereiche auf einer verkleinerten Kopie suchen; INTER_AREA mittelt
+                # dabei bereits einen Großteil des Rauschens heraus
+                scale = min(1.0, params['detect_max_side'] / max(height, width))
+                if scale < 1.0:
+                    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                else:
+                    small = gray
+                trace.info['detect_scale'] = round(scale, 4)
+                contours = OCRService.edge_contours(small)
                 
-                # Füge Padding hinzu (5% der Bildgröße)
-                padding_x = int(image.shape[1] * 0.05)
-                padding_y = int(image.shape[0] * 0.05)
-                x_min = max(0, x_min - padding_x)
-                y_min = max(0, y_min - padding_y)
-                x_max = min(image.shape[1], x_max + padding_x)
-                y_max = min(image.shape[0], y_max + padding_y)
+                # Filtere kleine Konturen
+                min_area = small.shape[0] * small.shape[1] * params['min_area_ratio']
+                text_contours = [cnt for cnt in contours if cv2.contourArea(cnt) > min_area]
                 
-                # Schneide Bild zu
-                image = image[y_min:y_max, x_min:x_max]
+                # Kartenumriss: größte viereckige Kontur
+                card_quad = OCRService.find_card_quad(contours, small.shape) if params['card_detection'] else None
+            
+            trace.info['card_detected'] = card_quad is not None
+            if card_quad is not None:
+                # Karte entzerren: Ecken auf volle Auflösung zurückrechnen, die verkleinerte
+                # Kopie für die Schätzung der Schrifthöhe gleich mit entzerren
+                with trace.stage("card"):
+                    full_quad = card_quad / scale
+                    gray = OCRService.rectify_card(gray, full_quad)
+                    small = OCRService.rectify_card(small, card_quad) if scale < 1.0 else gray
+                    trace.info['card_quad'] = np.rint(full_quad).astype(int).tolist()
                 
-                # Debug: Zeichne erkannte Textbereiche
-                for cnt in text_contours:
-                    cv2.drawContours(debug_image, [cnt], -1, (0, 255, 0), 2)
-                cv2.rectangle(debug_image, (x_min, y_min), (x_max, y_max), (0, 0, 255), 2)
-                
-                # Speichere Debug-Bild
-                debug_path = str(Path(image_path).with_suffix('.debug.jpg'))
-                cv2.imwrite(debug_path, debug_image)
-                logger.debug(f"Debug-Bild gespeichert: {debug_path}")
-            
-            # In Graustufen umwandeln (zugeschnittenes Bild)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            
-            # Rauschreduzierung
-            denoised = cv2.fastNlMeansDenoising(gray)
+                if debug_artifacts is not None:
+                    debug_artifacts['contours'] = [(cnt / scale).astype(np.int32) for cnt in text_contours]
+                    debug_artifacts['card_quad'] = np.rint(full_quad).astype(np.int32)
+                    debug_artifacts['card'] = gray
             
-            # Einfache Schwellwertbildung
-            _, binary = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            
-            return binary
+            # Finde Bounding Box für alle Textbereiche
+            elif text_contours:
+                with trace.stage("crop"):
+                    # Kombiniere alle Konturen und rechne auf volle Auflösung zurück
+                    x, y, w, h = cv2.boundingRect(np.vstack(text_contours))
+                    x_min, x_max = max(0, int(x / scale)), min(width, int(np.ceil((x + w) / scale)))
+                    y_min, y_max = max(0, int(y / scale)), min(height, int(np.ceil((y + h) / scale)))
+                    
+                    # Füge Padding hinzu
+                    padding_x = int(width * params['padding_ratio'])
+                    padding_y = int(height * params['padding_ratio'])
+                    x_min = max(0, x_min - padding_x)
+                    y_min = max(0, y_min - padding_y)
+                    x_max = min(width, x_max + padding_x)
+                    y_max = min(height, y_max + padding_y)
+                    
+                    # Schneide Bild zu
+                    gray = gray[y_min:y_max, x_min:x_max]
+                    small = small[int(y_min * scale):int(np.ceil(y_max * scale)),
+                                  int(x_min * scale):int(np.ceil(x_max * scale))]
+                    trace.info['crop_box'] = [x_min, y_min, x_max, y_max]
+                
+                # Debug: erkannte Textbereiche (gezeichnet wird im DebugArtifactWriter)
+                if debug_artifacts is not None:
+                    debug_artifacts['contours'] = [(cnt / scale).astype(np.int32) for cnt in text_contours]
+                    debug_artifacts['crop_box'] = [x_min, y_min, x_max, y_max]
+            
+            trace.info['crop_size'] = [gray.shape[1], gray.shape[0]]
+            
+            # Auflösung so anpassen, dass die Schrift etwa die Zielhöhe hat
+            if params['target_text_height']:
+                with trace.stage("normalize"):
+                    gray = OCRService.normalize_resolution(gray, small, scale, trace)
+            
+            # Rauschreduzierung: nur bei merklichem Rauschen das teure Non-Local-Means
+            with trace.stage("denoise"):
+                noise = OCRService.estimate_noise(gray)
+                trace.info['noise_sigma'] = round(noise, 2)
+                if noise >= params['noise_threshold']:
+                    trace.info['denoise_filter'] = params['denoise']
+                    denoised = cv2.fastNlMeansDenoising(gray)
+                else:
+                    trace.info['denoise_filter'] = params['light_denoise']
+                    denoised = cv2.GaussianBlur(gray, (3, 3), 0)
+            
+            if debug_artifacts is not None:
+                debug_artifacts['image'] = image
+            
+            return denoised
         except Exception as e:
             logger.error(f"Fehler bei der Bildvorverarbeitung: {str(e)}")
             raise
     
-    def process_image(self, image_path: str, lang: str = 'deu') -> Tuple[Contact, float]:
-        """Verarbeitet ein Bild mit OCR und extrahiert Kontaktinformationen."""
+    @staticmethod
+    def line_variants(gray: np.ndarray, binary: np.ndarray, box: Tuple[int, int, int, int]) -> List[np.ndarray]:
+        """
+        Ausschnitte einer Zeile zum Nachlesen: aus dem Binärbild und mit einer nur für
+        den Ausschnitt bestimmten Otsu-Schwelle aus dem Graustufenbild (hilft bei
+        ungleichmäßiger Ausleuchtung und blasser Schrift).
+        """
+        params = OCRService.LINE_REFINEMENT_PARAMS
+        x, y, w, h = box
+        padding = int(round(h * params['padding_ratio']))
+        x_min, y_min = max(0, x - padding), max(0, y - padding)
+        x_max, y_max = min(gray.shape[1], x + w + padding), min(gray.shape[0], y + h + padding)
+        _, local = cv2.threshold(gray[y_min:y_max, x_min:x_max], 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        variants: List[np.ndarray] = [binary[y_min:y_max, x_min:x_max], local]
+        border = params['border']
+        return [
+            cv2.copyMakeBorder(variant, border, border, border, border, cv2.BORDER_CONSTANT,
+                               value=(int(np.median(variant)),))
+            for variant in variants
+        ]
+    
+    def refine_lines(self, lines: List[OCRLine], gray: np.ndarray, binary: np.ndarray,
+                     lang: str = 'deu', trace: Optional[Trace] = None) -> List[OCRLine]:
+        """
+        Zweite Phase nach der Layoutanalyse: Zeilen mit einer mittleren Wortkonfidenz
+        unter `min_confidence` werden einzeln mit psm 7 nachgelesen (siehe line_variants).
+        Alle Ausschnitte laufen parallel im line_pool; tesserocr gibt dabei den GIL frei.
+        Übernommen wird je Zeile die Lesart mit der höchsten Konfidenz, sofern sie nicht
+        deutlich weniger Buchstaben und Ziffern enthält (kurze Fehllesungen haben oft eine
+        hohe Konfidenz); die Reihenfolge der Zeilen bleibt erhalten.
+        """
+        params = self.LINE_REFINEMENT_PARAMS
+        trace = trace if trace is not None else Trace()
+        uncertain = sorted(
+            (index for index, line in enumerate(lines) if line.confidence < params['min_confidence']),
+            key=lambda index: lines[index].confidence
+        )[:params['max_lines']]
+        
+        futures = {
+            index: [
+                self.line_pool.submit(self.ocr_engine.image_to_lines, variant, lang, params['psm'])
+                for variant in self.line_variants(gray, binary, lines[index].box)
+            ]
+            for index in uncertain
+        }
+        refined = list(lines)
+        for index, candidates in futures.items():
+            for future in candidates:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"Nachlesen von Zeile {index} fehlgeschlagen: {str(e)}")
+                    continue
+                if not result:
+                    continue
+                candidate = OCRLine(
+                    text=' '.join(line.text for line in result),
+                    box=lines[index].box,
+                    confidences=[confidence for line in result for confidence in line.confidences]
+                )
+                min_length = params['min_text_ratio'] * sum(char.isalnum() for char in lines[index].text)
+                if candidate.confidence > refined[index].confidence and \
+                   sum(char.isalnum() for char in candidate.text) >= min_length:
+                    refined[index] = candidate
+        
+        trace.info['line_refinement'] = {
+            'lines': len(lines),
+            'uncertain': len(uncertain),
+            'improved': sum(refined[index] is not lines[index] for index in uncertain)
+        }
+        return refined
+    
+    def recognize(self, image: np.ndarray, lang: str = settings.DEFAULT_LANGUAGE,
+                  prior: Optional[str] = None, trace: Optional[Trace] = None) -> Tuple[List[OCRLine], str]:
+        """
+        Erster OCR-Durchlauf mit Layoutanalyse; gibt die Zeilen und die verwendete Sprache zurück.
+        
+        Mit lang="auto" lesen alle Sprachen aus `OCR_LANGUAGES` dasselbe Binärbild parallel,
+        jede in ihrem Thread (siehe language_pools). Übernommen wird das Ergebnis mit der höchsten mittleren
+        Wortkonfidenz, die übrigen werden verworfen. `prior` ist die für den Mandanten
+        gemerkte Sprache (siehe LanguagePrior): sie wird zuerst allein gelesen und ohne
+        Rennen übernommen, wenn sie `prior_confidence` erreicht; sonst laufen die übrigen
+        Sprachen parallel nach.
+        """
+        trace = trace if trace is not None else Trace()
+        if lang != 'auto':
+            return self.ocr_engine.image_to_lines(image, lang=lang, psm=self.psm), lang
+        
+        params = self.LANGUAGE_PARAMS
+        pools = self.language_pools
+        results: Dict[str, List[OCRLine]] = {}
+        raced = True
+        if prior is not None and prior in pools:
+            results[prior] = pools[prior].submit(self.ocr_engine.image_to_lines, image, prior, self.psm).result()
+            raced = mean_confidence(results[prior]) < params['prior_confidence']
+        if raced:
+            futures = {
+                language: pool.submit(self.ocr_engine.image_to_lines, image, language, self.psm)
+                for language, pool in pools.items() if language not in results
+            }
+            error: Optional[Exception] = None
+            for language, future in futures.items():
+                try:
+                    results[language] = future.result()
+                except Exception as e:
+                    logger.warning(f"OCR mit lang={language} fehlgeschlagen: {str(e)}")
+                    error = e
+            if not results:
+                raise error or ValueError("OCR_LANGUAGES enthält keine Sprache")
+        
+        # Bei Gleichstand gewinnt die gemerkte bzw. die zuerst konfigurierte Sprache
+        confidences = {language: mean_confidence(lines) for language, lines in results.items()}
+        selected = max(confidences, key=lambda language: confidences[language])
+        trace.info['language'] = {
+            'selected': selected,
+            'prior': prior,
+            'raced': raced,
+            'confidence': {language: round(confidence, 1) for language, confidence in confidences.items()}
+        }
+        return results[selected], selected
+    
+    def segment_cards(self, image: Union[str, Path, bytes],
+                      trace: Optional[Trace] = None) -> List[Tuple[Optional[List[List[int]]], np.ndarray]]:
+        """
+        Zerlegt ein Foto mit mehreren Visitenkarten (siehe find_card_quads) und gibt für
+        jede Karte die Ecken und das entzerrte Graustufenbild zurück, das anschließend
+        mit `process_array` verarbeitet wird. Wird keine Karte gefunden, ist das ganze
+        Bild die einzige Karte (Ecken None).
+        
+        Dekodiert wird mit `OCR_CARDS_DECODE_TARGET_SIDE`, da jede Karte nur einen Teil
+        des Bildes einnimmt.
+        """
+        trace = trace if trace is not None else Trace()
         try:
-            # Bildvorverarbeitung
-            processed_image = OCRService.preprocess_image(image_path)
+            data = image if isinstance(image, bytes) else Path(image).read_bytes()
+            with trace.stage("decode"):
+                gray = self.decode_image(data, target_side=settings.OCR_CARDS_DECODE_TARGET_SIDE)
+            trace.info['image_size'] = [gray.shape[1], gray.shape[0]]
+            
+            with trace.stage("segment"):
+                quads = OCRService.find_card_quads(gray)
+                cards = [
+                    (np.rint(quad).astype(int).tolist(), OCRService.rectify_card(gray, quad))
+                    for quad in quads
+                ]
+            trace.info['cards'] = len(cards)
+            return cards or [(None, gray)]
+        except Exception as e:
+            logger.error(f"Fehler bei der Kartensegmentierung: {str(e)}")
+            raise
+    
+    def process_image(self, image: Union[str, Path, bytes], lang: str = settings.DEFAULT_LANGUAGE,
+                      trace: Optional[Trace] = None, debug: bool = False,
+                      prior: Optional[str] = None) -> Tuple[Contact, float]:
+        """
+        Verarbeitet ein Bild mit OCR und extrahiert Kontaktinformationen.
+        
+        `image` ist ein Dateipfad oder der Inhalt des Uploads; Bytes werden im Speicher
+        dekodiert, ohne die Platte zu berühren. Debug-Artefakte werden nur bei `debug`
+        oder gemäß `DEBUG_ARTIFACTS_SAMPLE_RATE` erzeugt; mit `debug` wird der Ergebnis-Cache
+        nicht gelesen, damit Trace und Artefakte vollständig sind. Ungeeignete Bilder führen
+        zu ImageQualityError (siehe QualityGate). Zu `lang="auto"` und `prior` siehe recognize.
+        """
+        trace = trace if trace is not None else Trace()
+        try:
+            data = image if isinstance(image, bytes) else Path(image).read_bytes()
+            
+            # Bereits verarbeitete Uploads kommen aus dem Cache
+            cache_key = None
+            if self.result_cache is not None:
+                cache_key = self.cache_key(data, lang)
+                cached = self.result_cache.get(cache_key) if not debug else None
+                if cached is not None:
+                    logger.debug("Cache-Treffer")
+                    trace.info['cache_hit'] = True
+                    return cached
+            
+            with trace.stage("decode"):
+                decoded = self.decode_image(data)
+        except Exception as e:
+            logger.error(f"Fehler beim Einlesen des Bildes: {str(e)}")
+            raise
+        
+        contact, reliability_score = self.process_array(decoded, lang=lang, trace=trace, debug=debug, prior=prior)
+        
+        if cache_key is not None:
+            self.result_cache.put(cache_key, contact, reliability_score)
+        
+        return contact, reliability_score
+    
+    def process_array(self, image: np.ndarray, lang: str = settings.DEFAULT_LANGUAGE,
+                      trace: Optional[Trace] = None, debug: bool = False,
+                      prior: Optional[str] = None) -> Tuple[Contact, float]:
+        """
+        Wie `process_image`, aber für ein bereits dekodiertes BGR- oder Graustufenbild
+        (z.B. eine gerenderte PDF-Seite). Ergebnisse werden nicht zwischengespeichert.
+        """
+        trace = trace if trace is not None else Trace()
+        try:
+            trace.info['input_megapixels'] = image.shape[0] * image.shape[1] / 1e6
+            decoded = image
+            
+            # Aussichtslose Bilder vor der OCR ablehnen (ImageQualityError),
+            # grenzwertige nachbessern
+            if self.quality_gate is not None:
+                with trace.stage("quality"):
+                    reasons = self.quality_gate.check(decoded, trace)
+                if reasons:
+                    with trace.stage("enhance"):
+                        gray = decoded if decoded.ndim == 2 else cv2.cvtColor(decoded, cv2.COLOR_BGR2GRAY)
+                        decoded = QualityGate.enhance(gray, reasons)
             
-            # OCR durchführen mit Standardparametern
-            text = pytesseract.image_to_string(
-                processed_image,
-                lang=lang,
-                config='--psm 1'  # Automatische Seitensegmentierung mit OSD
-            )
+            # Bildvorverarbeitung
+            debug_artifacts: Optional[Dict[str, Any]] = {} if debug or random.random() < settings.DEBUG_ARTIFACTS_SAMPLE_RATE else None
+            gray = OCRService.preprocess_gray(decoded, debug_artifacts=debug_artifacts, trace=trace)
+            
+            # Ausrichtung einmal vorab bestimmen und drehen, statt OSD in jedem Tesseract-Aufruf
+            if self.orientation_detector is not None:
+                with trace.stage("orientation"):
+                    gray = OrientationDetector.rotate(gray, self.orientation_detector.detect(gray, trace))
+            processed_image = OCRService.binarize(gray, debug_artifacts=debug_artifacts, trace=trace)
+            
+            # OCR durchführen mit Standardparametern: Layoutanalyse und Text mit
+            # Wortkonfidenzen in einem Durchlauf, bei lang="auto" je Sprache
+            with trace.stage("tesseract"):
+                lines, lang = self.recognize(processed_image, lang=lang, prior=prior, trace=trace)
+            trace.info['tesseract'] = {'engine': self.ocr_engine.name, 'lang': lang, 'psm': self.psm}
+            
+            # Nur die unsicheren Zeilen erneut lesen
+            if self.LINE_REFINEMENT_PARAMS['enabled']:
+                with trace.stage("refine"):
+                    lines = self.refine_lines(lines, gray, processed_image, lang, trace)
+            text = '\n'.join(line.text for line in lines)
             
             # Debug-Ausgabe
             logger.debug(f"OCR Text:\n{text}")
             
             # Kontaktdaten extrahieren
-            contact_data = self._extract_contact_data(text)
+            with trace.stage("extract"):
+                classified = self.contact_extractor.classify(text)
+                contact_data = self.contact_extractor.extract(classified)
             reliability_score = self._calculate_reliability_score(contact_data)
+            trace.info['reliability_score'] = reliability_score
+            
+            if debug_artifacts is not None:
+                if settings.DEBUG_ARTIFACTS_INCLUDE_TEXT:
+                    debug_artifacts['text'] = text
+                name = f"{datetime.now().strftime('%Y-%m-%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+                trace.info['debug_artifacts'] = name if get_debug_writer().submit(name, debug_artifacts) else 'dropped'
             
-            # Stelle sicher, dass Name nicht leer ist
+            # Stelle sicher, dass Name nicht leer ist: erste Zeile, die wie ein Name aussieht
             if not contact_data.get('first_name') and not contact_data.get('last_name'):
-                # Suche nach der ersten Zeile, die wie ein Name aussieht
-                lines = [line.strip() for line in text.split('\n') if line.strip()]
-                for line in lines:
-                    # Überspringe Zeilen mit typischen nicht-Namen-Inhalten
-                    if any(char in line for char in '@/') or \
-                       re.match(r'^\d{5}', line) or \
-                       re.match(r'^[\d\s\-+()]+$', line) or \
-                       any(word in line.lower() for word in ['www', 'http', 'tel', 'fax', 'mobil', 'gmbh', 'ag', 'kg']):
-                        continue
-                    
-                    # Prüfe auf Namensformat (mindestens zwei Wörter, keine Zahlen)
-                    words = line.split()
-                    if len(words) >= 2 and not any(char.isdigit() for char in line):
-                        contact_data['first_name'] = words[0]
-                        contact_data['last_name'] = ' '.join(words[1:])
-                        break
+                name = self.contact_extractor.fallback_name(classified)
+                if name is not None:
+                    contact_data['first_name'], contact_data['last_name'] = name
             
             # Stelle sicher, dass Name nicht leer ist (Fallback)
             if not contact_data.get('first_name') and not contact_data.get('last_name'):
@@ -166,181 +733,15 @@ class OCRService:
             
             return contact, reliability_score
             
+        except ImageQualityError:
+            raise
         except Exception as e:
             logger.error(f"Fehler bei OCR-Verarbeitung: {str(e)}")
             raise
     
     def _extract_contact_data(self, text: str) -> Dict[str, str]:
-        """Extrahiert Kontaktdaten aus dem OCR-Text."""
-        try:
-            # Zeilen aufteilen und Leerzeilen entfernen
-            lines = [line.strip() for line in text.split('\n') if line.strip()]
-            
-            # Initialisiere Kontaktdaten
-            contact_data = {
-                'first_name': '',
-                'last_name': '',
-                'company': None,
-                'position': None,
-                'email': None,
-                'phone': '',
-                'secondary_phone': None,
-                'street': '',
-                'city': '',
-                'postal_code': '',
-                'country': 'Deutschland'
-            }
-            
-            # Debug-Ausgabe
-            logger.debug(f"OCR Text:\n{text}")
-            
-            # Name suchen
-            name_found = False
-            for line in lines:
-                # Überspringe Zeilen mit bestimmten Inhalten
-                if any(char in line for char in '@/&') or \
-                   re.match(r'^\d{5}', line) or \
-                   re.match(r'^[\d\s\-+()]+$', line) or \
-                   any(word.lower() in line.lower() for word in [
-                       'www', 'http', 'tel', 'fax', 'mobil', 'gmbh', 'ag', 'kg', 'ohg',
-                       'ltd', 'corp', 'feser', 'graf', 'auto', 'gruppe', 'group'
-                   ]):
-                    continue
-                
-                # Prüfe auf Namensformat
-                words = line.split()
-                if len(words) >= 2 and \
-                   not any(char.isdigit() for char in line) and \
-                   all(word[0].isupper() for word in words if len(word) > 1) and \
-                   all(len(word) <= 20 for word in words):  # Maximale Wortlänge
-                    contact_data['first_name'] = words[0]
-                    contact_data['last_name'] = ' '.join(words[1:])
-                    name_found = True
-                    break
-            
-            # Firma und Position suchen
-            company_found = False
-            position_found = False
-            
-            # Typische Positionstitel
-            position_indicators = [
-                'geschäftsführer', 'leiter', 'manager', 'direktor', 'vorstand',
-                'berater', 'verkauf', 'vertrieb', 'consultant', 'mitarbeiter',
-                'spezialist', 'experte', 'chef', 'inhaber', 'verkaufsberater',
-                'automobilverkäufer', 'verkäufer', 'assistent', 'assistant'
-            ]
-            
-            # Erste Durchlauf: Suche nach Position vor der Firma
-            for i, line in enumerate(lines):
-                line_lower = line.lower()
-                
-                # Überspringe bereits verarbeitete Namenszeile
-                if name_found and line == f"{contact_data['first_name']} {contact_data['last_name']}":
-                    continue
-                
-                # Überspringe Zeilen mit bestimmten Inhalten
-                if any(char in line for char in '@/') or \
-                   re.match(r'^\d{5}', line) or \
-                   re.match(r'^[\d\s\-+()]+$', line) or \
-                   any(word in line_lower for word in ['www', 'http', 'tel', 'fax', 'mobil']):
-                    continue
-                
-                # Position vor der Firma
-                if not position_found and not company_found:
-                    # Prüfe auf typische Positionstitel
-                    if any(indicator in line_lower for indicator in position_indicators):
-                        contact_data['position'] = line.strip()
-                        position_found = True
-                        continue
-                    # Wenn die nächste Zeile eine Firma ist
-                    elif i + 1 < len(lines) and \
-                         any(indicator in lines[i + 1] for indicator in ['GmbH', 'AG', 'KG', 'OHG', 'Ltd', 'Corp', '& Co']):
-                        contact_data['position'] = line.strip()
-                        position_found = True
-                        continue
-                
-                # Prüfe auf typische Firmenbezeichnungen
-                if not company_found and any(indicator in line for indicator in ['GmbH', 'AG', 'KG', 'OHG', 'Ltd', 'Corp', '& Co']):
-                    # Wenn "FESER" oder "GRAF" im Text steht, suche nach der vollständigen Firma
-                    
-                    contact_data['company'] = line.strip()
-                    company_found = True
-                    continue
-            
-            # Zweiter Durchlauf: Suche nach Position nach der Firma
-            if company_found and not position_found:
-                for line in lines:
-                    line_lower = line.lower()
-                    
-                    # Überspringe bereits verarbeitete Zeilen
-                    if line == contact_data['company'] or \
-                       (name_found and line == f"{contact_data['first_name']} {contact_data['last_name']}"):
-                        continue
-                    
-                    # Überspringe Zeilen mit bestimmten Inhalten
-                    if any(char in line for char in '@/') or \
-                       re.match(r'^\d{5}', line) or \
-                       re.match(r'^[\d\s\-+()]+$', line) or \
-                       any(word in line_lower for word in ['www', 'http', 'tel', 'fax', 'mobil']):
-                        continue
-                    
-                    # Prüfe auf Position
-                    if not any(indicator in line for indicator in ['GmbH', 'AG', 'KG', 'OHG', 'Ltd', 'Corp', '& Co']):
-                        if any(indicator in line_lower for indicator in position_indicators):
-                            contact_data['position'] = line.strip()
-                            position_found = True
-                            break
-                        # Wenn keine bekannte Position gefunden wurde, nimm die erste geeignete Zeile
-                        elif not position_found and len(line.split()) <= 5:  # Max. 5 Wörter für Position
-                            contact_data['position'] = line.strip()
-                            position_found = True
-                            break
-            
-            # E-Mail
-            for line in lines:
-                if '@' in line and '.' in line:
-                    email = line.strip().replace(' ', '')
-                    if re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                        contact_data['email'] = email
-                        break
-            
-            # Telefonnummern
-            phone_lines = [line for line in lines if any(char.isdigit() for char in line)]
-            for line in phone_lines:
-                # Entferne "T" und alle nicht-numerischen Zeichen außer + und -
-                cleaned = (''.join(char for char in line if char.isdigit() or char in '+ -')).strip()
-                # Prüfe auf mindestens 5 Ziffern (nicht Zeichen)
-                if sum(c.isdigit() for c in cleaned) > 5:
-                    if not contact_data['phone']:
-                        contact_data['phone'] = cleaned
-                    else:
-                        contact_data['secondary_phone'] = cleaned
-                        break
-            
-            # Adresse (von unten nach oben)
-            address_lines: list[str] = []
-            for line in reversed(lines):
-                # PLZ und Stadt
-                if re.match(r'^\d{5}', line):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        contact_data['postal_code'] = parts[0]
-                        contact_data['city'] = ' '.join(parts[1:])
-                        continue
-                
-                # Straße (wenn keine E-Mail/Telefon/Website)
-                if not any(keyword in line.lower() for keyword in ['@', 'tel', 'fax', 'mobil', 'www']):
-                    if not contact_data['street']:  # Nur erste Straßenzeile
-                        contact_data['street'] = line.strip()
-            
-            # Debug-Ausgabe
-            logger.debug(f"Extrahierte Daten:\n{contact_data}")
-            
-            return contact_data
-            
-        except Exception as e:
-            logger.error(f"Fehler bei Extraktion der Kontaktdaten: {str(e)}")
-            raise
+        """Extrahiert Kontaktdaten aus dem OCR-Text (siehe ContactExtractor)."""
+        return self.contact_extractor.extract(self.contact_extractor.classify(text))
     
     def _calculate_reliability_score(self, data: Dict[str, Any]) -> float:
         """
@@ -0,0 +1,175 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import cv2
+import numpy as np
+from app.core.config import settings
+from app.core.tracing import Trace
+from app.services.ocr_engine import OCREngine
+
+logger = logging.getLogger(__name__)
+
+
+class OrientationDetector:
+    """
+    Bestimmt vor der OCR, um wie viele Grad (0, 90, 180, 270 im Uhrzeigersinn) ein Bild
+    gedreht werden muss, damit die Schrift aufrecht steht.
+
+    Gearbeitet wird auf einem Vorschaubild mit höchstens `thumbnail_side` Pixeln:
+    1. Laufrichtung der Zeilen: der nächste Nachbar eines Zeichens liegt bei
+       waagerechter Schrift meist links oder rechts, bei senkrechter darüber oder darunter.
+    2. Oben und unten: Großbuchstaben, Ziffern und Oberlängen sind häufiger als
+       Unterlängen, über dem Mittelband (x-Höhe) einer Zeile liegt also mehr Schrift als
+       darunter.
+    Nur wenn eines der Merkmale nicht eindeutig ist, wird Tesseracts OSD auf dem
+    Vorschaubild ausgeführt. Ergebnisse werden je Inhalt (SHA-256 des Vorschaubilds)
+    in einem LRU-Cache gehalten.
+    """
+
+    # Drehung im Uhrzeigersinn -> cv2.rotate-Code
+    ROTATE_CODES = {
+        90: cv2.ROTATE_90_CLOCKWISE,
+        180: cv2.ROTATE_180,
+        270: cv2.ROTATE_90_COUNTERCLOCKWISE
+    }
+
+    def __init__(self, ocr_engine: OCREngine,
+                 thumbnail_side: int = settings.OCR_ORIENTATION_THUMBNAIL_SIDE,
+                 min_axis_margin: float = 0.5,
+                 min_ascender_margin: float = 0.2,
+                 min_osd_confidence: float = 1.0,
+                 cache_size: int = 1024):
+        self.ocr_engine = ocr_engine
+        self.thumbnail_side = thumbnail_side
+        self.min_axis_margin = min_axis_margin  # |2 * Anteil waagerechter Nachbarn - 1|
+        self.min_ascender_margin = min_ascender_margin  # (oben - unten) / (oben + unten)
+        self.min_osd_confidence = min_osd_confidence
+        self.cache_size = max(1, cache_size)
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Einstellungen der Erkennung; fließen in den Cache-Schlüssel ein."""
+        return {
+            'thumbnail_side': self.thumbnail_side,
+            'min_axis_margin': self.min_axis_margin,
+            'min_ascender_margin': self.min_ascender_margin,
+            'min_osd_confidence': self.min_osd_confidence
+        }
+
+    @classmethod
+    def rotate(cls, image: np.ndarray, rotation: int) -> np.ndarray:
+        """Dreht um `rotation` Grad im Uhrzeigersinn (0, 90, 180 oder 270)."""
+        return image if rotation == 0 else cv2.rotate(image, cls.ROTATE_CODES[rotation])
+
+    def thumbnail(self, gray: np.ndarray) -> np.ndarray:
+        scale = min(1.0, self.thumbnail_side / max(gray.shape[:2]))
+        if scale < 1.0:
+            return cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return gray
+
+    @staticmethod
+    def measure(thumbnail: np.ndarray) -> Optional[Tuple[float, float]]:
+        """
+        Gibt den Anteil der Zeichen mit waagerechtem nächsten Nachbarn und das
+        Oberlängen-Verhältnis ((oben - unten) / (oben + unten), nach Drehung in die
+        Waagerechte) zurück; None, wenn zu wenige Zeichen gefunden werden.
+        """
+        binary = cv2.adaptiveThreshold(thumbnail, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+        count, labels, stats, centroids = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = np.asarray(stats, dtype=np.int32)
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        glyphs = (
+            (heights >= 3) & (heights <= thumbnail.shape[0] / 4) &
+            (widths <= thumbnail.shape[1] / 4) & (areas >= 0.1 * widths * heights)
+        )
+        centers = np.asarray(centroids[1:][glyphs], dtype=np.float32)
+        if len(centers) < 5:
+            return None
+
+        # Richtung zum nächsten Nachbarn, für höchstens 400 Zeichen (Speicherbedarf)
+        queries = centers[::int(np.ceil(len(centers) / 400))]
+        dx = centers[None, :, 0] - queries[:, None, 0]
+        dy = centers[None, :, 1] - queries[:, None, 1]
+        distances = dx * dx + dy * dy
+        distances[distances == 0] = np.inf
+        nearest = np.argmin(distances, axis=1)
+        rows = np.arange(len(queries))
+        horizontal = float(np.mean(np.abs(dx[rows, nearest]) > np.abs(dy[rows, nearest])))
+
+        # Nur Zeichen behalten, in die Waagerechte drehen und zu Zeilen verbinden
+        keep = np.zeros(count, dtype=np.uint8)
+        keep[1:][glyphs] = 255
+        glyph_image = keep[labels]
+        if horizontal < 0.5:
+            glyph_image = cv2.rotate(glyph_image, cv2.ROTATE_90_CLOCKWISE)
+        glyph_size = max(3, int(np.median(heights[glyphs] if horizontal >= 0.5 else widths[glyphs])))
+        lines = cv2.dilate(glyph_image, np.ones((1, 2 * glyph_size + 1), np.uint8))
+        _, _, line_stats, _ = cv2.connectedComponentsWithStats(lines)
+
+        above = below = 0.0
+        for x, y, w, h, _ in line_stats[1:]:
+            if h < 5 or w < 2 * h:
+                continue
+            profile = np.count_nonzero(glyph_image[y:y + h, x:x + w], axis=1).astype(np.float64)
+            band = np.nonzero(profile >= 0.5 * profile.max())[0]
+            above += profile[:band[0]].sum()
+            below += profile[band[-1] + 1:].sum()
+        ascender = (above - below) / (above + below) if above + below > 0 else 0.0
+        return horizontal, float(ascender)
+
+    def detect(self, gray: np.ndarray, trace: Optional[Trace] = None) -> int:
+        """Gibt die nötige Drehung im Uhrzeigersinn zurück und vermerkt sie in `trace`."""
+        trace = trace if trace is not None else Trace()
+        thumbnail = self.thumbnail(gray)
+        key = hashlib.sha256(f"{thumbnail.shape}".encode("utf-8") + thumbnail.tobytes()).hexdigest()
+        with self._lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+        if result is not None:
+            trace.info['orientation'] = {**result, 'cached': True}
+            return result['rotation']
+
+        result = self._detect(thumbnail)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        trace.info['orientation'] = {**result, 'cached': False}
+        return result['rotation']
+
+    def _detect(self, thumbnail: np.ndarray) -> Dict[str, Any]:
+        measured = self.measure(thumbnail)
+        rotation = 0
+        if measured is not None:
+            horizontal, ascender = measured
+            if horizontal >= 0.5:
+                rotation = 0 if ascender >= 0 else 180
+            else:
+                # measure hat im Uhrzeigersinn in die Waagerechte gedreht
+                rotation = 90 if ascender >= 0 else 270
+            result = {'rotation': rotation, 'method': 'heuristic',
+                      'horizontal': round(horizontal, 2), 'ascender': round(ascender, 2)}
+            if abs(2 * horizontal - 1) >= self.min_axis_margin and abs(ascender) >= self.min_ascender_margin:
+                return result
+        else:
+            result = {'rotation': 0, 'method': 'none'}
+
+        # Nicht eindeutig: OSD auf dem Vorschaubild
+        try:
+            orientation, confidence = self.ocr_engine.detect_orientation(thumbnail)
+        except Exception as e:
+            logger.debug(f"OSD fehlgeschlagen: {str(e)}")
+            return result
+        if confidence < self.min_osd_confidence:
+            return result
+        # OSD meldet, um wie viel Grad die Seite im Uhrzeigersinn gedreht ist (Tesseracts
+        # orient_deg); aufgerichtet wird sie durch die Gegendrehung
+        return {**result, 'rotation': (360 - orientation) % 360, 'method': 'osd',
+                'osd_confidence': round(confidence, 2)}
@@ -0,0 +1,28 @@
+from typing import Optional, Tuple
+import logging
+from app.models.contact import Contact
+from app.services.markdown_service import MarkdownService
+from app.services.vcard_service import VCardService
+
+logger = logging.getLogger(__name__)
+
+class OutputService:
+    """Wählt anhand des Accept-Headers das Ausgabeformat (vCard oder Markdown)."""
+
+    def __init__(self):
+        self.vcard_service = VCardService()
+        self.markdown_service = MarkdownService()
+
+    @staticmethod
+    def media_type(accept: Optional[str]) -> str:
+        """Gibt den Media-Type zurück, in dem für diesen Accept-Header geantwortet wird."""
+        if accept == "text/markdown":
+            return "text/markdown"
+        return "text/vcard"
+
+    def render(self, contact: Contact, accept: Optional[str]) -> Tuple[str, str]:
+        """Rendert den Kontakt und gibt (media_type, content) zurück."""
+        media_type = self.media_type(accept)
+        if media_type == "text/markdown":
+            return media_type, self.markdown_service.create_markdown(contact)
+        return media_type, self.vcard_service.create_vcard(contact)
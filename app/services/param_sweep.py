@@ -0,0 +1,148 @@
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+import numpy as np
+from app.core.config import settings
+from app.core.tracing import Trace
+from app.services.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class ParameterSweep:
+    """
+    Bewertet Kontrast/Gamma/Rotation-Kombinationen für den Debug-Endpoint.
+
+    Das Bild wird einmal dekodiert und der Schräglagenwinkel einmal bestimmt; die
+    Tonwert-Tabellen werden vorab berechnet. Die Kandidaten laufen parallel in einem
+    Thread-Pool (OpenCV gibt den GIL frei). Der Sweep endet vorzeitig, sobald ein
+    Kandidat `score_threshold` erreicht oder `time_budget` Sekunden verstrichen sind.
+    """
+
+    PARAMETERS = ('contrast', 'gamma', 'rotation')
+    OPTIONS = ('time_budget', 'score_threshold')
+
+    def __init__(self, image_processor: Optional[ImageProcessor] = None,
+                 max_workers: int = settings.SWEEP_MAX_WORKERS,
+                 max_candidates: int = settings.SWEEP_MAX_CANDIDATES):
+        self.image_processor = image_processor or ImageProcessor()
+        self.max_workers = max(1, max_workers)
+        self.max_candidates = max_candidates
+
+    @classmethod
+    def parse_settings(cls, raw: Union[str, Dict[str, Any], None]) -> Dict[str, Any]:
+        """
+        Liest Raster und Abbruchregeln aus `x-ocr-settings`, z.B.
+        `{"contrast": [1.0, 2.0], "gamma": 1.0, "time_budget": 5, "score_threshold": 0.8}`.
+        Löst ValueError bei ungültigen Angaben aus.
+        """
+        if not raw:
+            return {'grid': {}}
+        data = json.loads(raw) if isinstance(raw, str) else raw
+        if not isinstance(data, dict):
+            raise ValueError("OCR-Parameter müssen ein JSON-Objekt sein")
+
+        unknown = set(data) - set(cls.PARAMETERS) - set(cls.OPTIONS)
+        if unknown:
+            raise ValueError(f"Unbekannte OCR-Parameter: {', '.join(sorted(unknown))}")
+
+        grid = {}
+        for name in cls.PARAMETERS:
+            if name not in data:
+                continue
+            values = data[name] if isinstance(data[name], list) else [data[name]]
+            if not values or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                raise ValueError(f"'{name}' muss eine Zahl oder eine Liste von Zahlen sein")
+            if name in ('contrast', 'gamma') and any(v <= 0 for v in values):
+                raise ValueError(f"'{name}' muss größer als 0 sein")
+            grid[name] = list(dict.fromkeys(values))
+
+        candidates = len(ImageProcessor.candidates(grid))
+        if candidates > settings.SWEEP_MAX_CANDIDATES:
+            raise ValueError(f"Zu viele Parameter-Kombinationen ({candidates} > {settings.SWEEP_MAX_CANDIDATES})")
+
+        parsed: Dict[str, Any] = {'grid': grid}
+        for name in cls.OPTIONS:
+            if data.get(name) is not None:
+                if not isinstance(data[name], (int, float)) or data[name] <= 0:
+                    raise ValueError(f"'{name}' muss eine positive Zahl sein")
+                parsed[name] = float(data[name])
+        return parsed
+
+    def _evaluate(self, gray: np.ndarray, skew_angle: float, params: Dict[str, Any]) -> float:
+        processed = self.image_processor.apply_params(gray, skew_angle, params)
+        return self.image_processor._calculate_quality_score(processed)
+
+    def run(self, image: Union[str, Path, bytes, np.ndarray], grid: Optional[Dict[str, List[Any]]] = None,
+            time_budget: Optional[float] = None, score_threshold: Optional[float] = None,
+            trace: Optional[Trace] = None) -> Dict[str, Any]:
+        """
+        Führt den Sweep aus. Gibt je bewertetem Kandidaten den Score zurück sowie
+        Angaben dazu, ob und warum vorzeitig abgebrochen wurde.
+        """
+        trace = trace if trace is not None else Trace()
+        time_budget = settings.SWEEP_TIME_BUDGET if time_budget is None else time_budget
+        score_threshold = settings.SWEEP_SCORE_THRESHOLD if score_threshold is None else score_threshold
+        start = time.perf_counter()
+
+        candidates = self.image_processor.candidates(grid)
+        if len(candidates) > self.max_candidates:
+            raise ValueError(f"Zu viele Parameter-Kombinationen ({len(candidates)} > {self.max_candidates})")
+
+        with trace.stage("decode"):
+            gray = self.image_processor.load_gray(image)
+        with trace.stage("deskew"):
+            estimated_angle, skew_confidence = self.image_processor.estimate_skew(gray)
+            skew_angle = self.image_processor.effective_skew(estimated_angle, skew_confidence)
+        self.image_processor.prepare_luts(candidates)
+
+        results: Dict[str, Dict[str, Any]] = {}
+        stopped = None
+        with trace.stage("sweep"):
+            pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="sweep")
+            try:
+                pending = {
+                    pool.submit(self._evaluate, gray, skew_angle, params): params
+                    for params in candidates
+                }
+                while pending and stopped is None:
+                    remaining = time_budget - (time.perf_counter() - start)
+                    if remaining <= 0:
+                        stopped = "time_budget"
+                        break
+                    done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        params = pending.pop(future)
+                        key = self.image_processor.candidate_key(params)
+                        try:
+                            score = future.result()
+                        except Exception as e:
+                            logger.error(f"Fehler bei Parameter-Kombination {params}: {str(e)}")
+                            continue
+                        results[key] = {"score": score, "parameters": params}
+                        if score_threshold is not None and score >= score_threshold:
+                            stopped = "score_threshold"
+            finally:
+                # Noch nicht gestartete Kandidaten verwerfen, laufende nicht abwarten
+                pool.shutdown(wait=False, cancel_futures=True)
+
+        trace.info['sweep'] = {
+            'candidates': len(candidates),
+            'evaluated': len(results),
+            'stopped': stopped,
+            'skew_angle': estimated_angle,
+            'skew_confidence': skew_confidence,
+            'skew_applied': skew_angle != 0
+        }
+        best = max(results.items(), key=lambda item: item[1]["score"]) if results else None
+        return {
+            "results": results,
+            "best": best,
+            "candidates": len(candidates),
+            "evaluated": len(results),
+            "stopped": stopped,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
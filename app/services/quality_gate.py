@@ -0,0 +1,171 @@
+import logging
+from typing import Any, Dict, List, Optional
+import cv2
+import numpy as np
+from app.core.config import settings
+from app.core.tracing import Trace
+
+logger = logging.getLogger(__name__)
+
+
+class ImageQualityError(Exception):
+    """
+    Wird ausgelöst, wenn ein Bild für die OCR ungeeignet ist. `reasons` enthält die
+    Befunde (z.B. "blurred", "no_text"), `metrics` die gemessenen Werte. Die Ausnahme
+    ist picklebar und kann aus den OCR-Worker-Prozessen zurückgegeben werden.
+    """
+
+    def __init__(self, reasons: List[str], metrics: Dict[str, float]):
+        super().__init__(reasons, metrics)
+        self.reasons = reasons
+        self.metrics = metrics
+
+    def __str__(self) -> str:
+        return f"Bildqualität für OCR unzureichend: {', '.join(self.reasons)}"
+
+    def to_detail(self) -> Dict[str, Any]:
+        return {"message": str(self), "reasons": self.reasons, "metrics": self.metrics}
+
+
+class QualityGate:
+    """
+    Schnelle Qualitätsprüfung vor der OCR auf einem Vorschaubild.
+
+    Gemessen werden Schärfe (Varianz des Laplace-Filters), der Anteil textartiger Pixel
+    (lokale Schwelle) sowie die Grauwerte von Schrift und Papier (Klassenmittel nach Otsu).
+    Kontrast ist deren Abstand; Belichtungsfehler sind dunkles Papier (`too_dark`) oder
+    ausgebleichte Schrift (`too_bright`), ein weißer Hintergrund allein ist kein Befund.
+    Bilder ohne textartige Pixel (schwarze oder leere Aufnahmen) und völlig unscharfe
+    Bilder (`reject_sharpness`) werden immer abgelehnt. Die übrigen Befunde führen mit
+    `action="reject"` ebenfalls zur Ablehnung, mit `action="enhance"` zu einer
+    Nachbesserung (Tonwertspreizung, Unscharfmaskierung).
+    """
+
+    ACTIONS = ("reject", "enhance")
+    # Höchste Verstärkung der Tonwertspreizung (Rauschen auf fast einfarbigen Bildern)
+    MAX_STRETCH_GAIN = 4.0
+
+    def __init__(self, action: str = settings.QUALITY_GATE_ACTION,
+                 thumbnail_side: int = settings.QUALITY_THUMBNAIL_SIDE,
+                 min_sharpness: float = settings.QUALITY_MIN_SHARPNESS,
+                 reject_sharpness: float = settings.QUALITY_REJECT_SHARPNESS,
+                 min_contrast: float = settings.QUALITY_MIN_CONTRAST,
+                 min_brightness: float = settings.QUALITY_MIN_BRIGHTNESS,
+                 max_brightness: float = settings.QUALITY_MAX_BRIGHTNESS,
+                 min_text_density: float = settings.QUALITY_MIN_TEXT_DENSITY):
+        if action not in self.ACTIONS:
+            raise ValueError(f"Unbekannte Aktion für die Qualitätsprüfung: {action}")
+        self.action = action
+        self.thumbnail_side = thumbnail_side
+        self.min_sharpness = min_sharpness
+        self.reject_sharpness = reject_sharpness
+        self.min_contrast = min_contrast
+        self.min_brightness = min_brightness
+        self.max_brightness = max_brightness
+        self.min_text_density = min_text_density
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        """Einstellungen der Prüfung; fließen in den Cache-Schlüssel ein."""
+        return {
+            'action': self.action,
+            'thumbnail_side': self.thumbnail_side,
+            'min_sharpness': self.min_sharpness,
+            'reject_sharpness': self.reject_sharpness,
+            'min_contrast': self.min_contrast,
+            'brightness_range': (self.min_brightness, self.max_brightness),
+            'min_text_density': self.min_text_density
+        }
+
+    def thumbnail(self, image: np.ndarray) -> np.ndarray:
+        """Verkleinert (BGR oder Graustufen) auf höchstens `thumbnail_side` und wandelt in Graustufen."""
+        scale = min(1.0, self.thumbnail_side / max(image.shape[:2]))
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    @staticmethod
+    def measure(thumbnail: np.ndarray) -> Dict[str, float]:
+        """Misst Schärfe, Grauwerte von Schrift und Papier, Kontrast und Textdichte (Graustufenbild)."""
+        # Schrift und Papier: Mittelwerte der beiden Otsu-Klassen. Anders als Mittelwert und
+        # Standardabweichung hängen sie nicht vom Flächenanteil der Schrift ab (Scan einer
+        # weißen Seite mit wenig Text)
+        threshold, _ = cv2.threshold(thumbnail, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        hist = np.bincount(thumbnail.ravel(), minlength=256).astype(np.float64)
+        levels = np.arange(256)
+        split = int(threshold) + 1
+        ink_count, paper_count = hist[:split].sum(), hist[split:].sum()
+        # Einfarbiges Bild: eine Klasse ist leer, beide erhalten den Mittelwert
+        mean = float(levels @ hist) / hist.sum()
+        ink = float(levels[:split] @ hist[:split]) / ink_count if ink_count else mean
+        paper = float(levels[split:] @ hist[split:]) / paper_count if paper_count else mean
+        _, laplacian_std = cv2.meanStdDev(cv2.Laplacian(thumbnail, cv2.CV_32F))
+        # Textdichte: Fläche zeichenartiger Komponenten der lokal binarisierten Vorschau;
+        # Kanten von Karte und Hintergrund (lang und schmal) zählen nicht
+        binary = cv2.adaptiveThreshold(thumbnail, 255, cv2.ADAPTIVE_THRESH_MEAN_C, cv2.THRESH_BINARY_INV, 15, 10)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+        stats = np.asarray(stats, dtype=np.int32)
+        widths = stats[1:, cv2.CC_STAT_WIDTH]
+        heights = stats[1:, cv2.CC_STAT_HEIGHT]
+        areas = stats[1:, cv2.CC_STAT_AREA]
+        glyphs = (
+            (heights >= 3) & (heights <= thumbnail.shape[0] / 4) &
+            (widths <= heights * 3) & (areas >= 0.1 * widths * heights)
+        )
+        return {
+            'sharpness': round(float(laplacian_std[0][0]) ** 2, 1),
+            'contrast': round(paper - ink, 1),
+            'ink': round(ink, 1),
+            'paper': round(paper, 1),
+            'text_density': round(float(areas[glyphs].sum()) / binary.size, 4)
+        }
+
+    def assess(self, metrics: Dict[str, float]) -> List[str]:
+        """Gibt die Befunde zu den Messwerten zurück (leer, wenn alles in Ordnung ist)."""
+        reasons = []
+        if metrics['paper'] < self.min_brightness:
+            reasons.append("too_dark")
+        elif metrics['ink'] > self.max_brightness:
+            reasons.append("too_bright")
+        if metrics['contrast'] < self.min_contrast:
+            reasons.append("low_contrast")
+        if metrics['sharpness'] < self.min_sharpness:
+            reasons.append("blurred")
+        if metrics['text_density'] < self.min_text_density:
+            reasons.append("no_text")
+        return reasons
+
+    def check(self, image: np.ndarray, trace: Optional[Trace] = None) -> List[str]:
+        """
+        Prüft ein dekodiertes Bild. Löst ImageQualityError aus, wenn es abgelehnt wird;
+        sonst werden die Befunde zurückgegeben, die eine Nachbesserung erfordern.
+        """
+        trace = trace if trace is not None else Trace()
+        metrics = self.measure(self.thumbnail(image))
+        reasons = self.assess(metrics)
+        trace.info['quality'] = {**metrics, 'reasons': reasons}
+        hopeless = "no_text" in reasons or metrics['sharpness'] < self.reject_sharpness
+        if reasons and (self.action == "reject" or hopeless):
+            logger.info(f"Bild abgelehnt: {', '.join(reasons)} ({metrics})")
+            raise ImageQualityError(reasons, metrics)
+        return reasons
+
+    @staticmethod
+    def enhance(gray: np.ndarray, reasons: List[str]) -> np.ndarray:
+        """
+        Nachbesserung für grenzwertige Bilder: Tonwertspreizung bei Belichtungs- oder
+        Kontrastproblemen, Unscharfmaskierung bei Unschärfe.
+        """
+        if {"too_dark", "too_bright", "low_contrast"} & set(reasons):
+            # Tonwertspreizung zwischen 1%- und 99%-Perzentil (auf jedem 4. Pixel bestimmt).
+            # Ein schmaler Bereich (fast nur Papier) wird um seine Mitte auf die höchste
+            # Verstärkung erweitert, statt das Rauschen des Papiers zu spreizen
+            low, high = np.percentile(gray[::4, ::4], (1, 99))
+            span = max(high - low, 255.0 / QualityGate.MAX_STRETCH_GAIN)
+            low = min(max(0.0, (low + high - span) / 2), 255.0 - span)
+            table = np.clip((np.arange(256) - low) * 255.0 / span, 0, 255).astype(np.uint8)
+            gray = cv2.LUT(gray, table)
+        if "blurred" in reasons:
+            blurred = cv2.GaussianBlur(gray, (0, 0), 3)
+            gray = cv2.addWeighted(gray, 1.5, blurred, -0.5, 0)
+        return gray
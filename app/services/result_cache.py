@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple, Dict
+from app.core.config import settings
+from app.models.contact import Contact
+
+logger = logging.getLogger(__name__)
+
+class ResultCache:
+    """
+    OCR-Ergebnis-Cache, adressiert über den Inhalt des Uploads.
+
+    Der Schlüssel ist ein SHA-256 über die Upload-Bytes und die OCR-Einstellungen.
+    Im Speicher wird ein größenbeschränkter LRU gehalten; jeder Eintrag wird
+    zusätzlich als JSON in `cache_path` abgelegt, damit Neustarts und andere
+    Prozesse (OCR-Pool, Job-Worker) davon profitieren. Auf der Platte bleiben etwa
+    `max_files` Einträge: nach jeweils `max_files // 10` geschriebenen Einträgen werden
+    die mit der ältesten Änderungszeit gelöscht. Lesen von der Platte erneuert sie.
+    """
+
+    def __init__(self, max_entries: int = settings.RESULT_CACHE_SIZE,
+                 cache_path: Optional[Path] = settings.RESULT_CACHE_PATH,
+                 max_files: int = settings.RESULT_CACHE_MAX_FILES):
+        self.max_entries = max(1, max_entries)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_files = max(1, max_files)
+        self._entries: "OrderedDict[str, Tuple[Contact, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._saved = 0  # seit dem letzten Aufräumen geschriebene Einträge
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.cache_path:
+            os.makedirs(self.cache_path, exist_ok=True)
+
+    @staticmethod
+    def make_key(data: bytes, fingerprint: str) -> str:
+        """Berechnet den Cache-Schlüssel aus Upload-Bytes und OCR-Einstellungen."""
+        digest = hashlib.sha256(data).hexdigest()
+        return hashlib.sha256(f"{digest}|{fingerprint}".encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        assert self.cache_path is not None
+        return self.cache_path / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Tuple[Contact, float]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        entry = self._load(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._store_in_memory(key, entry)
+        return entry
+
+    def put(self, key: str, contact: Contact, reliability_score: float) -> None:
+        entry = (contact, reliability_score)
+        with self._lock:
+            self._store_in_memory(key, entry)
+        self._save(key, entry)
+
+    def _store_in_memory(self, key: str, entry: Tuple[Contact, float]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, key: str) -> Optional[Tuple[Contact, float]]:
+        if not self.cache_path:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            os.utime(path)  # zuletzt gelesene Einträge bleiben beim Aufräumen erhalten
+            return Contact(**data["contact"]), data["reliability_score"]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Cache-Eintrag {path} nicht lesbar: {str(e)}")
+            return None
+
+    def _save(self, key: str, entry: Tuple[Contact, float]) -> None:
+        if not self.cache_path:
+            return
+        contact, reliability_score = entry
+        path = self._disk_path(key)
+        try:
+            os.makedirs(path.parent, exist_ok=True)
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "contact": contact.model_dump(mode="json"),
+                    "reliability_score": reliability_score
+                }, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Cache-Eintrag {path} konnte nicht geschrieben werden: {str(e)}")
+            return
+        with self._lock:
+            self._saved += 1
+            prune = self._saved >= max(1, self.max_files // 10)
+            if prune:
+                self._saved = 0
+        if prune:
+            self._prune()
+
+    def _prune(self) -> None:
+        """Löscht die ältesten Einträge, sobald mehr als `max_files` auf der Platte liegen."""
+        assert self.cache_path is not None
+        entries = []
+        for directory in os.scandir(self.cache_path):
+            if not directory.is_dir():
+                continue
+            for entry in os.scandir(directory.path):
+                try:
+                    if entry.name.endswith(".json"):
+                        entries.append((entry.stat().st_mtime, entry.path))
+                except FileNotFoundError:
+                    continue  # bereits von einem anderen Prozess entfernt
+        if len(entries) <= self.max_files:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        logger.debug(f"Ergebnis-Cache: {len(entries) - self.max_files} Einträge von der Platte gelöscht")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._entries)
+            }
@@ -0,0 +1,136 @@
+"""
+OCR-Worker für die Job-Warteschlange.
+
+Startet eine Gruppe von Worker-Prozessen, die Aufträge aus dem Job-Broker
+abarbeiten. Aufruf:
+
+    python -m app.worker --processes 4
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from app.core.config import settings
+from app.services.job_broker import JobBroker, get_job_broker
+from app.services.ocr_service import OCRService
+from app.services.output_service import OutputService
+
+logger = logging.getLogger(__name__)
+
+
+def _configure_logging() -> None:
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+
+@contextmanager
+def _keep_lease(broker: JobBroker, job_id: str, worker_id: str):
+    """
+    Verlängert die Lease des Auftrags im Hintergrund, solange die OCR läuft
+    (alle JOB_LEASE_TIMEOUT / 3 Sekunden). Die Laufzeit eines Auftrags ist damit nicht
+    an JOB_LEASE_TIMEOUT gebunden; die Lease läuft nur ab, wenn der Worker hängt oder stirbt.
+    """
+    done = threading.Event()
+
+    def _renew() -> None:
+        while not done.wait(max(settings.JOB_LEASE_TIMEOUT / 3, 0.1)):
+            try:
+                if not broker.renew(job_id, worker_id):
+                    logger.warning(f"Lease für Job {job_id} verloren")
+                    return
+            except Exception as e:
+                logger.error(f"Fehler beim Verlängern der Lease für Job {job_id}: {str(e)}")
+
+    thread = threading.Thread(target=_renew, name=f"lease-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        done.set()
+        thread.join()
+
+
+def run_worker(stop_event) -> None:
+    """Arbeitet Aufträge ab, bis `stop_event` gesetzt wird."""
+    _configure_logging()
+    # SIGINT/SIGTERM werden vom Hauptprozess behandelt
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    broker = get_job_broker()
+    ocr_service = OCRService()
+    output_service = OutputService()
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    logger.info(f"Worker {worker_id} gestartet")
+
+    while not stop_event.is_set():
+        job = broker.claim(worker_id)
+        if job is None:
+            stop_event.wait(settings.JOB_POLL_INTERVAL)
+            continue
+
+        try:
+            with _keep_lease(broker, job.id, worker_id):
+                contact, reliability_score = ocr_service.process_image(job.payload_path, lang=job.lang)
+            media_type, content = output_service.render(contact, job.accept)
+            if broker.complete(job.id, worker_id, {
+                "media_type": media_type,
+                "content": content,
+                "reliability_score": reliability_score,
+                "contact": contact.model_dump(mode="json")
+            }):
+                logger.info(f"Job {job.id} erledigt")
+        except Exception as e:
+            logger.error(f"Fehler bei Job {job.id}: {str(e)}")
+            broker.fail(job.id, worker_id, str(e))
+
+    logger.info(f"Worker {worker_id} beendet")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="OCR-Worker für die Job-Warteschlange")
+    parser.add_argument("--processes", type=int, default=settings.MAX_WORKERS,
+                        help="Anzahl der Worker-Prozesse (Standard: MAX_WORKERS)")
+    args = parser.parse_args()
+    _configure_logging()
+
+    # Datenbank anlegen, bevor die Worker starten
+    get_job_broker()
+
+    context = multiprocessing.get_context("spawn")
+    stop_event = context.Event()
+    processes = [
+        context.Process(target=run_worker, args=(stop_event,), name=f"ocr-worker-{i}")
+        for i in range(max(1, args.processes))
+    ]
+    for process in processes:
+        process.start()
+
+    def _stop(signum, frame):
+        logger.info("Beende Worker...")
+        stop_event.set()
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    # Abgestürzte Worker neu starten, solange nicht beendet wird
+    while not stop_event.is_set():
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning(f"{process.name} beendet (Exit-Code {process.exitcode}), starte neu")
+                processes[i] = context.Process(target=run_worker, args=(stop_event,), name=process.name)
+                processes[i].start()
+        time.sleep(1)
+
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
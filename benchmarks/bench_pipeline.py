@@ -0,0 +1,241 @@
+"""
+Micro-Benchmarks für die einzelnen Schritte der OCR-Pipeline.
+
+Misst Vorverarbeitung (OCRService, ImageProcessor), Formatkonvertierung,
+Kontaktextraktion und vCard-Erzeugung auf synthetischen Karten und schreibt die
+Ergebnisse als JSON. Mit `--ocr` wird zusätzlich die komplette Verarbeitung inkl.
+Tesseract gemessen. Mit `--compare` werden die Ergebnisse einem früheren Lauf
+gegenübergestellt.
+
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --quick --compare bench.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Benchmarks sollen weder den Ergebnis-Cache noch storage/ berühren
+os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+
+import cv2
+import numpy as np
+
+from app.core.tracing import Trace
+from app.models.contact import Contact, Address
+from app.services.image_converter import ImageConverter
+from app.services.image_processor import ImageProcessor
+from app.services.ocr_service import OCRService
+from app.services.vcard_service import VCardService
+from benchmarks.synthetic_cards import CardCase, generate_corpus, card_texts
+
+logger = logging.getLogger(__name__)
+
+CONVERTER_FORMATS = ("jpg", "png", "bmp", "gif", "webp", "heic", "pdf")
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, Any]:
+    """Führt `fn` mehrfach aus und gibt Kennzahlen in Millisekunden zurück."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    cpu_timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+        cpu_timings.append((time.process_time() - cpu_start) * 1000)
+    return {
+        "runs": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3),
+        "cpu_median_ms": round(statistics.median(cpu_timings), 3)
+    }
+
+
+class BenchmarkRunner:
+    def __init__(self, repeat: int, work_dir: Path):
+        self.repeat = repeat
+        self.work_dir = work_dir
+        self.results: List[Dict[str, Any]] = []
+
+    def run(self, benchmark: str, case: str, fn: Callable[[], Any],
+            repeat: Optional[int] = None, **extra) -> None:
+        try:
+            result = measure(fn, repeat or self.repeat)
+        except Exception as e:
+            logger.warning(f"{benchmark} [{case}] fehlgeschlagen: {e}")
+            result = {"error": f"{type(e).__name__}: {e}"}
+        entry = {"benchmark": benchmark, "case": case, **extra, **result}
+        self.results.append(entry)
+        if "error" in entry:
+            print(f"{benchmark:40s} {case:28s} FEHLER {entry['error']}", file=sys.stderr)
+        else:
+            print(f"{benchmark:40s} {case:28s} {entry['median_ms']:10.2f} ms", file=sys.stderr)
+
+    def write_case(self, card: CardCase, suffix: str = "jpg") -> Path:
+        path = self.work_dir / f"{card.name}.{suffix}"
+        if not path.exists():
+            image = card.image
+            if suffix == "heic":
+                from pillow_heif import from_pillow
+                from_pillow(image).save(str(path), quality=90)
+            elif suffix == "png":
+                image.convert("RGBA").save(path)
+            elif suffix == "jpg":
+                image.save(path, quality=92)
+            else:
+                image.save(path)
+        return path
+
+    def bench_preprocessing(self, cards: List[CardCase], include_debug: bool) -> None:
+        processor = ImageProcessor()
+        for card in cards:
+            path = self.write_case(card)
+            data = path.read_bytes()
+            megapixels = round(card.image.width * card.image.height / 1e6, 2)
+
+            self.run("ocr_service.decode_image", card.name,
+                     lambda: OCRService.decode_image(data), megapixels=megapixels)
+
+            image = OCRService.decode_image(data)
+            trace = Trace()
+
+            def preprocess():
+                trace.stages.clear()
+                OCRService.preprocess_image(image, trace=trace)
+
+            self.run("ocr_service.preprocess_image", card.name, preprocess, megapixels=megapixels)
+            self.results[-1]["stages_ms"] = {
+                name: round(duration * 1000, 3) for name, duration in trace.stages.items()
+            }
+
+            self.run("image_processor.preprocess_image", card.name,
+                     lambda: processor.preprocess_image(path), megapixels=megapixels)
+
+            if include_debug:
+                self.run("image_processor.debug_process", card.name,
+                         lambda: processor.debug_process(path), repeat=1, megapixels=megapixels)
+
+    def bench_converter(self, card: CardCase) -> None:
+        for suffix in CONVERTER_FORMATS:
+            try:
+                source = self.write_case(card, suffix)
+            except Exception as e:
+                self.results.append({"benchmark": "image_converter.convert_to_jpeg",
+                                     "case": f"{card.name}.{suffix}", "error": f"{type(e).__name__}: {e}"})
+                continue
+            output = self.work_dir / f"{card.name}.{suffix}.out.jpg"
+            self.run("image_converter.convert_to_jpeg", f"{card.name}.{suffix}",
+                     lambda: ImageConverter.convert_to_jpeg(source, output), format=suffix)
+
+    def bench_extraction(self, ocr_service: OCRService) -> None:
+        contact = Contact(
+            first_name="Max",
+            last_name="Mustermann",
+            company="Beispiel GmbH",
+            position="Geschäftsführer",
+            email="max.mustermann@beispiel.de",
+            phone="+49 123 456789",
+            address=Address(street="Musterstraße 123", postal_code="12345", city="Musterstadt")
+        )
+        vcard_service = VCardService()
+        for i, text in enumerate(card_texts()):
+            self.run("ocr_service.extract_contact_data", f"text_{i}",
+                     lambda: ocr_service._extract_contact_data(text), repeat=self.repeat * 100)
+        self.run("vcard_service.create_vcard", "contact",
+                 lambda: vcard_service.create_vcard(contact), repeat=self.repeat * 100)
+
+    def bench_ocr(self, ocr_service: OCRService, cards: List[CardCase]) -> None:
+        for card in cards:
+            data = self.write_case(card).read_bytes()
+            trace = Trace()
+
+            def process():
+                trace.stages.clear()
+                ocr_service.process_image(data, lang="deu" if card.lang == "de" else "eng", trace=trace)
+
+            self.run("ocr_service.process_image", card.name, process, repeat=1)
+            self.results[-1]["stages_ms"] = {
+                name: round(duration * 1000, 3) for name, duration in trace.stages.items()
+            }
+            self.results[-1]["reliability_score"] = trace.info.get("reliability_score")
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path) -> None:
+    """Gibt die Beschleunigung gegenüber einem früheren Lauf aus."""
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r["benchmark"], r["case"]): r for r in baseline["results"] if "median_ms" in r}
+    print(f"\n{'benchmark':40s} {'case':28s} {'vorher':>10s} {'nachher':>10s} {'faktor':>7s}")
+    for result in results:
+        before = previous.get((result["benchmark"], result["case"]))
+        if before is None or "median_ms" not in result:
+            continue
+        speedup = before["median_ms"] / result["median_ms"] if result["median_ms"] else float("inf")
+        print(f"{result['benchmark']:40s} {result['case']:28s} {before['median_ms']:10.2f} "
+              f"{result['median_ms']:10.2f} {speedup:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-Benchmarks der OCR-Pipeline")
+    parser.add_argument("--repeat", type=int, default=5, help="Messungen pro Fall")
+    parser.add_argument("--quick", action="store_true", help="Nur ein kleiner Teil des Korpus")
+    parser.add_argument("--debug-process", action="store_true",
+                        help="Auch ImageProcessor.debug_process messen (langsam)")
+    parser.add_argument("--ocr", action="store_true", help="Komplette Verarbeitung inkl. Tesseract messen")
+    parser.add_argument("--output", type=Path, help="Ergebnisse als JSON schreiben")
+    parser.add_argument("--compare", type=Path, help="Mit einem früheren JSON-Ergebnis vergleichen")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    cv2.setNumThreads(1)  # reproduzierbare Einzelkern-Messungen, wie in den OCR-Workern
+
+    if args.quick:
+        cards = list(generate_corpus(widths=(800, 1600), rotations=(4.0,), noises=(12.0,), langs=("de",)))
+    else:
+        cards = list(generate_corpus())
+
+    ocr_service = OCRService()
+    with tempfile.TemporaryDirectory(prefix="ocr-bench-") as work_dir:
+        runner = BenchmarkRunner(args.repeat, Path(work_dir))
+        runner.bench_preprocessing(cards, args.debug_process)
+        runner.bench_converter(cards[0])
+        runner.bench_extraction(ocr_service)
+        if args.ocr:
+            runner.bench_ocr(ocr_service, cards)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "opencv": cv2.__version__,
+            "numpy": np.__version__,
+            "cpu_count": os.cpu_count(),
+            "repeat": args.repeat,
+            "quick": args.quick
+        },
+        "results": runner.results
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.compare:
+        compare(runner.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Synthetische Visitenkarten für Benchmarks.
+
+Rendert deutsche und englische Karten mit PIL, legt sie auf einen "Schreibtisch"-
+Hintergrund und variiert Auflösung, Drehung und Rauschen. Es werden keine externen
+Dateien benötigt.
+"""
+import random
+from dataclasses import dataclass
+from typing import Iterator, List, Sequence
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+CARD_TEXTS = {
+    "de": [
+        "Max Mustermann",
+        "Geschäftsführer",
+        "Beispiel GmbH",
+        "Musterstraße 123",
+        "12345 Musterstadt",
+        "Tel. +49 123 456789",
+        "Mobil +49 170 1234567",
+        "max.mustermann@beispiel.de",
+        "www.beispiel.de"
+    ],
+    "en": [
+        "Jane Doe",
+        "Sales Manager",
+        "Example Corp",
+        "221 Baker Street",
+        "London NW1 6XE",
+        "Phone +44 20 7946 0958",
+        "jane.doe@example.com",
+        "www.example.com"
+    ]
+}
+
+# Kartenformat 85 x 55 mm
+CARD_ASPECT = 85 / 55
+
+
+@dataclass
+class CardCase:
+    name: str
+    lang: str
+    image: Image.Image
+    text: str
+
+
+def _load_font(size: int) -> ImageFont.ImageFont:
+    for font_name in ("DejaVuSans.ttf", "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", "Arial.ttf"):
+        try:
+            return ImageFont.truetype(font_name, size)
+        except OSError:
+            continue
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def render_card(lang: str = "de", width: int = 1600, rotation: float = 0.0,
+                noise: float = 0.0, seed: int = 0) -> Image.Image:
+    """
+    Rendert eine Karte auf einem Hintergrund. `width` ist die Breite des Gesamtbildes,
+    `rotation` der Drehwinkel in Grad und `noise` die Standardabweichung des
+    Gaußschen Rauschens (0-255).
+    """
+    rng = random.Random(seed)
+    lines = CARD_TEXTS[lang]
+
+    card_width = int(width * 0.7)
+    card_height = int(card_width / CARD_ASPECT)
+    card = Image.new("RGB", (card_width, card_height), (250, 250, 245))
+    draw = ImageDraw.Draw(card)
+
+    margin = card_width // 16
+    line_height = (card_height - 2 * margin) // len(lines)
+    name_font = _load_font(int(line_height * 0.8))
+    body_font = _load_font(int(line_height * 0.6))
+    for i, line in enumerate(lines):
+        font = name_font if i == 0 else body_font
+        draw.text((margin, margin + i * line_height), line, fill=(20, 20, 20), font=font)
+
+    if rotation:
+        card = card.rotate(rotation, expand=True, fillcolor=(0, 0, 0, 0), resample=Image.BICUBIC)
+        mask = Image.new("L", (card_width, card_height), 255).rotate(rotation, expand=True)
+    else:
+        mask = None
+
+    height = int(width * 3 / 4)
+    background_color = (rng.randint(60, 120), rng.randint(70, 110), rng.randint(70, 100))
+    image = Image.new("RGB", (width, height), background_color)
+    offset = ((width - card.width) // 2, (height - card.height) // 2)
+    image.paste(card, offset, mask)
+
+    if noise > 0:
+        array = np.asarray(image, dtype=np.float32)
+        array += np.random.default_rng(seed).normal(0, noise, array.shape).astype(np.float32)
+        image = Image.fromarray(np.clip(array, 0, 255).astype(np.uint8))
+
+    return image
+
+
+def generate_corpus(widths: Sequence[int] = (800, 1600, 4000),
+                    rotations: Sequence[float] = (0.0, 4.0),
+                    noises: Sequence[float] = (0.0, 12.0),
+                    langs: Sequence[str] = ("de", "en")) -> Iterator[CardCase]:
+    """Erzeugt alle Kombinationen aus Sprache, Auflösung, Drehung und Rauschen."""
+    seed = 0
+    for lang in langs:
+        for width in widths:
+            for rotation in rotations:
+                for noise in noises:
+                    seed += 1
+                    yield CardCase(
+                        name=f"{lang}_{width}px_r{rotation:g}_n{noise:g}",
+                        lang=lang,
+                        image=render_card(lang, width, rotation, noise, seed),
+                        text="\n".join(CARD_TEXTS[lang])
+                    )
+
+
+def card_texts() -> List[str]:
+    return ["\n".join(lines) for lines in CARD_TEXTS.values()]
@@ -4,9 +4,15 @@ from os.path import exists
 from VCardScanner import VCardScanner
 from time import time
 from json import dumps
+import atexit
 
 app = Flask(__name__)
 
+# Ein Scanner für den ganzen Prozess: die Threads seines OCR-Pools behalten ihre
+# Tesseract-Handles über alle Requests; geschlossen wird er einmal beim Beenden.
+scanner = VCardScanner()
+atexit.register(scanner.close)
+
 @app.route('/multi-save', methods=['POST'])
 def save_this():
     pprint(request)
@@ -34,8 +40,7 @@ def perform_ocr():
         return Response(status=500, response=f"Fehler beim Speichern: {e}\n  - {"\n  - ".join(e.args)}")
     
     try:
-        scan = VCardScanner(filepath)
-        json = scan.scan_and_ocr()
+        json = scanner.scan_and_ocr([filepath])
         pprint(json)
     except Exception as e:
         return Response(status=500, response=f"Fehler beim Auswerten: {e}\n  - {"\n  - ".join(e.args)}")
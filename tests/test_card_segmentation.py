@@ -0,0 +1,87 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.ocr_service import OCRService
+
+
+def draw_cards(width, height, cards):
+    """Helle Karten (cx, cy, w, h, Winkel) auf dunklem Hintergrund."""
+    image = np.full((height, width), 60, np.uint8)
+    for cx, cy, w, h, angle in cards:
+        corners = cv2.boxPoints(((cx, cy), (w, h), angle))
+        cv2.fillPoly(image, [np.rint(corners).astype(np.int32)], 230)
+    return image
+
+
+def centers(quads):
+    return np.array([quad.mean(axis=0) for quad in quads])
+
+
+@pytest.mark.parametrize("permutation", [(0, 1, 2, 3), (2, 0, 3, 1), (3, 2, 1, 0)])
+def test_order_points_axis_aligned(permutation):
+    corners = np.array([[10, 20], [110, 20], [110, 80], [10, 80]], np.float32)
+    ordered = OCRService.order_points(corners[list(permutation)])
+    np.testing.assert_array_equal(ordered, corners)
+
+
+def test_order_points_rotated_45():
+    top, right, bottom, left = [50, 0], [100, 50], [50, 100], [0, 50]
+    diamond = np.array([left, bottom, top, right], np.float32)
+    ordered = OCRService.order_points(diamond)
+    # vier verschiedene Ecken im Uhrzeigersinn, beginnend mit der oberen
+    np.testing.assert_array_equal(ordered, np.array([top, right, bottom, left], np.float32))
+
+
+@pytest.mark.parametrize("angle", [-30, -10, 10, 30])
+def test_order_points_rotated_card(angle):
+    corners = cv2.boxPoints(((200, 150), (160, 100), angle))
+    ordered = OCRService.order_points(corners[::-1].copy())
+    # im Uhrzeigersinn (Bildkoordinaten) und oben links zuerst
+    edges = np.roll(ordered, -1, axis=0) - ordered
+    assert all(np.cross(edges[i], edges[(i + 1) % 4]) > 0 for i in range(4))
+    assert ordered[0].sum() == pytest.approx(corners.sum(axis=1).min())
+
+
+def test_find_card_quads_reading_order():
+    # zwei Reihen mit gedrehten, leicht versetzten Karten; gezeichnet in beliebiger Reihenfolge
+    cards = [
+        (3200, 1850, 900, 550, -10), (800, 700, 900, 550, -8), (2000, 1800, 900, 550, 7),
+        (2000, 640, 900, 550, 5), (800, 1760, 900, 550, -3), (3200, 730, 900, 550, 12),
+    ]
+    image = draw_cards(4000, 3000, cards)
+    quads = OCRService.find_card_quads(image, max_cards=10)
+    expected = [(800, 700), (2000, 640), (3200, 730), (800, 1760), (2000, 1800), (3200, 1850)]
+    assert len(quads) == len(expected)
+    np.testing.assert_allclose(centers(quads), expected, atol=15)
+
+
+def test_find_card_quads_rotated_45():
+    image = draw_cards(2000, 1500, [(1000, 750, 800, 480, 45)])
+    [quad] = OCRService.find_card_quads(image)
+    assert len({tuple(np.rint(point)) for point in quad}) == 4
+    np.testing.assert_allclose(quad.mean(axis=0), (1000, 750), atol=10)
+
+
+def test_find_card_quads_small_cards_on_large_photo():
+    # 20 Karten mit je 1,8% der Fläche eines 12-MP-Fotos
+    cards = [(400 + 800 * col, 375 + 750 * row, 600, 360, (-4, 3, 0, 5, -2)[col])
+             for row in range(4) for col in range(5)]
+    image = draw_cards(4000, 3000, cards)
+    quads = OCRService.find_card_quads(image, max_cards=20)
+    assert len(quads) == 20
+    np.testing.assert_allclose(centers(quads), [card[:2] for card in cards], atol=15)
+
+
+def test_find_card_quads_ignores_shapes_much_smaller_than_the_cards():
+    # kartenförmiger Aufkleber mit einem Zehntel der Kartenfläche
+    cards = [(900, 800, 1000, 600, 3), (2300, 800, 1000, 600, -4), (3400, 2400, 320, 190, 0)]
+    image = draw_cards(4000, 3000, cards)
+    quads = OCRService.find_card_quads(image)
+    np.testing.assert_allclose(centers(quads), [(900, 800), (2300, 800)], atol=15)
+
+
+def test_find_card_quads_minimum_area():
+    # 0,3% der Bildfläche: keine Karte, das Bild wird als Ganzes verarbeitet
+    image = draw_cards(4000, 3000, [(2000, 1500, 245, 147, 0)])
+    assert OCRService.find_card_quads(image) == []
@@ -0,0 +1,128 @@
+import pytest
+
+from app.services.contact_extractor import ContactExtractor
+
+# Erwartete Werte entsprechen der Zuordnung vor der Umstellung auf ContactExtractor
+# (Schlüsselwörter werden als Teilzeichenketten gesucht, siehe KEYWORDS).
+CASES = {
+    "standard": (
+        "Max Mustermann\nGeschäftsführer\nBeispiel GmbH\nMusterstraße 123\n12345 Musterstadt\n"
+        "Tel. +49 123 456789\nMobil +49 170 1234567\nmax.mustermann@beispiel.de\nwww.beispiel.de",
+        {
+            "first_name": "Max", "last_name": "Mustermann", "company": "Beispiel GmbH",
+            "position": "Geschäftsführer", "email": "max.mustermann@beispiel.de",
+            "phone": "+49 123 456789", "secondary_phone": "+49 170 1234567",
+            "street": "Musterstraße 123", "city": "Musterstadt", "postal_code": "12345",
+            "country": "Deutschland"
+        },
+        ("Max", "Mustermann")
+    ),
+    # "automobilverkäufer" enthält "auto", "mobil" und "verkäufer": die Zeile gilt als
+    # Kontaktangabe und wird nicht Position
+    "automobil": (
+        "Autohaus Feser-Graf GmbH & Co. KG\nJan Becker\nAutomobilverkäufer\nHauptstraße 5\n"
+        "90402 Nürnberg\nT +49 (0)911 1234-567\njan.becker @ feser-graf.de",
+        {
+            "first_name": "Jan", "last_name": "Becker", "company": "Autohaus Feser-Graf GmbH & Co. KG",
+            "position": "Hauptstraße 5", "email": "jan.becker@feser-graf.de",
+            "phone": "+49 0911 1234-567", "secondary_phone": None,
+            "street": "T +49 (0)911 1234-567", "city": "Nürnberg", "postal_code": "90402",
+            "country": "Deutschland"
+        },
+        ("Jan", "Becker")
+    ),
+    "and_co": (
+        "Müller & Co\nPetra Lorenz\nTeamleitung Einkauf\nIndustriestr. 7\n50667 Köln\n0221 987654",
+        {
+            "first_name": "Petra", "last_name": "Lorenz", "company": "Müller & Co",
+            "position": "Teamleitung Einkauf", "email": None,
+            "phone": "0221 987654", "secondary_phone": None,
+            "street": "0221 987654", "city": "Köln", "postal_code": "50667",
+            "country": "Deutschland"
+        },
+        ("Müller", "& Co")
+    ),
+    # "ag" in "Dagmar" und "Manager" schließt beide Zeilen als Namen aus
+    "manager_ag": (
+        "Dagmar Vogel\nSales Manager\nExample Corp\n221 Baker Street\nLondon NW1 6XE\n"
+        "+44 20 7946 0958\nd.vogel@example.com",
+        {
+            "first_name": "", "last_name": "", "company": "Example Corp",
+            "position": "Sales Manager", "email": "d.vogel@example.com",
+            "phone": "+44 20 7946 0958", "secondary_phone": None,
+            "street": "+44 20 7946 0958", "city": "", "postal_code": "",
+            "country": "Deutschland"
+        },
+        ("Example", "Corp")
+    ),
+    "company_first": (
+        "Muster AG\nLisa Schmidt\nPersonal\nAm Markt 1\n10115 Berlin\nFax 030/123456\nlisa@muster.de",
+        {
+            "first_name": "Lisa", "last_name": "Schmidt", "company": "Muster AG",
+            "position": "Personal", "email": "lisa@muster.de",
+            "phone": "030123456", "secondary_phone": None,
+            "street": "Am Markt 1", "city": "Berlin", "postal_code": "10115",
+            "country": "Deutschland"
+        },
+        ("Lisa", "Schmidt")
+    ),
+    "lowercase_name": (
+        "anna schmidt\nberaterin\nWeg 3\n80331 München\n089 1234567",
+        {
+            "first_name": "", "last_name": "", "company": None,
+            "position": "beraterin", "email": None,
+            "phone": "089 1234567", "secondary_phone": None,
+            "street": "089 1234567", "city": "München", "postal_code": "80331",
+            "country": "Deutschland"
+        },
+        ("anna", "schmidt")
+    ),
+    "no_name": (
+        "12345 Musterstadt\nTel 0123 4567890\ninfo@example.de",
+        {
+            "first_name": "", "last_name": "", "company": None,
+            "position": None, "email": "info@example.de",
+            "phone": "0123 4567890", "secondary_phone": None,
+            "street": "", "city": "Musterstadt", "postal_code": "12345",
+            "country": "Deutschland"
+        },
+        None
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def extractor():
+    return ContactExtractor()
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_extract(extractor, name):
+    text, expected, _ = CASES[name]
+    assert extractor.extract(extractor.classify(text)) == expected
+
+
+@pytest.mark.parametrize("name", CASES)
+def test_fallback_name(extractor, name):
+    text, _, expected = CASES[name]
+    assert extractor.fallback_name(extractor.classify(text)) == expected
+
+
+def test_overlapping_keywords(extractor):
+    [line] = extractor.classify("Automobilverkäufer")
+    assert line.flags & ContactExtractor.SKIP_NAME  # "auto"
+    assert line.flags & ContactExtractor.SKIP_CONTACT  # "mobil"
+    assert line.flags & ContactExtractor.POSITION  # "verkäufer"
+
+    [line] = extractor.classify("Sales Manager")
+    assert line.flags & ContactExtractor.SKIP_NAME  # "ag"
+    assert line.flags & ContactExtractor.POSITION
+    assert not line.flags & ContactExtractor.COMPANY
+
+
+def test_company_indicator_is_case_sensitive(extractor):
+    exact, upper, co = extractor.classify("Beispiel GmbH\nBeispiel GMBH\nMüller & Co")
+    assert exact.flags & ContactExtractor.COMPANY
+    assert upper.flags & ContactExtractor.COMPANY_CANDIDATE
+    assert not upper.flags & ContactExtractor.COMPANY
+    assert co.flags & ContactExtractor.COMPANY
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.endpoints.ingest import _etag_matches, _run_item, ocr_service, router
+from app.core.tracing import Trace
+from app.models.contact import Contact
+from app.services.ocr_executor import OCRQueueFullError, OCRTimeoutError
+from app.services.quality_gate import ImageQualityError
+
+ETAG = '"abc123-vcard"'
+
+
+def test_etag_matches_exact_tag():
+    assert _etag_matches(ETAG, ETAG)
+    assert _etag_matches(f'"other", {ETAG}', ETAG)
+    assert _etag_matches(f"W/{ETAG}", ETAG)
+
+
+def test_etag_does_not_match_wildcard_or_substring():
+    assert not _etag_matches("*", ETAG)
+    assert not _etag_matches('"abc123-vcard-old"', ETAG)
+    assert not _etag_matches('"c123-vcard"', ETAG)
+    assert not _etag_matches('"xabc123-vcard"', ETAG)
+
+
+def test_matching_if_none_match_on_post_fails_precondition():
+    app = FastAPI()
+    app.include_router(router)
+    client = TestClient(app)
+    upload = {"file": ("karte.jpg", b"kein bild", "image/jpeg")}
+
+    etag = f'"{ocr_service.cache_key(b"kein bild")}-vcard"'
+    response = client.post("/ingest", files=upload, headers={"If-None-Match": etag})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == etag
+
+
+async def ocr_result(value):
+    if isinstance(value, Exception):
+        raise value
+    return value
+
+
+def test_run_item_renders_result():
+    contact = Contact(first_name="Max", last_name="Mustermann")
+    result = asyncio.run(_run_item(ocr_result((contact, 0.8, Trace())), None, True, None, "karte.jpg"))
+    assert result["status"] == "ok"
+    assert result["media_type"] == "text/vcard"
+    assert "Mustermann" in result["content"]
+    assert result["reliability_score"] == 0.8
+    assert "trace" in result
+
+
+@pytest.mark.parametrize("error, status_code", [
+    (OCRQueueFullError("voll"), 429),
+    (OCRTimeoutError("zu langsam"), 504),
+    (ImageQualityError(["no_text"], {}), 422),
+    (RuntimeError("kaputt"), 500),
+])
+def test_run_item_maps_errors(error, status_code):
+    result = asyncio.run(_run_item(ocr_result(error), None, False, None, "karte.jpg"))
+    assert result["status"] == "error"
+    assert result["status_code"] == status_code
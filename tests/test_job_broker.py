@@ -0,0 +1,84 @@
+import os
+
+import pytest
+
+from app.models.job import JobStatus
+from app.services import job_broker
+from app.services.job_broker import SQLiteJobBroker
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_broker.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def broker(tmp_path, clock):
+    return SQLiteJobBroker(db_path=tmp_path / "jobs.sqlite3", upload_path=tmp_path / "jobs",
+                           lease_timeout=0, max_attempts=3)
+
+
+def test_expired_worker_cannot_finish_reclaimed_job(broker, clock):
+    job = broker.enqueue(b"bild", "karte.jpg")
+
+    first = broker.claim("w1")
+    assert first.id == job.id
+    clock.now += 1
+    second = broker.claim("w2")
+    assert second.id == job.id
+    assert second.attempts == 2
+
+    # w1 hat die Lease verloren: weder Ergebnis noch Fehler werden übernommen
+    assert not broker.complete(first.id, "w1", {"content": "alt"})
+    assert not broker.fail(first.id, "w1", "zu spät")
+    assert broker.get(job.id).status == JobStatus.RUNNING
+    assert os.path.exists(second.payload_path)
+
+    assert broker.complete(second.id, "w2", {"content": "neu"})
+    done = broker.get(job.id)
+    assert done.status == JobStatus.DONE
+    assert done.result == {"content": "neu"}
+    assert not os.path.exists(second.payload_path)
+
+    # Ein abgeschlossener Auftrag kann nicht nachträglich scheitern
+    assert not broker.fail(second.id, "w2", "doppelt")
+    assert broker.get(job.id).status == JobStatus.DONE
+
+
+def test_fail_by_current_worker(broker, clock):
+    job = broker.enqueue(b"bild", "karte.jpg")
+    claimed = broker.claim("w1")
+
+    assert broker.fail(claimed.id, "w1", "kaputt")
+    failed = broker.get(job.id)
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "kaputt"
+    assert not os.path.exists(claimed.payload_path)
+
+
+def test_renew_keeps_lease(tmp_path, clock):
+    broker = SQLiteJobBroker(db_path=tmp_path / "jobs.sqlite3", upload_path=tmp_path / "jobs",
+                             lease_timeout=10, max_attempts=3)
+    job = broker.enqueue(b"bild", "karte.jpg")
+    broker.claim("w1")
+
+    clock.now += 8
+    assert broker.renew(job.id, "w1")
+    clock.now += 8
+    assert broker.claim("w2") is None
+    assert not broker.renew(job.id, "w2")
+
+    clock.now += 11
+    assert broker.claim("w2").id == job.id
+    assert not broker.renew(job.id, "w1")
+    assert broker.renew(job.id, "w2")
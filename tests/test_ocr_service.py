@@ -0,0 +1,21 @@
+import numpy as np
+
+from app.models.contact import Contact
+from app.services.ocr_service import OCRService
+from app.services.result_cache import ResultCache
+
+
+def test_debug_bypasses_result_cache(monkeypatch):
+    service = OCRService()
+    service.result_cache = ResultCache(cache_path=None)
+    upload = b"bild"
+    service.result_cache.put(service.cache_key(upload, "deu"), Contact(first_name="Alt", last_name="Cache"), 0.5)
+
+    fresh = (Contact(first_name="Neu", last_name="OCR"), 0.9)
+    monkeypatch.setattr(OCRService, "decode_image", staticmethod(lambda data: np.zeros((8, 8), np.uint8)))
+    monkeypatch.setattr(service, "process_array", lambda image, **kwargs: fresh)
+
+    contact, _ = service.process_image(upload, lang="deu")
+    assert contact.first_name == "Alt"
+    # Debug-Läufe lesen nicht aus dem Cache, damit Trace und Artefakte vollständig sind
+    assert service.process_image(upload, lang="deu", debug=True) == fresh
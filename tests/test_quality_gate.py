@@ -0,0 +1,57 @@
+import cv2
+import numpy as np
+import pytest
+
+from app.services.quality_gate import ImageQualityError, QualityGate
+
+LINES = ["Max Mustermann", "Beispiel GmbH", "Tel +49 123 456789", "max@beispiel.de"]
+
+
+def white_page(width, height, scale, paper=250, ink=20):
+    """Scan mit wenig dunklem Text auf weißem, leicht verrauschtem Papier."""
+    rng = np.random.default_rng(0)
+    page = np.clip(rng.normal(paper, 2.0, (height, width)), 0, 255).astype(np.uint8)
+    for i, text in enumerate(LINES):
+        origin = (width // 12, height // 12 + i * int(60 * scale))
+        cv2.putText(page, text, origin, cv2.FONT_HERSHEY_SIMPLEX, scale, ink, 2, cv2.LINE_AA)
+    return page
+
+
+SCANS = {
+    "a4": (2480, 3508, 2.0),  # ganze Seite mit 300 dpi
+    "card": (1050, 600, 1.2),  # zugeschnittene Karte
+}
+
+
+@pytest.mark.parametrize("action", QualityGate.ACTIONS)
+@pytest.mark.parametrize("scan", SCANS)
+def test_white_page_scan_passes(action, scan):
+    gate = QualityGate(action=action)
+    assert gate.check(white_page(*SCANS[scan])) == []
+
+
+def test_enhance_caps_stretch_of_nearly_uniform_image():
+    page = white_page(*SCANS["a4"])
+    enhanced = QualityGate.enhance(page, ["too_bright"])
+    ink = page < 100
+    # Papierrauschen (Standardabweichung 2) höchstens vierfach verstärkt, Schrift bleibt schwarz
+    assert enhanced[~ink].std() <= 4 * page[~ink].std() + 1
+    assert enhanced[ink].mean() < 30
+
+
+def test_washed_out_photo_is_flagged():
+    washed = (white_page(*SCANS["card"]) * 0.15 + 200).astype(np.uint8)
+    with pytest.raises(ImageQualityError) as error:
+        QualityGate(action="reject").check(washed)
+    assert "low_contrast" in error.value.reasons
+
+    reasons = QualityGate(action="enhance").check(washed)
+    assert "low_contrast" in reasons
+    enhanced = QualityGate.enhance(washed, reasons)
+    metrics = QualityGate.measure(enhanced)
+    assert metrics['contrast'] >= 4 * QualityGate.measure(washed)['contrast'] - 1
+
+
+def test_dark_photo_is_flagged():
+    dark = (white_page(*SCANS["card"]) * 0.12).astype(np.uint8)
+    assert "too_dark" in QualityGate(action="enhance").check(dark)
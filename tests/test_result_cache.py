@@ -0,0 +1,33 @@
+import os
+
+from app.models.contact import Contact
+from app.services.result_cache import ResultCache
+
+
+def disk_keys(cache):
+    return {path.stem for path in cache.cache_path.glob("*/*.json")}
+
+
+def test_disk_entries_are_capped(tmp_path):
+    cache = ResultCache(max_entries=2, cache_path=tmp_path, max_files=5)
+    keys = [f"{i:02x}" * 32 for i in range(12)]
+    for i, key in enumerate(keys):
+        cache.put(key, Contact(first_name=f"K{i}"), 0.5)
+        # eindeutige Reihenfolge der Änderungszeiten, unabhängig von der Auflösung der Uhr
+        os.utime(cache._disk_path(key), (1000 + i, 1000 + i))
+    assert len(disk_keys(cache)) <= 5
+    assert set(keys[-4:]) <= disk_keys(cache)
+
+
+def test_reading_from_disk_keeps_entry(tmp_path):
+    writer = ResultCache(cache_path=tmp_path, max_files=100)
+    keys = [f"{i:02x}" * 32 for i in range(4)]
+    for i, key in enumerate(keys):
+        writer.put(key, Contact(first_name=f"K{i}"), 0.5)
+        os.utime(writer._disk_path(key), (1000 + i, 1000 + i))
+
+    # neuer Prozess: der älteste Eintrag wird von der Platte gelesen und dadurch erneuert
+    cache = ResultCache(cache_path=tmp_path, max_files=3)
+    assert cache.get(keys[0])[0].first_name == "K0"
+    cache.put("ff" * 32, Contact(first_name="neu"), 0.5)
+    assert disk_keys(cache) == {keys[0], keys[3], "ff" * 32}